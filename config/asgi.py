@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Признак запуска под ASGI: settings выбирает значения по умолчанию для асинхронного сервера (DATABASE_CONN_MAX_AGE)
+os.environ['DJANGO_ASGI'] = '1'
 
 application = get_asgi_application()
@@ -0,0 +1,117 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class PrincipalCache:
+    """
+    Кеш пользователей внутри процесса по идентификатору из токена (claim user_id, строкой) со временем жизни ttl.
+
+    Пользователь загружается из базы при первом запросе с токеном и дальше берётся из памяти, пока
+    не истечёт ttl. Изменение или удаление пользователя сбрасывает запись сразу в текущем процессе
+    (сигналы post_save/post_delete), в остальных воркерах - не позже чем через ttl секунд.
+    Количество записей ограничено max_size, при переполнении вытесняются самые старые.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.entries.pop(user_id, None)
+            self.misses += 1
+            return None
+
+    def set(self, user_id, user):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self.entries.pop(user_id, None)
+            self.entries[user_id] = (time.monotonic() + self.ttl, user)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'ttl': self.ttl,
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = 0
+
+
+principal_cache = PrincipalCache(settings.JWT_PRINCIPAL_CACHE_TTL, settings.JWT_PRINCIPAL_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT (заголовок Authorization: Bearer <access token>) без запроса к базе на каждый запрос.
+
+    Подпись и срок действия токена проверяются без базы, пользователь берётся из principal_cache.
+    Проверки активности пользователя и отзыва токена при смене пароля (CHECK_REVOKE_TOKEN) выполняются
+    и для пользователя из кеша, поэтому деактивация и смена пароля действуют не позже чем через
+    JWT_PRINCIPAL_CACHE_TTL секунд. Каждый запрос получает свою копию пользователя.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        # Идентификатор в токене - число (simplejwt 5.3) или строка (simplejwt 5.5+), ключ кеша - всегда строка
+        user_id = str(user_id) if user_id is not None else None
+        user = principal_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            principal_cache.set(user_id, user)
+        else:
+            self.check_user(user, validated_token)
+        return copy.copy(user)
+
+    @staticmethod
+    def check_user(user, validated_token):
+        """ Проверки JWTAuthentication.get_user, выполняемые после загрузки пользователя """
+        # Настройки CHECK_USER_IS_ACTIVE нет до simplejwt 5.4: там неактивный пользователь отклоняется всегда
+        if getattr(api_settings, 'CHECK_USER_IS_ACTIVE', True) and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def discard_cached_principal(sender, instance, **kwargs):
+    """ Сбрасывает пользователя в кеше текущего процесса при изменении или удалении """
+    principal_cache.discard(str(getattr(instance, api_settings.USER_ID_FIELD)))
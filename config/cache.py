@@ -0,0 +1,154 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.encoding import iri_to_uri
+from rest_framework.response import Response
+
+
+class VersionedResponseCache:
+    """
+    Кеш ответов API с версионированными ключами.
+
+    Номер версии входит в ключ каждого ответа. Любая запись задач или сотрудников увеличивает версию,
+    и все ранее сохранённые ответы перестают находиться, не дожидаясь
+    истечения TTL. Старые записи вытесняются самим кешем. Счётчики попаданий и промахов хранятся
+    в том же кеше, поэтому для файлового кеша они общие для всех воркеров.
+
+    Версия хранится в кеше CACHES['default']. С бэкендом locmem (по умолчанию) у каждого процесса
+    своя версия: запись сбрасывает кеш только того воркера или команды manage.py, где она выполнена,
+    остальные воркеры отдают старые ответы до истечения RESPONSE_CACHE_TIMEOUT. Сброс во всех процессах
+    обеспечивает общий бэкенд (CACHE_BACKEND=file).
+    """
+
+    version_key = 'version'
+    stats_keys = ('hits', 'misses')
+
+    def __init__(self, alias='default', prefix='api-response', timeout=None):
+        self.alias = alias
+        self.prefix = prefix
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def get_version(self):
+        version = self.cache.get(self._key(self.version_key))
+        if version is None:
+            self.cache.add(self._key(self.version_key), 1, timeout=None)
+            version = self.cache.get(self._key(self.version_key), 1)
+        return version
+
+    def bump(self):
+        """ Увеличивает версию: все ранее сохранённые ответы становятся недействительными """
+        try:
+            self.cache.incr(self._key(self.version_key))
+        except ValueError:
+            self.cache.add(self._key(self.version_key), 1, timeout=None)
+
+    def invalidate(self):
+        """
+        Сбрасывает кеш сразу и ещё раз после фиксации текущей транзакции.
+
+        Повторный сброс нужен, потому что до фиксации параллельный запрос может прочитать
+        старые данные и сохранить их уже под новой версией.
+        """
+        self.bump()
+        transaction.on_commit(self.bump)
+
+    def request_key(self, request):
+        path = iri_to_uri(request.get_full_path())
+        return self._key(f'v{self.get_version()}:{path}')
+
+    def lookup(self, request):
+        """ Возвращает ключ запроса и сохранённые под ним данные (None, если их нет) """
+        key = self.request_key(request)
+        return key, self.get(key)
+
+    def get(self, key):
+        data = self.cache.get(key)
+        self._count('hits' if data is not None else 'misses')
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, timeout=self.timeout)
+
+    def _count(self, name):
+        key = self._key(name)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+    def stats(self):
+        counters = self.cache.get_many([self._key(name) for name in self.stats_keys])
+        hits, misses = (counters.get(self._key(name), 0) for name in self.stats_keys)
+        total = hits + misses
+        return {
+            'version': self.get_version(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([self._key(name) for name in self.stats_keys])
+
+
+# Примечание для справки команд manage.py, которые изменяют данные и сбрасывают кеш ответов
+PROCESS_LOCAL_CACHE_NOTE = (
+    'Cached API responses are invalidated through CACHES["default"]: with the default locmem backend '
+    'the command resets only its own process cache, and running servers may return stale responses '
+    'for up to RESPONSE_CACHE_TIMEOUT seconds; set CACHE_BACKEND=file to invalidate them immediately.'
+)
+
+response_cache = VersionedResponseCache(timeout=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+
+
+class CachedResponseMixin:
+    """
+    Кеширование ответов GET-запросов представления в response_cache.
+
+    Ключ строится из версии данных и полного пути запроса с параметрами. Заголовок X-Cache
+    сообщает, был ли ответ взят из кеша (HIT) или построен заново (MISS).
+    """
+
+    def get(self, request, *args, **kwargs):
+        key, data = response_cache.lookup(request)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class AsyncCachedResponseMixin:
+    """
+    Кеширование ответов GET-запросов асинхронного представления (config.views.AsyncAPIView) в response_cache.
+
+    В кеше хранится готовое тело ответа, поэтому при попадании JSON не формируется заново.
+    Обращения к кешу выполняются в потоке (sync_to_async), чтобы файловый кеш не блокировал цикл событий.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return await super().dispatch(request, *args, **kwargs)
+
+        key, content = await sync_to_async(response_cache.lookup)(self.request)
+        if content is not None:
+            return HttpResponse(content, content_type=self.renderer_class.media_type, headers={'X-Cache': 'HIT'})
+
+        response = await super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            await sync_to_async(response_cache.set)(key, response.content)
+        response['X-Cache'] = 'MISS'
+        return response
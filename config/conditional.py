@@ -0,0 +1,132 @@
+import hashlib
+
+from django.db import transaction
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object has been modified since it was read.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalResponseMixin:
+    """
+    Условные запросы для списков, детального просмотра и обновления объектов.
+
+    ETag вычисляется по pk и отметке изменения (поле modified_field) выводимых объектов, а для списков -
+    ещё и по ссылкам и количеству из ответа пагинатора. Поэтому при совпадении If-None-Match ответ 304
+    возвращается без сериализации. PUT/PATCH с заголовком If-Match выполняются, только если объект
+    не изменился с момента чтения, иначе возвращается 412.
+
+    Чтение выполняется через методы get_read_queryset, get_read_object и get_read_data, которые
+    можно переопределить (например, config.representations.ValuesReadMixin читает строки .values()).
+    Если представление объектов зависит от запроса (get_representation_variant, например набор полей ?fields=),
+    к ETag добавляется суффикс варианта; If-Match сравнивает только версию объектов без суффикса.
+    """
+    modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_read_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+
+        # Ссылки на соседние страницы и количество тоже входят в представление списка
+        envelope = None if page is None else self.get_paginated_response([]).data
+        etag, last_modified = self.get_validators(objects, envelope)
+        if self.is_not_modified(request, etag):
+            return self.set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        data = self.get_read_data(objects, many=True)
+        response = Response(data) if page is None else self.get_paginated_response(data)
+        return self.set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_read_object()
+        etag, last_modified = self.get_validators([instance])
+        if self.is_not_modified(request, etag):
+            return self.set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        return self.set_validators(Response(self.get_read_data(instance)), etag, last_modified)
+
+    def get_read_queryset(self, queryset):
+        return queryset
+
+    def get_representation_variant(self):
+        """ Вариант представления объектов (None - полное представление) """
+        return None
+
+    def get_read_object(self):
+        return self.get_object()
+
+    def get_read_data(self, objects, many=False):
+        return self.get_serializer(objects, many=many).data
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        with transaction.atomic():
+            instance = self.get_object()
+            if_match = request.META.get('HTTP_IF_MATCH')
+            if if_match is not None:
+                self.check_if_match(instance, if_match)
+
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+
+        if getattr(instance, '_prefetched_objects_cache', None):
+            instance._prefetched_objects_cache = {}
+        return self.set_validators(Response(serializer.data), *self.get_validators([serializer.instance]))
+
+    def check_if_match(self, instance, if_match):
+        """ Проверяет, что клиент изменяет ту версию объекта, которую прочитал """
+        # Строка блокируется до конца транзакции, чтобы параллельная запись не прошла между проверкой и сохранением
+        modified = type(instance)._default_manager.select_for_update().filter(pk=instance.pk) \
+            .values_list(self.modified_field, flat=True).first()
+        if modified is None:
+            raise PreconditionFailed()
+        setattr(instance, self.modified_field, modified)
+
+        etags = parse_etags(if_match)
+        version = self.etag_version(self.get_validators([instance])[0])
+        if '*' not in etags and version not in {self.etag_version(etag) for etag in etags}:
+            raise PreconditionFailed()
+
+    def get_validators(self, objects, *extra):
+        """ Возвращает ETag и время последнего изменения для набора объектов """
+        versions = [(obj['pk'], obj[self.modified_field]) if isinstance(obj, dict) else
+                    (obj.pk, getattr(obj, self.modified_field)) for obj in objects]
+        # Представление зависит от модели и формата ответа (JSON, Browsable API)
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        source = repr((self.get_queryset().model._meta.label, getattr(renderer, 'format', None), versions, extra))
+        etag = hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()
+        variant = self.get_representation_variant()
+        if variant is not None:
+            etag += '-' + hashlib.md5(repr(variant).encode(), usedforsecurity=False).hexdigest()[:8]
+        etag = quote_etag(etag)
+        last_modified = max((modified for _, modified in versions if modified is not None), default=None)
+        return etag, last_modified
+
+    @staticmethod
+    def etag_version(etag):
+        """ Часть ETag, зависящая только от версий объектов """
+        return etag.strip('"').split('-')[0]
+
+    @staticmethod
+    def is_not_modified(request, etag):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is None:
+            return False
+        # If-None-Match использует слабое сравнение
+        etags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+        return '*' in etags or etag in etags
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
@@ -0,0 +1,63 @@
+import threading
+from collections import Counter
+
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+class ConnectionStats:
+    """
+    Статистика соединений с базой в текущем процессе.
+
+    Считаются подключения (сигнал connection_created) и обработанные запросы. При постоянных соединениях
+    на одно подключение приходится много запросов, при CONN_MAX_AGE = 0 - одно.
+    Счётчики хранятся в памяти процесса, каждый воркер сервера считает свои.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = Counter()
+        self.requests = 0
+
+    def count_connect(self, alias):
+        with self.lock:
+            self.connects[alias] += 1
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def stats(self):
+        result = {}
+        for alias in connections:
+            settings_dict = connections.settings[alias]
+            connects = self.connects[alias]
+            result[alias] = {
+                'vendor': connections[alias].vendor,
+                'conn_max_age': settings_dict['CONN_MAX_AGE'],
+                'conn_health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+                'connects': connects,
+                'requests': self.requests,
+                'requests_per_connect': round(self.requests / connects, 2) if connects else None,
+            }
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.connects.clear()
+            self.requests = 0
+
+
+connection_stats = ConnectionStats()
+
+
+@receiver(connection_created)
+def count_connect(sender, connection, **kwargs):
+    connection_stats.count_connect(connection.alias)
+
+
+@receiver(request_finished)
+def count_request(sender, **kwargs):
+    connection_stats.count_request()
@@ -0,0 +1,110 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('config.sql')
+
+# Нормализация SQL: литералы и списки параметров заменяются, чтобы одинаковые по форме запросы совпадали
+NORMALIZE_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_sql(sql):
+    for pattern, replacement in NORMALIZE_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryRecorder:
+    """ Обёртка выполнения запросов (connection.execute_wrapper): считает запросы и их время """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+    def shapes(self):
+        """ Counter нормализованных запросов """
+        return Counter(normalize_sql(sql) for sql, _ in self.queries)
+
+    def duplicates(self, threshold):
+        """ Формы SELECT-запросов, выполненные не меньше threshold раз (признак N+1) """
+        return {shape: count for shape, count in self.shapes().items()
+                if count >= threshold and shape.upper().startswith('SELECT')}
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Учёт SQL-запросов каждого запроса к API.
+
+    Запросы ко всем базам перехватываются через connection.execute_wrapper: считается их количество, время
+    и повторяющиеся формы (N+1). Результат добавляется в заголовок Server-Timing и пишется в лог config.sql
+    одной JSON-строкой; медленные запросы и запросы с большим числом обращений к базе логируются
+    с нормализованным SQL. Включается настройкой SQL_INSTRUMENTATION; если она выключена, middleware
+    исключается из цепочки при запуске (MiddlewareNotUsed) и не добавляет накладных расходов.
+    Запросы, выполненные при чтении потокового ответа, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = settings.SQL_SLOW_REQUEST_MS
+        self.query_count_threshold = settings.SQL_QUERY_COUNT_THRESHOLD
+        self.duplicate_threshold = settings.SQL_DUPLICATE_THRESHOLD
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+
+        metrics = [
+            f'total;dur={total_ms:.2f}',
+            f'db;dur={db_ms:.2f};desc="{len(recorder.queries)} queries"',
+            f'app;dur={total_ms - db_ms:.2f}',
+        ]
+        if duplicates:
+            metrics.append(f'n-plus-one;desc="{sum(duplicates.values())} repeated queries"')
+        response['Server-Timing'] = ', '.join(metrics)
+
+        record = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'queries': len(recorder.queries),
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'duplicate_queries': sum(duplicates.values()),
+        }
+        logger.info(json.dumps(record))
+
+        if total_ms >= self.slow_request_ms or len(recorder.queries) >= self.query_count_threshold or duplicates:
+            record['sql'] = [{'sql': shape, 'count': count} for shape, count in recorder.shapes().most_common()]
+            logger.warning(json.dumps(record))
+        return response
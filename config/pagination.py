@@ -0,0 +1,249 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+        Курсорная (keyset) пагинация.
+
+        Вместо OFFSET следующая страница выбирается условием по значениям ключа сортировки последней строки,
+        а COUNT(*) не выполняется, поэтому глубокие страницы стоят столько же, сколько первая.
+        Курсор непрозрачен для клиента: это base64 от JSON с названием сортировки и значениями ключа.
+        Значения курсора приводятся к типам полей модели, поэтому изменённый клиентом курсор даёт 404, а не 500.
+
+        Параметры:
+        - orderings: Допустимые сортировки - название и поля; последнее поле должно быть уникальным (pk).
+        - default_ordering: Сортировка по умолчанию.
+        - ordering_query_param: Параметр запроса для выбора сортировки; '-' в начале - обратный порядок.
+        - annotations: Выражения, по которым можно сортировать под своими названиями (например, ранг значения).
+        """
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 15
+    orderings = {'pk': ('pk',)}
+    default_ordering = 'pk'
+    annotations = {}
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """ Асинхронный вариант paginate_queryset: страница загружается async ORM """
+        return self.set_page([item async for item in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        """ Запрос страницы с одной лишней строкой, по которой определяется наличие следующей страницы """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering_name, self.fields = self.get_ordering(request)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = bool(cursor and cursor['r'])
+        self.has_cursor = cursor is not None
+
+        # При движении назад выборка идёт в обратном порядке и затем разворачивается
+        fields = [self._invert(field) for field in self.fields] if self.reverse else list(self.fields)
+        names = {field.lstrip('-') for field in fields}
+        queryset = queryset.annotate(**{name: expression for name, expression in self.annotations.items()
+                                        if name in names})
+        queryset = queryset.order_by(*fields)
+        if cursor is not None:
+            queryset = queryset.filter(self._keyset_filter(fields, cursor['v']))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True,
+                                 cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request):
+        """ Возвращает название сортировки и список полей с учётом направления """
+        name = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        descending = name.startswith('-')
+        fields = self.orderings.get(name.lstrip('-'))
+        if fields is None:
+            name, descending, fields = self.default_ordering, False, self.orderings[self.default_ordering]
+        if descending:
+            fields = tuple(self._invert(field) for field in fields)
+        return name, fields
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], True))
+
+    def encode_cursor(self, item, reverse):
+        values = [self._to_json(self._get_value(item, field.lstrip('-'))) for field in self.fields]
+        payload = json.dumps({'o': self.ordering_name, 'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = cursor['v'], bool(cursor['r'])
+            valid = cursor['o'] == self.ordering_name and len(values) == len(self.fields)
+            if valid:
+                values = [self._to_python(model, field.lstrip('-'), value)
+                          for field, value in zip(self.fields, values)]
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError, ValidationError):
+            valid = False
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return {'v': values, 'r': reverse}
+
+    @staticmethod
+    def _keyset_filter(fields, values):
+        """ Условие "строка после курсора": (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... """
+        condition = Q()
+        equal = {}
+        for field, value in zip(fields, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _to_python(self, model, name, value):
+        """ Значение курсора в типе поля модели или выражения; ValueError, если ключ не может его принять """
+        try:
+            if name in self.annotations:
+                field = self.annotations[name].output_field
+            else:
+                field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(name)
+        # Поля ключей сортировки обязательные, а сравнение с NULL в условии курсора невозможно
+        if value is None or isinstance(value, (dict, list)):
+            raise ValueError(value)
+        return field.to_python(value)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _get_value(item, field):
+        if isinstance(item, dict):
+            return item['id'] if field == 'pk' and 'pk' not in item else item[field]
+        return getattr(item, field)
+
+    @staticmethod
+    def _to_json(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return value
+
+
+class KeysetSwitchMixin:
+    """
+        Переключение постраничного пагинатора в курсорный режим.
+
+        Курсорный режим включается параметром ?pagination=cursor (первая страница) или наличием ?cursor=,
+        без них пагинатор работает как обычно, поэтому клиенты с ?page= продолжают работать.
+        """
+    keyset_class = KeysetPagination
+    mode_query_param = 'pagination'
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_keyset_requested(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.is_keyset_requested(request):
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        self.keyset = None
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def is_keyset_requested(self, request):
+        return self.keyset_class is not None and (
+            request.query_params.get(self.mode_query_param) == 'cursor' or
+            self.keyset_class.cursor_query_param in request.query_params)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class AsyncPaginationMixin:
+    """
+        Асинхронный постраничный вывод (apaginate_queryset) для PageNumberPagination.
+
+        Количество строк считается через QuerySet.acount(), страница загружается async ORM;
+        номер страницы, ссылки и ответ формируются так же, как в PageNumberPagination.
+        """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()    # Paginator.count - кешируемое свойство, запрос не повторяется
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        return [item async for item in self.page.object_list]
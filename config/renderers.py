@@ -0,0 +1,45 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Возможная экспонента числа: orjson записывает её иначе, чем json (1e16 и 1e+16).
+# Шаблон начинается с литерала, поэтому поиск быстрый; цифра перед "e" проверяется отдельно.
+EXPONENT_RE = re.compile(rb'e[-+0-9]')
+
+
+def has_exponent(ret):
+    return any(ret[match.start() - 1:match.start()].isdigit() for match in EXPONENT_RE.finditer(ret))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson, ответ побайтно совпадает с JSONRenderer.
+
+    Как и стандартный рендерер, выводит JSON без пробелов и без экранирования символов вне ASCII,
+    экранируя только U+2028 и U+2029. Значения, которые orjson не сериализует сам (lazy-строки, Decimal),
+    передаются кодировщику DRF. Стандартный JSONRenderer используется, если orjson не установлен,
+    запрошен отступ (например, Browsable API), изменены настройки COMPACT_JSON/UNICODE_JSON/STRICT_JSON,
+    или orjson не может закодировать данные или записал бы числа иначе.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.ensure_ascii or not self.strict or \
+                self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+        if has_exponent(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как и JSONRenderer, экранируем разделители строк, недопустимые в JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
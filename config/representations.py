@@ -0,0 +1,237 @@
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from django.shortcuts import get_object_or_404
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+# Поля, у которых to_representation возвращает значение из базы без изменений
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField)
+
+
+class ValuesRepresentation:
+    """
+    Представление объектов сериализатора, построенное из строк QuerySet.values().
+
+    При создании поля сериализатора сопоставляются столбцам модели: простые поля выводятся как есть,
+    связи PrimaryKeyRelatedField - из столбца *_id, дата и время в формате ISO 8601 - с часовым поясом,
+    определённым один раз на набор строк, остальные поля - через to_representation поля сериализатора.
+    Поэтому порядок полей и форматирование совпадают с сериализатором, а экземпляры моделей
+    и обход полей сериализатора для каждой строки не нужны. Если сериализатор содержит поле, которое нельзя
+    сопоставить столбцу (вложенный сериализатор, SerializerMethodField, свойство модели), supported = False.
+    Если передан набор полей fields (?fields=, ?exclude=), представление и запрос содержат только их.
+    """
+
+    _instances = {}
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        """ Представление для serializer_class, создаётся один раз на класс сериализатора и набор полей """
+        key = (serializer_class, fields)
+        representation = cls._instances.get(key)
+        if representation is None:
+            representation = cls._instances[key] = cls(serializer_class, fields)
+        return representation
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+        self.model = serializer.Meta.model
+        self.fields = []
+        try:
+            for field in serializer._readable_fields:
+                self.fields.append((field.field_name, *self.compile(field)))
+        except (FieldDoesNotExist, ValueError):
+            self.supported = False
+        else:
+            self.supported = True
+        self.columns = list(dict.fromkeys(column for _, column, _ in self.fields))
+
+    def compile(self, field):
+        """ Возвращает столбец и фабрику функции преобразования значения (None - без преобразования) """
+        if len(field.source_attrs) != 1:
+            raise ValueError(f'Field "{field.field_name}" is not a model column.')
+        model_field = self.model._meta.get_field(field.source)
+        if not model_field.concrete or model_field.many_to_many:
+            raise ValueError(f'Field "{field.field_name}" is not a model column.')
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise ValueError(f'Field "{field.field_name}" uses pk_field.')
+            return model_field.attname, None
+        if type(field) in PLAIN_FIELDS or \
+                isinstance(field, serializers.IntegerField) and not getattr(field, 'coerce_to_string', False):
+            return model_field.attname, None
+        if isinstance(field, (serializers.Serializer, serializers.ListSerializer, serializers.RelatedField)):
+            raise ValueError(f'Field "{field.field_name}" is not a model column.')
+        if isinstance(field, serializers.DateTimeField) and \
+                str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601:
+            return model_field.attname, lambda: datetime_converter(field)
+        return model_field.attname, lambda: field.to_representation
+
+    def values(self, queryset, *extra):
+        """ QuerySet строк со столбцами представления и дополнительными столбцами (например, для ETag) """
+        return queryset.values(*dict.fromkeys([*self.columns, *extra]))
+
+    def represent(self, row):
+        return self.represent_many([row])[0]
+
+    def represent_many(self, rows):
+        converters = [(name, column, factory and factory()) for name, column, factory in self.fields]
+        result = []
+        for row in rows:
+            data = {}
+            for name, column, convert in converters:
+                value = row[column]
+                # Как и Serializer.to_representation, None выводится без преобразования
+                data[name] = value if convert is None or value is None else convert(value)
+            result.append(data)
+        return result
+
+
+def datetime_converter(field):
+    """
+    Преобразование даты и времени как в DateTimeField.to_representation для формата ISO 8601.
+
+    Часовой пояс поля (или текущий часовой пояс) определяется при создании функции, а не для каждого значения.
+    """
+    tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def convert(value):
+        if tz is None or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+@functools.cache
+def readable_fields(serializer_class):
+    """ Названия выводимых полей сериализатора в порядке вывода """
+    return tuple(field.field_name for field in serializer_class()._readable_fields)
+
+
+def select_fields(serializer_class, query_params, fields_param='fields', exclude_param='exclude'):
+    """
+    Набор полей ответа из параметров ?fields= и ?exclude= (названия через запятую).
+
+    Returns:
+        Кортеж названий полей в порядке сериализатора или None, если выводятся все поля.
+    Raises:
+        ValidationError: если указано поле, которого нет в сериализаторе.
+    """
+    available = readable_fields(serializer_class)
+    requested = {}
+    for param in (fields_param, exclude_param):
+        value = query_params.get(param)
+        if value is None:
+            continue
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: [f'Unknown field "{name}".' for name in unknown]})
+        requested[param] = set(names)
+
+    included = requested.get(fields_param, available)
+    excluded = requested.get(exclude_param, ())
+    selected = tuple(name for name in available if name in included and name not in excluded)
+    return None if selected == available else selected
+
+
+def keyset_columns(pagination_class):
+    """
+    Столбцы сортировок курсорной пагинации: значения последней строки страницы попадают в курсор.
+
+    Выражения (annotations) добавляет к запросу сама пагинация, поэтому они не входят в список.
+    """
+    keyset = getattr(pagination_class, 'keyset_class', None)
+    if keyset is None:
+        return []
+    return [field.lstrip('-') for fields in keyset.orderings.values() for field in fields
+            if field.lstrip('-') not in keyset.annotations]
+
+
+class SparseFieldsetMixin:
+    """
+    Сериализатор с выбором полей: аргумент fields оставляет только перечисленные поля.
+
+    Используется для чтения с ?fields= и ?exclude= (ValuesReadMixin).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ValuesReadMixin:
+    """
+    Быстрое чтение для GET-запросов списка и объекта в формате JSON.
+
+    Строки загружаются через .values() и преобразуются ValuesRepresentation для serializer_class,
+    результат совпадает с ответом сериализатора. Запись, Browsable API и сериализаторы с полями,
+    которые нельзя получить из столбцов, обрабатываются сериализатором как обычно.
+
+    Параметры ?fields= и ?exclude= (названия полей через запятую) оставляют в ответе только часть полей
+    (serializer_class должен поддерживать аргумент fields, см. SparseFieldsetMixin). Из базы тогда читаются
+    только столбцы этих полей, а также pk, отметка изменения и ключи курсорной пагинации: через .values()
+    или, при чтении моделей сериализатором, через .only(). ETag учитывает набор полей.
+    Используется вместе с config.conditional.ConditionalResponseMixin.
+    """
+    fast_read_formats = ('json',)
+
+    @functools.cached_property
+    def fieldset(self):
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        return select_fields(self.get_serializer_class(), self.request.query_params)
+
+    def get_representation_variant(self):
+        return self.fieldset
+
+    def get_values_representation(self, fast_read=True):
+        if self.request.method not in ('GET', 'HEAD') or fast_read and \
+                getattr(self.request.accepted_renderer, 'format', None) not in self.fast_read_formats:
+            return None
+        representation = ValuesRepresentation.for_serializer(self.get_serializer_class(), self.fieldset)
+        return representation if representation.supported else None
+
+    def get_read_columns(self):
+        """ Столбцы, которые читаются помимо полей ответа: для ETag и курсора следующей страницы """
+        return ['pk', self.modified_field, *keyset_columns(self.pagination_class)]
+
+    def get_read_queryset(self, queryset):
+        representation = self.get_values_representation()
+        if representation is not None:
+            return representation.values(queryset, *self.get_read_columns())
+
+        queryset = super().get_read_queryset(queryset)
+        if self.fieldset is not None:
+            # Модели читаются сериализатором: остальные столбцы откладываются
+            representation = self.get_values_representation(fast_read=False)
+            if representation is not None:
+                queryset = queryset.only(*representation.columns, *self.get_read_columns())
+        return queryset
+
+    def get_read_object(self):
+        representation = self.get_values_representation()
+        if representation is None:
+            return super().get_read_object()
+
+        # Как GenericAPIView.get_object, но объект - строка .values()
+        queryset = self.get_read_queryset(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, row)
+        return row
+
+    def get_read_data(self, objects, many=False):
+        representation = self.get_values_representation()
+        if representation is None:
+            if self.fieldset is None:
+                return super().get_read_data(objects, many)
+            return self.get_serializer(objects, many=many, fields=self.fieldset).data
+        if many:
+            return representation.represent_many(objects)
+        return representation.represent(objects)
@@ -0,0 +1,146 @@
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+
+from django.templatetags.static import static
+
+# Описание API для схемы OpenAPI; объект openapi.Info создаётся только при генерации схемы
+SCHEMA_INFO = {
+    'title': "Task Tracker Djando",
+    'default_version': 'v1',
+    'description': "The Task Tracker Django API provides endpoints for managing tasks, employees, "
+                   "and their interactions within the system.",
+    'terms_of_service': "https://www.google.com/policies/terms/",
+    'contact_email': "307heito@gmail.com",
+    'license_name': "BSD License",
+}
+
+SCHEMA_CONTENT_TYPES = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+}
+
+# Страницы документации: Swagger UI и ReDoc из статики drf_yasg, схема загружается из файла по schema_url
+SWAGGER_UI_HTML = """<!DOCTYPE html>
+<html>
+<head>
+  <title>{title}</title>
+  <meta charset="utf-8">
+  <link rel="stylesheet" href="{static}swagger-ui-dist/swagger-ui.css">
+</head>
+<body>
+  <div id="swagger-ui"></div>
+  <script src="{static}swagger-ui-dist/swagger-ui-bundle.js"></script>
+  <script src="{static}swagger-ui-dist/swagger-ui-standalone-preset.js"></script>
+  <script>
+    window.ui = SwaggerUIBundle({{
+      url: "{schema_url}", dom_id: "#swagger-ui", deepLinking: true,
+      presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset], layout: "StandaloneLayout"
+    }});
+  </script>
+</body>
+</html>
+"""
+
+REDOC_HTML = """<!DOCTYPE html>
+<html>
+<head>
+  <title>{title}</title>
+  <meta charset="utf-8">
+</head>
+<body>
+  <redoc spec-url="{schema_url}"></redoc>
+  <script src="{static}redoc/redoc.min.js"></script>
+</body>
+</html>
+"""
+
+DOCS_PAGES = {'swagger': SWAGGER_UI_HTML, 'redoc': REDOC_HTML}
+
+
+def schema_format(path):
+    """ Формат файла схемы по расширению: yaml для .yaml/.yml, иначе json """
+    return 'yaml' if str(path).endswith(('.yaml', '.yml')) else 'json'
+
+
+def get_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title=SCHEMA_INFO['title'],
+        default_version=SCHEMA_INFO['default_version'],
+        description=SCHEMA_INFO['description'],
+        terms_of_service=SCHEMA_INFO['terms_of_service'],
+        contact=openapi.Contact(email=SCHEMA_INFO['contact_email']),
+        license=openapi.License(name=SCHEMA_INFO['license_name']),
+    )
+
+
+def generate_schema(output_format='json'):
+    """ Строит схему OpenAPI всех эндпоинтов через drf_yasg и возвращает её в формате json или yaml """
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(get_info()).get_schema(request=None, public=True)
+    codec = OpenAPICodecYaml if output_format == 'yaml' else OpenAPICodecJson
+    return codec(validators=[]).encode(schema)
+
+
+def write_schema(path, content):
+    """ Записывает файл схемы атомарно: воркеры читают либо старую, либо новую схему целиком """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as file:
+        file.write(content)
+    os.replace(file.name, path)
+
+
+@functools.cache
+def live_schema_view():
+    """
+    Представление drf_yasg, строящее схему на каждый запрос.
+
+    Используется при API_SCHEMA_LIVE=True; drf_yasg импортируется при первом вызове.
+    """
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    return get_schema_view(get_info(), public=True, permission_classes=(permissions.AllowAny,))
+
+
+class SchemaFile:
+    """
+    Содержимое сгенерированного файла схемы с ETag.
+
+    Файл читается при первом запросе и перечитывается, только если изменились его время изменения
+    или размер (новая схема после generate_schema), поэтому запрос документации не читает файл заново.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.content = self.etag = None
+
+    def load(self, path):
+        """ Возвращает (содержимое, ETag) или (None, None), если файл не сгенерирован """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None, None
+        version = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if version != self.version:
+                with open(path, 'rb') as file:
+                    self.content = file.read()
+                self.etag = '"%s"' % hashlib.md5(self.content, usedforsecurity=False).hexdigest()
+                self.version = version
+            return self.content, self.etag
+
+
+schema_file = SchemaFile()
+
+
+def render_docs_page(ui, schema_url):
+    return DOCS_PAGES[ui].format(title=SCHEMA_INFO['title'], static=static('drf-yasg/'), schema_url=schema_url)
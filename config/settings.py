@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 import os
@@ -40,7 +42,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
-    'drf_yasg',
     'rest_framework',
     'django_filters',
     'rest_framework_simplejwt',
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +62,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Учёт SQL-запросов каждого запроса (config.middleware): заголовок Server-Timing и лог config.sql.
+# Запрос логируется с нормализованным SQL, если он выполнялся дольше SQL_SLOW_REQUEST_MS,
+# обратился к базе не меньше SQL_QUERY_COUNT_THRESHOLD раз или повторил одну форму запроса
+# не меньше SQL_DUPLICATE_THRESHOLD раз (N+1)
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION') == 'True'
+SQL_SLOW_REQUEST_MS = float(os.getenv('SQL_SLOW_REQUEST_MS') or 500)
+SQL_QUERY_COUNT_THRESHOLD = int(os.getenv('SQL_QUERY_COUNT_THRESHOLD') or 20)
+SQL_DUPLICATE_THRESHOLD = int(os.getenv('SQL_DUPLICATE_THRESHOLD') or 5)
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -83,6 +94,15 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Повторное использование соединений с базой:
+# - DATABASE_CONN_MAX_AGE: время жизни постоянного соединения в секундах (0 - новое соединение на каждый запрос,
+#   none - без ограничения). По умолчанию 60 под WSGI и 0 под ASGI (признак DJANGO_ASGI из config/asgi.py):
+#   асинхронные представления выполняют запросы к базе в потоках, которые не закрывают соединения
+#   по окончании запроса. Значение из окружения или .env действует и под ASGI;
+# - DATABASE_CONN_HEALTH_CHECKS: проверка соединения перед повторным использованием.
+DJANGO_ASGI = os.getenv('DJANGO_ASGI') == '1'
+DATABASE_CONN_MAX_AGE = (os.getenv('DATABASE_CONN_MAX_AGE') or ('0' if DJANGO_ASGI else '60')).lower()
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -91,9 +111,91 @@ DATABASES = {
         'HOST': os.getenv('DATABASE_HOST'),
         'PORT': 5432,
         'PASSWORD': os.getenv('DATABASE_PASSWORD'),
+        'CONN_MAX_AGE': None if DATABASE_CONN_MAX_AGE == 'none' else int(DATABASE_CONN_MAX_AGE),
+        'CONN_HEALTH_CHECKS': (os.getenv('DATABASE_CONN_HEALTH_CHECKS') or 'True') == 'True',
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# CACHE_BACKEND: locmem (по умолчанию, кеш внутри процесса) или file (общий для воркеров каталог CACHE_LOCATION).
+# С locmem сброс кеша ответов при записи действует только в процессе, выполнившем запись: другие воркеры
+# и серверы после команд manage.py (mark_overdue, load_dataset, reconcile_workload, seed_data) отдают старые
+# ответы до истечения RESPONSE_CACHE_TIMEOUT. Для нескольких воркеров нужен CACHE_BACKEND=file.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.getenv('CACHE_BACKEND') or 'locmem'],
+        'LOCATION': os.getenv('CACHE_LOCATION') or 'task-tracker',
+    },
+    # Корзины токенов ограничения скорости запросов (config.throttling) - всегда в памяти процесса
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-tracker-throttle',
+    },
+}
+
+# Время жизни ответов в кеше (в секундах); сброс при записи данных происходит сразу через смену версии
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT') or 300)
+
+REST_FRAMEWORK = {
+    # JSON через orjson (если установлен), ответ совпадает со стандартным JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # JWT проверяется первым и без запроса к базе (config.authentication); сессия - для Browsable API и админки
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'config.authentication.CachedJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    # Скорость запросов одного клиента к дорогим эндпоинтам (config.throttling.TokenBucketThrottle):
+    # число запросов - ёмкость корзины токенов, за период корзина пополняется целиком
+    'DEFAULT_THROTTLE_RATES': {
+        'important_tasks': os.getenv('THROTTLE_IMPORTANT_TASKS') or '30/min',
+        'busy_employees': os.getenv('THROTTLE_BUSY_EMPLOYEES') or '120/min',
+    },
+}
+
+# Одновременных запросов к дорогим эндпоинтам в одном процессе (config.throttling.AdmissionControl),
+# запросы сверх лимита сразу получают 503 с Retry-After: CONCURRENCY_RETRY_AFTER секунд.
+# Назначение важных задач блокирует строки задач, поэтому параллельные запросы только ждали бы друг друга
+CONCURRENCY_LIMITS = {
+    'important_tasks': int(os.getenv('CONCURRENCY_IMPORTANT_TASKS') or 1),
+    'busy_employees': int(os.getenv('CONCURRENCY_BUSY_EMPLOYEES') or 8),
+}
+CONCURRENCY_RETRY_AFTER = int(os.getenv('CONCURRENCY_RETRY_AFTER') or 1)
+
+# JWT: токены выдаются по /api/token/ и обновляются по /api/token/refresh/
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES') or 5)),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS') or 1)),
+    # Смена пароля отзывает выданные токены
+    'CHECK_REVOKE_TOKEN': True,
+}
+
+# Кеш пользователей по токену внутри процесса: деактивация и смена пароля в других воркерах
+# вступают в силу не позже чем через JWT_PRINCIPAL_CACHE_TTL секунд (0 - без кеша)
+JWT_PRINCIPAL_CACHE_TTL = float(os.getenv('JWT_PRINCIPAL_CACHE_TTL') or 30)
+JWT_PRINCIPAL_CACHE_SIZE = int(os.getenv('JWT_PRINCIPAL_CACHE_SIZE') or 10000)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config.sql': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -128,6 +230,18 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Документация API (config.schema): схема OpenAPI собирается командой generate_schema в файл API_SCHEMA_PATH
+# (.json или .yaml), /swagger/ и /redoc/ загружают её из файла. При API_SCHEMA_LIVE=True схема строится
+# drf_yasg на каждый запрос; в остальных случаях drf_yasg не импортируется воркерами, а статика
+# Swagger UI и ReDoc подключается из каталога пакета
+API_SCHEMA_LIVE = os.getenv('API_SCHEMA_LIVE') == 'True'
+API_SCHEMA_PATH = Path(os.getenv('API_SCHEMA_PATH') or BASE_DIR / 'openapi.json')
+
+if API_SCHEMA_LIVE:
+    INSTALLED_APPS.append('drf_yasg')
+else:
+    STATICFILES_DIRS = [Path(find_spec('drf_yasg').origin).parent / 'static']
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
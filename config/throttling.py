@@ -0,0 +1,184 @@
+import math
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+
+class ServiceOverloaded(APIException):
+    """ Превышен лимит одновременных запросов к эндпоинту; заголовок Retry-After берётся из wait """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many concurrent requests, try again later.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+class AdmissionControl:
+    """
+    Лимиты одновременных запросов по областям (throttle_scope) и счётчики отклонённых запросов текущего процесса.
+
+    Лимит области берётся из CONCURRENCY_LIMITS при каждом запросе (область без лимита не ограничивается),
+    запрос сверх лимита не ждёт освобождения места и сразу получает 503. Счётчики показывают, сколько запросов
+    пришло, сколько отклонено по скорости (429) и по параллельности (503) и сколько выполнялось одновременно.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.throttled = Counter()
+        self.shed = Counter()
+        self.in_flight = Counter()
+        self.peak_in_flight = Counter()
+
+    @staticmethod
+    def limit(scope):
+        return settings.CONCURRENCY_LIMITS.get(scope)
+
+    def count(self, counter, scope):
+        with self.lock:
+            counter[scope] += 1
+
+    def acquire(self, scope):
+        """ Занимает место в области; False, если все места заняты (запрос учитывается как отклонённый) """
+        limit = self.limit(scope)
+        with self.lock:
+            if limit is not None and self.in_flight[scope] >= limit:
+                self.shed[scope] += 1
+                return False
+            self.in_flight[scope] += 1
+            self.peak_in_flight[scope] = max(self.peak_in_flight[scope], self.in_flight[scope])
+            return True
+
+    def release(self, scope):
+        with self.lock:
+            self.in_flight[scope] -= 1
+
+    @contextmanager
+    def admit(self, scope):
+        """
+        Выполнение запроса в области scope.
+
+        Raises:
+            ServiceOverloaded: если все места области заняты.
+        """
+        if not self.acquire(scope):
+            raise ServiceOverloaded(wait=settings.CONCURRENCY_RETRY_AFTER)
+        try:
+            yield
+        finally:
+            self.release(scope)
+
+    def stats(self):
+        scopes = sorted(set(api_settings.DEFAULT_THROTTLE_RATES) | set(settings.CONCURRENCY_LIMITS)
+                        | set(self.requests))
+        result = {}
+        for scope in scopes:
+            requests = self.requests[scope]
+            rejected = self.throttled[scope] + self.shed[scope]
+            result[scope] = {
+                'rate': api_settings.DEFAULT_THROTTLE_RATES.get(scope),
+                'concurrency_limit': self.limit(scope),
+                'requests': requests,
+                'throttled': self.throttled[scope],
+                'shed': self.shed[scope],
+                'rejected_ratio': round(rejected / requests, 4) if requests else None,
+                'in_flight': self.in_flight[scope],
+                'peak_in_flight': self.peak_in_flight[scope],
+            }
+        return result
+
+    def reset_stats(self):
+        with self.lock:
+            for counter in (self.requests, self.throttled, self.shed):
+                counter.clear()
+            # Пиковое значение начинается с текущего числа выполняющихся запросов
+            self.peak_in_flight = Counter(self.in_flight)
+
+
+admission_control = AdmissionControl()
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """
+    Ограничение скорости запросов клиента (пользователя или IP-адреса) к области представления (throttle_scope).
+
+    Скорость задаётся как в DRF (DEFAULT_THROTTLE_RATES, например '30/min') и работает как корзина токенов:
+    ёмкость - число запросов, токены пополняются равномерно за период. Клиент может сразу отправить
+    до 'ёмкости' запросов, дальше - не чаще скорости пополнения, а Retry-After сообщает, через сколько секунд
+    появится следующий токен. В отличие от окна SimpleRateThrottle, в кеше хранится пара
+    (токены, время) вместо истории запросов. Корзины хранятся в локальном кеше процесса (CACHES['throttle']).
+    Область без скорости не ограничивается.
+    """
+    cache = caches['throttle']
+    lock = threading.Lock()
+
+    def get_rate(self):
+        # Скорость читается при каждом запросе, а не при импорте, поэтому учитывает изменения настроек
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+
+        self.now = self.timer()
+        with self.lock:
+            tokens, updated = self.cache.get(self.key, (self.num_requests, self.now))
+            self.tokens = min(self.num_requests, tokens + (self.now - updated) * self.refill_rate)
+            allowed = self.tokens >= 1
+            if allowed:
+                self.tokens -= 1
+            # Через duration секунд корзина заполняется целиком, и запись больше не нужна
+            self.cache.set(self.key, (self.tokens, self.now), self.duration)
+
+        if not allowed:
+            admission_control.count(admission_control.throttled, self.scope)
+        return allowed
+
+    @property
+    def refill_rate(self):
+        """ Токенов в секунду """
+        return self.num_requests / self.duration
+
+    def wait(self):
+        return max(math.ceil((1 - self.tokens) / self.refill_rate), 1)
+
+
+class AdmissionControlMixin:
+    """
+    Ограничение нагрузки на дорогой эндпоинт DRF по области throttle_scope.
+
+    Сначала проверяется скорость запросов клиента (TokenBucketThrottle, 429), затем лимит одновременных
+    запросов в процессе (AdmissionControl, 503). Оба ответа возвращаются до обращения к базе и содержат
+    Retry-After, занятое место освобождается при формировании ответа.
+    """
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = None
+    admitted = False
+
+    def initial(self, request, *args, **kwargs):
+        admission_control.count(admission_control.requests, self.throttle_scope)
+        super().initial(request, *args, **kwargs)
+        if not admission_control.acquire(self.throttle_scope):
+            raise ServiceOverloaded(wait=settings.CONCURRENCY_RETRY_AFTER)
+        self.admitted = True
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.admitted:
+            self.admitted = False
+            admission_control.release(self.throttle_scope)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -18,30 +18,38 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Task Tracker Djando",
-        default_version='v1',
-        description="The Task Tracker Django API provides endpoints for managing tasks, employees, "
-                    "and their interactions within the system.",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="307heito@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from config.views import CacheStatsView, DatabaseStatsView, AuthCacheStatsView, ThrottlingStatsView, SchemaDocsView, \
+    SchemaFileView
+
+if settings.API_SCHEMA_LIVE:
+    # Схема строится drf_yasg на каждый запрос (для разработки)
+    from config.schema import live_schema_view
+
+    schema_view = live_schema_view()
+    docs_urlpatterns = [
+        path('schema/', schema_view.without_ui(cache_timeout=0), name='schema'),
+        path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+        path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    ]
+else:
+    # Схема из файла, собранного командой generate_schema при сборке или развёртывании
+    docs_urlpatterns = [
+        path('schema/', SchemaFileView.as_view(), name='schema'),
+        path('swagger/', SchemaDocsView.as_view(ui='swagger'), name='schema-swagger-ui'),
+        path('redoc/', SchemaDocsView.as_view(ui='redoc'), name='schema-redoc'),
+    ]
 
 urlpatterns = ([
                    path('admin/', admin.site.urls),
                    path('api-auth/', include('rest_framework.urls')),
+                   path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+                   path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
                    path('', include('employees.urls', namespace='employees')),
                    path('', include('tasks.urls', namespace='tasks')),
-
-                   path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-                   path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-               ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT))
+                   path('stats/cache/', CacheStatsView.as_view(), name='cache-stats'),
+                   path('stats/db-pool/', DatabaseStatsView.as_view(), name='db-pool-stats'),
+                   path('stats/auth/', AuthCacheStatsView.as_view(), name='auth-stats'),
+                   path('stats/throttling/', ThrottlingStatsView.as_view(), name='throttling-stats'),
+               ] + docs_urlpatterns + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT))
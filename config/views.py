@@ -0,0 +1,175 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.urls import reverse
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView, exception_handler
+
+from config.authentication import principal_cache
+from config.cache import response_cache
+from config.database import connection_stats
+from config.renderers import FastJSONRenderer
+from config.schema import SCHEMA_CONTENT_TYPES, render_docs_page, schema_file, schema_format
+from config.throttling import admission_control
+
+
+class AsyncAPIView(View):
+    """
+        Базовое асинхронное представление для чтения под ASGI.
+
+        Обработчики объявляются как async def и загружают данные через async ORM (aget, acount, aiterator),
+        поэтому ожидание базы не занимает поток. Ответ формируется методом render() тем же FastJSONRenderer,
+        что и у представлений DRF, так что тело ответа совпадает с синхронным эндпоинтом. Исключения DRF
+        и Http404 преобразуются в ответы стандартным обработчиком исключений DRF. self.request оборачивается
+        в rest_framework.request.Request, чтобы пагинаторы DRF могли читать query_params.
+        Если задана область throttle_scope, запрос проходит throttle_classes и лимит одновременных запросов
+        (config.throttling) так же, как у представлений DRF с AdmissionControlMixin.
+    """
+    http_method_names = ['get', 'head', 'options']
+    renderer_class = FastJSONRenderer
+    filter_backends = ()
+    throttle_classes = ()
+    throttle_scope = None
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(Request(request), *args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if self.throttle_scope is None:
+                return await super().dispatch(request, *args, **kwargs)
+            admission_control.count(admission_control.requests, self.throttle_scope)
+            self.check_throttles(self.request)
+            with admission_control.admit(self.throttle_scope):
+                return await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            response = exception_handler(exc, {'view': self, 'request': self.request})
+            if response is None:
+                raise
+            headers = {name: value for name, value in response.items() if name != 'Content-Type'}
+            return self.render(response.data, status=response.status_code, headers=headers)
+
+    def check_throttles(self, request):
+        """ Как APIView.check_throttles: корзины токенов хранятся в памяти процесса, поэтому вызов не блокирует """
+        waits = []
+        for throttle in [throttle_class() for throttle_class in self.throttle_classes]:
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max(waits))
+
+    def filter_queryset(self, queryset):
+        """ Как GenericAPIView.filter_queryset: фильтры только строят запрос и не обращаются к базе """
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(self.renderer_class().render(data), status=status, headers=headers,
+                            content_type=self.renderer_class.media_type)
+
+
+class CacheStatsView(APIView):
+    """
+        Статистика кеша ответов API: текущая версия данных, количество попаданий и промахов, доля попаданий.
+
+        - GET: Получение статистики.
+        - DELETE: Сброс счётчиков попаданий и промахов.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+    def delete(self, request):
+        response_cache.reset_stats()
+        return Response(status=204)
+
+
+class DatabaseStatsView(APIView):
+    """
+        Статистика соединений с базой текущего процесса: настройки повторного использования соединений,
+        количество подключений и запросов.
+
+        - GET: Получение статистики.
+        - DELETE: Сброс счётчиков подключений и запросов.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(connection_stats.stats())
+
+    def delete(self, request):
+        connection_stats.reset()
+        return Response(status=204)
+
+
+class AuthCacheStatsView(APIView):
+    """
+        Статистика кеша пользователей JWT-аутентификации текущего процесса: время жизни и размер,
+        количество попаданий и промахов, доля попаданий.
+
+        - GET: Получение статистики.
+        - DELETE: Сброс счётчиков попаданий и промахов.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(principal_cache.stats())
+
+    def delete(self, request):
+        principal_cache.reset_stats()
+        return Response(status=204)
+
+
+class ThrottlingStatsView(APIView):
+    """
+        Статистика ограничения нагрузки на дорогие эндпоинты текущего процесса по областям: скорость и лимит
+        одновременных запросов, количество запросов, отклонённых по скорости (429) и по параллельности (503),
+        число выполняющихся запросов и его пиковое значение.
+
+        - GET: Получение статистики.
+        - DELETE: Сброс счётчиков.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(admission_control.stats())
+
+    def delete(self, request):
+        admission_control.reset_stats()
+        return Response(status=204)
+
+
+class SchemaFileView(View):
+    """
+        Схема OpenAPI из файла, собранного командой generate_schema (API_SCHEMA_PATH).
+
+        - GET: Содержимое файла с ETag, при совпадении If-None-Match - 304. Если файл не сгенерирован - 404.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request):
+        content, etag = schema_file.load(settings.API_SCHEMA_PATH)
+        if content is None:
+            return JsonResponse({'detail': 'API schema has not been generated, run manage.py generate_schema.'},
+                                status=404)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=SCHEMA_CONTENT_TYPES[schema_format(settings.API_SCHEMA_PATH)])
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+class SchemaDocsView(View):
+    """ Страница документации (Swagger UI или ReDoc), загружающая схему из SchemaFileView """
+    http_method_names = ['get', 'head', 'options']
+    ui = 'swagger'
+
+    def get(self, request):
+        return HttpResponse(render_docs_page(self.ui, reverse('schema')))
@@ -0,0 +1,19 @@
+import django_filters
+
+from employees.models import Employee
+
+
+class EmployeeFilter(django_filters.FilterSet):
+    """
+        Фильтры списка сотрудников.
+
+        Параметры:
+        - position: Должность (несколько значений через запятую).
+        - experience_min, experience_max: Диапазон стажа в годах (включительно).
+        """
+    position = django_filters.BaseInFilter(field_name='position')
+    experience = django_filters.RangeFilter()
+
+    class Meta:
+        model = Employee
+        fields = ['position', 'experience']
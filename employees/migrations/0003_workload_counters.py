@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+# Начальное заполнение счётчиков по существующим задачам
+REBUILD_COUNTERS_SQL = """
+    UPDATE employees_employee SET
+        tasks_in_progress = (SELECT COUNT(*) FROM tasks_task
+                             WHERE assigned_employee_id = employees_employee.id AND status = 'in_progress'),
+        tasks_completed = (SELECT COUNT(*) FROM tasks_task
+                           WHERE assigned_employee_id = employees_employee.id AND status = 'completed'),
+        tasks_overdue = (SELECT COUNT(*) FROM tasks_task
+                         WHERE assigned_employee_id = employees_employee.id AND status = 'overdue')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_employee_tasks_completed'),
+        ('tasks', '0003_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='tasks_in_progress',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tasks In Progress'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='tasks_overdue',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tasks Overdue'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['-tasks_in_progress', 'id'], name='employee_workload_idx'),
+        ),
+        migrations.RunSQL(REBUILD_COUNTERS_SQL, migrations.RunSQL.noop),
+    ]
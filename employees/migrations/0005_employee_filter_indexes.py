@@ -0,0 +1,24 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицу сотрудников
+    atomic = False
+
+    dependencies = [
+        ('employees', '0004_employee_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['position', 'id'], name='employee_position_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['experience', 'id'], name='employee_experience_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Employee(models.Model):
@@ -8,6 +9,11 @@ class Employee(models.Model):
     position = models.CharField(max_length=255, verbose_name='Position')
     experience = models.PositiveSmallIntegerField(verbose_name='Experience')  # years
     tasks_completed = models.PositiveSmallIntegerField(verbose_name='Tasks Completed', default=0)  # number of completed tasks
+    # Счётчики задач по статусам, обновляются при записи задач (employees.workload)
+    tasks_in_progress = models.PositiveIntegerField(verbose_name='Tasks In Progress', default=0)
+    tasks_overdue = models.PositiveIntegerField(verbose_name='Tasks Overdue', default=0)
+    # Отметка последнего изменения для ETag и Last-Modified (config.conditional)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Updated At')
 
     @property
     def fullname(self):
@@ -22,6 +28,19 @@ class Employee(models.Model):
     def __str__(self):
         return f"{self.fullname} - {self.position}"
 
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Employee'
         verbose_name_plural = 'Employees'
+        indexes = [
+            # Сортировка сотрудников по загруженности
+            models.Index(fields=['-tasks_in_progress', 'id'], name='employee_workload_idx'),
+            # Фильтры списка сотрудников (employees.filters)
+            models.Index(fields=['position', 'id'], name='employee_position_idx'),
+            models.Index(fields=['experience', 'id'], name='employee_experience_idx'),
+        ]
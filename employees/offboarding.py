@@ -0,0 +1,74 @@
+from collections import Counter
+
+from django.db import transaction
+
+from config.cache import response_cache
+from employees.models import Employee
+from employees.workload import apply_workload_deltas, workload_deltas
+from tasks import transitions
+from tasks.assignment import PRIORITY_LEVELS, load_stats, write_assignments
+from tasks.models import Task
+from tasks.services import WorkloadHeap
+
+
+class EmployeeOffboarding:
+    """
+    Передача открытых задач уходящего сотрудника остальным сотрудникам.
+
+    Открытые задачи - задачи сотрудника без времени выполнения (в работе и просроченные). Они обрабатываются
+    по убыванию приоритета и возрастанию срока, каждая достаётся наименее загруженному из остальных
+    сотрудников (tasks.services.WorkloadHeap: задачи в работе плюс уже переданные, в том числе просроченные),
+    поэтому нагрузка распределяется равномерно. Статус задачи вычисляется по общим правилам
+    (tasks.transitions): с истёкшим сроком - overdue, иначе in_progress. Если остальных сотрудников нет
+    или все загружены до max_load, задача остаётся без исполнителя (to_assign).
+
+    Всё выполняется в одной транзакции: задачи загружаются одним запросом с блокировкой строк,
+    сотрудники - одним запросом, задачи записываются одним UPDATE (tasks.assignment.write_assignments),
+    счётчики сотрудников - одним UPDATE, поэтому количество запросов не зависит от количества задач.
+    Закрытые задачи остаются за сотрудником, после передачи его можно удалить.
+    """
+
+    def __init__(self, employee, max_load=None, today=None):
+        self.employee = employee
+        self.max_load = max_load
+        self.today = today or transitions.today()
+
+    @transaction.atomic
+    def apply(self):
+        """ Передаёт задачи и возвращает итоги: количество задач, распределение по сотрудникам и нагрузку """
+        tasks = list(Task.objects.select_for_update()
+                     .filter(assigned_employee=self.employee, completion_time__isnull=True)
+                     .order_by('pk').values_list('pk', 'status', 'priority', 'deadline'))
+        loads = dict(Employee.objects.exclude(pk=self.employee.pk).values_list('pk', 'tasks_in_progress'))
+        heap = WorkloadHeap(loads)
+
+        task_ids, employee_ids, statuses, before = [], [], [], []
+        ordered = sorted(tasks, key=lambda task: (-PRIORITY_LEVELS.get(task[2], 1), task[3], task[0]))
+        for task_pk, task_status, _, deadline in ordered:
+            top = heap.peek()
+            employee_pk = top[1] if top is not None and (self.max_load is None or top[0] < self.max_load) else None
+            new_status = transitions.resolve_status(employee_pk, None, deadline, self.today)
+            if employee_pk is not None:
+                heap.add(employee_pk)
+            task_ids.append(task_pk)
+            employee_ids.append(employee_pk)
+            statuses.append(new_status)
+            before.append((self.employee.pk, task_status))
+
+        if task_ids:
+            write_assignments(task_ids, employee_ids, statuses)
+            # Запись в обход ORM не отправляет сигналы, поэтому счётчики и кеш ответов обновляются явно
+            apply_workload_deltas(workload_deltas(before=before, after=zip(employee_ids, statuses)))
+            response_cache.invalidate()
+
+        distribution = Counter(employee_pk for employee_pk in employee_ids if employee_pk is not None)
+        return {
+            'employee': self.employee.pk,
+            'tasks': len(task_ids),
+            'reassigned': sum(distribution.values()),
+            'unassigned': sorted(task_pk for task_pk, employee_pk in zip(task_ids, employee_ids)
+                                 if employee_pk is None),
+            'distribution': [{'employee': employee_pk, 'tasks': count}
+                             for employee_pk, count in sorted(distribution.items())],
+            'load_after': load_stats(heap.counts.values()),
+        }
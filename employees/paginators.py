@@ -1,7 +1,9 @@
 from rest_framework.pagination import PageNumberPagination
 
+from config.pagination import AsyncPaginationMixin, KeysetSwitchMixin
 
-class EmployeePaginator(PageNumberPagination):
+
+class EmployeePaginator(KeysetSwitchMixin, AsyncPaginationMixin, PageNumberPagination):
     """
         Пагинатор для списка сотрудников.
 
@@ -9,7 +11,32 @@ class EmployeePaginator(PageNumberPagination):
         - page_size: Количество элементов на странице.
         - page_size_query_param: Параметр запроса, который определяет количество элементов на странице.
         - max_page_size: Максимальное количество элементов на странице, которое можно указать в параметре запроса.
+        - keyset_class: Курсорная пагинация по pk, включаемая параметром ?pagination=cursor.
         """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 15
+
+
+class BusyEmployeePaginator(EmployeePaginator):
+    """
+        Пагинатор для списка занятых сотрудников.
+
+        Список разбивается на страницы, только если в запросе передан параметр page или page_size,
+        без них возвращается весь список, как и раньше. Курсорный режим не поддерживается:
+        список упорядочен по вычисляемой загруженности.
+        """
+    keyset_class = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def is_requested(self, request):
+        return self.page_query_param in request.query_params or self.page_size_query_param in request.query_params
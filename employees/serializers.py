@@ -1,15 +1,18 @@
 from rest_framework import serializers
 
+from config.representations import SparseFieldsetMixin
 from tasks.models import Task
 from tasks.serializers import TaskSerializer
 from .models import Employee
 from . import validators
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = '__all__'
+        # Счётчики задач поддерживаются автоматически при записи задач
+        read_only_fields = ['tasks_completed', 'tasks_in_progress', 'tasks_overdue']
 
     def validate(self, data):
         # Валидация поля experience
@@ -28,6 +31,12 @@ class EmployeeSerializer(serializers.ModelSerializer):
         return data
 
 
+class OffboardingOptionsSerializer(serializers.Serializer):
+    """ Параметры передачи задач уходящего сотрудника (employees.offboarding.EmployeeOffboarding) """
+
+    max_load = serializers.IntegerField(min_value=1, required=False, help_text='Maximum tasks per remaining employee')
+
+
 class SimpleEmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
@@ -48,8 +57,10 @@ class BusyEmployeeSerializer(serializers.ModelSerializer):
         Returns:
             Список сериализованных данных о текущих активных задачах сотрудника.
         """
-        # Получаем активные задачи сотрудника со статусом 'in_progress'
-        tasks = Task.objects.filter(assigned_employee=employee, status='in_progress')
+        # Активные задачи предзагружены представлением одним запросом (Prefetch в атрибут active_tasks)
+        tasks = getattr(employee, 'active_tasks', None)
+        if tasks is None:
+            tasks = Task.objects.filter(assigned_employee=employee, status='in_progress')
         # Сериализуем данные о задачах
         return TaskSerializer(tasks, many=True).data
 
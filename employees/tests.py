@@ -1,7 +1,19 @@
+import csv
+import datetime
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from config.middleware import QueryRecorder
+from employees.workload import rebuild_workload_counters
 from tasks.models import Task
 from .models import Employee
 
@@ -45,6 +57,18 @@ class EmployeeTestCase(APITestCase):
         self.assertEqual(response.data['results'][0]['first_name'], 'John')
         self.assertEqual(response.data['results'][0]['last_name'], 'Smith')
 
+    def test_export_employees_csv(self):
+        """ Тестирование потоковой выгрузки сотрудников в CSV """
+
+        response = self.client.get(reverse('employees:employees-export', kwargs={'export_format': 'csv'}),
+                                   HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'first_name', 'middle_name'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][1:4], ['John', 'Albert', 'Smith'])
+
     def test_update_employee(self):
         """ Тестирование обновление сотрудника"""
 
@@ -57,6 +81,31 @@ class EmployeeTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['experience'], updated_data['experience'])
 
+    def test_conditional_get_employee(self):
+        """ Тестирование смены ETag сотрудника при изменении его счётчиков задач """
+        url = f'/employees/{self.first_employee.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Task.objects.create(name="Write Docs", assigned_employee=self.first_employee, deadline="2024-08-10",
+                            priority="low", status='in_progress')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tasks_in_progress'], 1)
+
+    def test_sparse_fieldsets_employee(self):
+        """ Тестирование ?fields= списка сотрудников и If-Match с ETag частичного представления """
+        response = self.client.get('/employees/?fields=id,last_name')
+        self.assertEqual(response.json()['results'], [{'id': self.first_employee.id, 'last_name': 'Smith'},
+                                                      {'id': self.second_employee.id, 'last_name': 'Doe'}])
+
+        url = f'/employees/{self.first_employee.id}/'
+        etag = self.client.get(url + '?exclude=tasks_completed,tasks_in_progress,tasks_overdue')['ETag']
+        response = self.client.patch(url, {'experience': 6}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {'experience': 7}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
     def test_delete_employee(self):
         """ Тестирование удаление сотрудника"""
 
@@ -79,6 +128,14 @@ class EmployeeTestCase(APITestCase):
         self.assertIn("Names must contain only letters and hyphens.", response.content.decode())
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_filter_employees(self):
+        """ Тестирование фильтров списка сотрудников по должности и стажу """
+        response = self.client.get('/employees/?position=Designer,Manager')
+        self.assertEqual([employee['id'] for employee in response.json()['results']], [self.second_employee.id])
+
+        response = self.client.get('/employees/?experience_min=4&experience_max=10')
+        self.assertEqual([employee['id'] for employee in response.json()['results']], [self.first_employee.id])
+
 
 class BusyEmployeesTestCase(APITestCase):
     """ Тестирование представления BusyEmployeesView """
@@ -115,3 +172,210 @@ class BusyEmployeesTestCase(APITestCase):
         # Проверка, что сотрудник с наименьшим количеством активных задач идет последним
         self.assertEqual(response.data[-1]['fullname'], 'Johnson Alice')
         self.assertEqual(response.data[-1]['active_tasks_count'], 0)
+
+    def test_busy_employees_fixed_queries(self):
+        """ Тестирование того, что количество запросов не зависит от количества сотрудников """
+        for i in range(10):
+            employee = Employee.objects.create(first_name="Bob", last_name="Brown", position="Tester", experience=1)
+            Task.objects.create(name=f"Task {i}", assigned_employee=employee, deadline="2024-08-10",
+                                priority="low", status='in_progress')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('employees:busy_employees'))
+        self.assertEqual(len(response.data), 13)
+        self.assertEqual(len(response.data[0]['current_tasks']), 2)
+
+    def test_busy_employees_pagination(self):
+        """ Тестирование постраничного вывода занятых сотрудников """
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('employees:busy_employees'), {'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['fullname'], 'Doe John')
+
+    def test_busy_employees_cached(self):
+        """ Тестирование кеширования ответа и его сброса при изменении задач """
+        url = reverse('employees:busy_employees')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data[0]['active_tasks_count'], 2)
+
+        Task.objects.create(name="Design Mockups", assigned_employee=self.employee2, deadline="2024-09-01",
+                            priority="low", status='in_progress')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['active_tasks_count'], 2)
+        self.assertEqual(response.data[1]['active_tasks_count'], 2)
+
+    def test_cache_stats(self):
+        """ Тестирование статистики попаданий в кеш """
+        admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_authenticate(admin)
+        self.client.delete(reverse('cache-stats'))
+
+        self.client.get(reverse('employees:busy_employees'))
+        self.client.get(reverse('employees:busy_employees'))
+
+        response = self.client.get(reverse('cache-stats'))
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+        self.assertEqual(response.data['hit_rate'], 0.5)
+
+    @override_settings(SQL_INSTRUMENTATION=True)
+    def test_sql_instrumentation(self):
+        """ Тестирование заголовка Server-Timing и лога запросов к базе """
+        with self.assertLogs('config.sql', 'INFO') as logs:
+            response = self.client.get(reverse('employees:busy_employees'))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertNotIn('n-plus-one', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], 2)
+        self.assertEqual(record['duplicate_queries'], 0)
+
+    def test_detect_repeated_queries(self):
+        """ Тестирование обнаружения повторяющихся запросов (N+1) """
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for employee in Employee.objects.all():
+                Task.objects.filter(assigned_employee=employee).count()
+
+        duplicates = recorder.duplicates(threshold=3)
+        self.assertEqual(list(duplicates.values()), [3])
+        self.assertIn('WHERE "tasks_task"."assigned_employee_id" = ?', list(duplicates)[0])
+
+    def test_busy_employees_async(self):
+        """ Тестирование совпадения асинхронного списка занятых сотрудников с синхронным и его кеширования """
+        for query in ['', '?page_size=1&page=2']:
+            response = self.client.get(reverse('employees:busy_employees-async') + query)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            expected = self.client.get(reverse('employees:busy_employees') + query).content
+            self.assertEqual(response.content.replace(b'/async/', b'/'), expected)
+
+            self.assertEqual(self.client.get(reverse('employees:busy_employees-async') + query)['X-Cache'], 'HIT')
+
+
+class WorkloadCountersTestCase(APITestCase):
+    """ Тестирование счётчиков задач сотрудника """
+
+    def setUp(self) -> None:
+        self.employee1 = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        self.employee2 = Employee.objects.create(first_name="Jane", last_name="Smith", position="Designer",
+                                                 experience=11)
+        self.task = Task.objects.create(name="Develop Login Page", assigned_employee=self.employee1,
+                                        deadline="2024-08-10", priority="medium", status='in_progress')
+
+    def assertCounters(self, employee, in_progress, completed, overdue):
+        employee.refresh_from_db()
+        self.assertEqual((employee.tasks_in_progress, employee.tasks_completed, employee.tasks_overdue),
+                         (in_progress, completed, overdue))
+
+    def test_counters_follow_task_changes(self):
+        """ Тестирование обновления счётчиков при создании, переназначении, смене статуса и удалении задачи """
+        self.assertCounters(self.employee1, 1, 0, 0)
+
+        self.task.assigned_employee = self.employee2
+        self.task.save()
+        self.assertCounters(self.employee1, 0, 0, 0)
+        self.assertCounters(self.employee2, 1, 0, 0)
+
+        self.task.status = 'completed'
+        self.task.save(update_fields=['status'])
+        self.assertCounters(self.employee2, 0, 1, 0)
+
+        Task.objects.get(pk=self.task.pk).delete()
+        self.assertCounters(self.employee2, 0, 0, 0)
+
+    def test_counters_with_stale_instances(self):
+        """ Тестирование сохранения двух экземпляров задачи, загруженных до изменений друг друга """
+        first, second = Task.objects.get(pk=self.task.pk), Task.objects.get(pk=self.task.pk)
+
+        first.assigned_employee = self.employee2
+        first.save()
+        # Второй экземпляр загружен с исполнителем employee1 и статусом in_progress, в базе уже employee2
+        second.status = 'completed'
+        second.save()
+
+        self.assertCounters(self.employee1, 0, 1, 0)
+        self.assertCounters(self.employee2, 0, 0, 0)
+
+    def test_reconcile_workload(self):
+        """ Тестирование пересчёта счётчиков командой reconcile_workload """
+        Employee.objects.filter(pk=self.employee1.pk).update(tasks_in_progress=7, tasks_completed=3)
+
+        call_command('reconcile_workload', stdout=StringIO())
+        self.assertCounters(self.employee1, 1, 0, 0)
+
+
+class OffboardingTestCase(APITestCase):
+    """ Тестирование передачи задач уходящего сотрудника """
+
+    def setUp(self) -> None:
+        self.leaving = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        self.busy = Employee.objects.create(first_name="Jane", last_name="Smith", position="Designer", experience=11)
+        self.free = Employee.objects.create(first_name="Anna", last_name="Brown", position="Developer", experience=2)
+        self.today = datetime.date.today()
+        for i in range(3):
+            Task.objects.create(name=f"Busy {i}", assigned_employee=self.busy, priority="low", status='in_progress',
+                                deadline=self.today + datetime.timedelta(days=10))
+        self.open_tasks = [
+            Task.objects.create(name=f"Open {i}", assigned_employee=self.leaving, priority="medium",
+                                status='in_progress', deadline=self.today + datetime.timedelta(days=i + 1))
+            for i in range(5)]
+        self.overdue = Task.objects.create(name="Overdue", assigned_employee=self.leaving, priority="high",
+                                           status='overdue', deadline=self.today - datetime.timedelta(days=1))
+        self.completed = Task.objects.create(name="Completed", assigned_employee=self.leaving, priority="low",
+                                             status='completed', deadline=self.today,
+                                             completion_time=self.today - datetime.timedelta(days=1))
+        self.url = reverse('employees:employees-offboard', kwargs={'pk': self.leaving.pk})
+
+    def counters(self):
+        return {employee.pk: (employee.tasks_in_progress, employee.tasks_completed, employee.tasks_overdue)
+                for employee in Employee.objects.all()}
+
+    def test_offboard(self):
+        """ Открытые задачи распределяются по загруженности, статусы и счётчики соответствуют задачам """
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['tasks'], response.data['reassigned'], response.data['unassigned']), (6, 6, []))
+        # Свободный сотрудник получает задачи, пока его нагрузка не сравняется с нагрузкой занятого
+        self.assertEqual(response.data['distribution'], [{'employee': self.busy.pk, 'tasks': 2},
+                                                         {'employee': self.free.pk, 'tasks': 4}])
+
+        self.assertEqual(list(Task.objects.filter(assigned_employee=self.leaving)), [self.completed])
+        self.overdue.refresh_from_db()
+        self.assertEqual((self.overdue.assigned_employee, self.overdue.status), (self.free, 'overdue'))
+        self.assertEqual(set(Task.objects.filter(pk__in=[task.pk for task in self.open_tasks])
+                             .values_list('status', flat=True)), {'in_progress'})
+
+        # Счётчики совпадают с пересчитанными по задачам
+        counters = self.counters()
+        call_command('reconcile_workload', stdout=StringIO())
+        self.assertEqual(self.counters(), counters)
+        self.assertEqual(counters[self.leaving.pk], (0, 1, 0))
+
+    def test_offboard_max_load(self):
+        """ Задачи сверх max_load остаются без исполнителя """
+        response = self.client.post(self.url, {'max_load': 2})
+        self.assertEqual(response.data['reassigned'], 2)
+        self.assertEqual(len(response.data['unassigned']), 4)
+        self.assertEqual(Task.objects.filter(pk__in=response.data['unassigned'], status='to_assign',
+                                             assigned_employee__isnull=True).count(), 4)
+        self.assertEqual(self.client.post(self.url, {'max_load': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_offboard_fixed_queries(self):
+        """ Количество запросов не зависит от количества задач сотрудника """
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url)
+        other = Employee.objects.create(first_name="Max", last_name="Payne", position="Developer", experience=4)
+        Task.objects.bulk_create([Task(name=f"Bulk {i}", assigned_employee=other, priority="low", status='in_progress',
+                                       deadline=self.today) for i in range(300)])
+        rebuild_workload_counters()    # bulk_create не отправляет сигналы
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.post(reverse('employees:employees-offboard', kwargs={'pk': other.pk}))
+        self.assertEqual(response.data['reassigned'], 300)
+        self.assertEqual(len(many), len(few))
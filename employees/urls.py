@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from employees.apps import EmployeesConfig
-from employees.views import EmployeeViewSet, BusyEmployeesView
+from employees.views import EmployeeViewSet, BusyEmployeesView, EmployeeExportApi, BusyEmployeesAsyncView
 
 app_name = EmployeesConfig.name
 
@@ -10,6 +10,8 @@ router = DefaultRouter()
 router.register(r'employees', EmployeeViewSet, basename='employees')
 
 urlpatterns = [
+    path('employees/export/<str:export_format>/', EmployeeExportApi.as_view(), name='employees-export'),
     path('', include(router.urls)),
     path('busy-employees/', BusyEmployeesView.as_view(), name='busy_employees'),
+    path('async/busy-employees/', BusyEmployeesAsyncView.as_view(), name='busy_employees-async'),
 ]
@@ -1,33 +1,120 @@
-from django.db.models import Count, Q
-from rest_framework import viewsets
+from django.db.models import F, Prefetch
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from config.cache import AsyncCachedResponseMixin, CachedResponseMixin
+from config.conditional import ConditionalResponseMixin
+from config.representations import ValuesReadMixin
+from config.throttling import AdmissionControlMixin, TokenBucketThrottle
+from config.views import AsyncAPIView
+from employees.filters import EmployeeFilter
 from employees.models import Employee
-from employees.paginators import EmployeePaginator
-from employees.serializers import EmployeeSerializer, BusyEmployeeSerializer
+from employees.offboarding import EmployeeOffboarding
+from employees.paginators import EmployeePaginator, BusyEmployeePaginator
+from employees.serializers import EmployeeSerializer, BusyEmployeeSerializer, OffboardingOptionsSerializer
+from tasks.exporters import StreamingExportMixin
+from tasks.models import Task
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ValuesReadMixin, ConditionalResponseMixin, viewsets.ModelViewSet):
     """
         Представление для выполнения операций CRUD (Create, Read, Update, Delete) с сотрудниками.
+        Чтение поддерживает условные запросы (ETag, If-None-Match), обновление - проверку If-Match.
+        ?fields= и ?exclude= оставляют в ответе только часть полей, остальные столбцы не читаются из базы.
 
         serializer_class: Сериализатор, определяющий формат данных при взаимодействии с сотрудниками через API.
         queryset: Запрос к базе данных для получения всех сотрудников.
         pagination_class: Класс пагинации для разбиения списка сотрудников на страницы при выводе на клиенте.
+        filterset_class: Фильтры списка по должности и стажу (?position=, ?experience_min=, ?experience_max=).
+
+        POST /employees/<id>/offboard/: Передача открытых задач уходящего сотрудника остальным сотрудникам
+        по загруженности в одной транзакции (employees.offboarding.EmployeeOffboarding). max_load ограничивает
+        нагрузку получателей, задачи сверх неё остаются без исполнителя.
         """
     serializer_class = EmployeeSerializer
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.all().order_by('pk')
     pagination_class = EmployeePaginator
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EmployeeFilter
+
+    @action(detail=True, methods=['post'], serializer_class=OffboardingOptionsSerializer)
+    def offboard(self, request, pk=None):
+        options = self.get_serializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        result = EmployeeOffboarding(self.get_object(), max_load=options.validated_data.get('max_load')).apply()
+        return Response(result)
 
 
-class BusyEmployeesView(APIView):
-    """ Представление для получения списка занятых сотрудников и их активных задач. """
+class BusyEmployeesView(AdmissionControlMixin, CachedResponseMixin, generics.ListAPIView):
+    """
+        Представление для получения списка занятых сотрудников и их активных задач.
+
+        Активные задачи всех сотрудников загружаются одним запросом через Prefetch, поэтому количество
+        запросов не зависит от количества сотрудников. Поддерживается постраничный вывод (?page=, ?page_size=).
+        Ответы кешируются с версионированными ключами и сбрасываются при любой записи задач или сотрудников.
+        Частота и количество одновременных запросов ограничены (область busy_employees, config.throttling).
+        """
+    serializer_class = BusyEmployeeSerializer
+    throttle_scope = 'busy_employees'
+    pagination_class = BusyEmployeePaginator
+
+    def get_queryset(self):
+        # Получение списка занятых сотрудников, отсортированного по счётчику активных задач
+        active_tasks = Task.objects.filter(status='in_progress').order_by('pk')
+        return Employee.objects.annotate(
+            active_tasks_count=F('tasks_in_progress')
+        ).order_by('-tasks_in_progress', 'pk').prefetch_related(
+            Prefetch('tasks', queryset=active_tasks, to_attr='active_tasks'))
+
+
+class BusyEmployeesAsyncView(AsyncCachedResponseMixin, AsyncAPIView):
+    """
+        Асинхронное представление занятых сотрудников (для запуска под ASGI), ответ совпадает с /busy-employees/.
 
-    def get(self, request):
-        # Получение список занятых сотрудников и подсчёт количества их активных задач
-        busy_employees = Employee.objects.annotate(
-            active_tasks_count=Count('tasks', filter=Q(tasks__status='in_progress'))).order_by('-active_tasks_count')
-        # Сериализация данных о занятых сотрудниках
-        serializer = BusyEmployeeSerializer(busy_employees, many=True)
-        return Response(serializer.data)
+        Сотрудники загружаются async ORM (количество для ?page= - через acount()), их активные задачи -
+        одним запросом, который читается частями через aiterator() и распределяется по сотрудникам.
+        Ответы кешируются так же, как у синхронного представления. Ограничения нагрузки - как у синхронного
+        представления, но ответы из кеша их не расходуют.
+        """
+    serializer_class = BusyEmployeeSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'busy_employees'
+    pagination_class = BusyEmployeePaginator
+
+    async def get(self, request):
+        queryset = Employee.objects.annotate(
+            active_tasks_count=F('tasks_in_progress')
+        ).order_by('-tasks_in_progress', 'pk')
+        paginator = self.pagination_class()
+        employees = await paginator.apaginate_queryset(queryset, self.request, self)
+        paginated = employees is not None
+        if not paginated:
+            employees = [employee async for employee in queryset]
+
+        by_pk = {employee.pk: employee for employee in employees}
+        for employee in employees:
+            employee.active_tasks = []
+        if by_pk:
+            active_tasks = Task.objects.filter(status='in_progress', assigned_employee__in=by_pk).order_by('pk')
+            async for task in active_tasks.aiterator():
+                by_pk[task.assigned_employee_id].active_tasks.append(task)
+
+        data = self.serializer_class(employees, many=True).data
+        return self.render(paginator.get_paginated_response(data).data if paginated else data)
+
+
+class EmployeeExportApi(StreamingExportMixin, generics.GenericAPIView):
+    """
+        Представление для потоковой выгрузки всех сотрудников в NDJSON (/employees/export/ndjson/)
+        или CSV (/employees/export/csv/).
+        """
+    queryset = Employee.objects.all().order_by('pk')
+    filter_backends = EmployeeViewSet.filter_backends
+    filterset_class = EmployeeViewSet.filterset_class
+    export_name = 'employees'
+    export_fields = {field: field for field in [
+        'id', 'first_name', 'middle_name', 'last_name', 'position', 'experience',
+        'tasks_completed', 'tasks_in_progress', 'tasks_overdue',
+    ]}
@@ -0,0 +1,96 @@
+from collections import Counter, defaultdict
+
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from employees.models import Employee
+
+# Изменение счётчиков сотрудников одним запросом: массивы id и изменений разворачиваются в строки
+APPLY_DELTAS_SQL = """
+    UPDATE {table} AS e SET {assignments}, updated_at = %s
+    FROM unnest(%s::bigint[], {arrays}) AS d(id, {columns})
+    WHERE e.id = d.id
+"""
+
+# Счётчик сотрудника для каждого учитываемого статуса задачи
+STATUS_COUNTER_FIELDS = {
+    'in_progress': 'tasks_in_progress',
+    'completed': 'tasks_completed',
+    'overdue': 'tasks_overdue',
+}
+
+
+def workload_deltas(before=(), after=()):
+    """
+    Считает изменения счётчиков по состояниям задач до и после записи.
+
+    Args:
+        before: Пары (pk сотрудника, статус) задач до изменения.
+        after: Пары (pk сотрудника, статус) задач после изменения.
+    Returns:
+        Counter {(pk сотрудника, статус): изменение}.
+    """
+    deltas = Counter()
+    for key in before:
+        deltas[key] -= 1
+    for key in after:
+        deltas[key] += 1
+    return deltas
+
+
+def apply_workload_deltas(deltas):
+    """
+    Применяет изменения счётчиков.
+
+    На PostgreSQL все изменения применяются одним UPDATE с соединением по массивам изменений (unnest),
+    на других базах сотрудники с одинаковым набором изменений обновляются одним UPDATE через F()-выражения.
+    Количество запросов не зависит от числа задач. Счётчики входят в представление сотрудника,
+    поэтому вместе с ними обновляется отметка изменения updated_at.
+    """
+    changes = defaultdict(dict)
+    for (employee_id, status), delta in deltas.items():
+        field = STATUS_COUNTER_FIELDS.get(status)
+        if employee_id is None or field is None or not delta:
+            continue
+        changes[employee_id][field] = changes[employee_id].get(field, 0) + delta
+    changes = {employee_id: fields for employee_id, fields in changes.items() if any(fields.values())}
+    if not changes:
+        return
+
+    if connection.vendor == 'postgresql':
+        fields = list(STATUS_COUNTER_FIELDS.values())
+        columns = [[changes[employee_id].get(field, 0) for employee_id in changes] for field in fields]
+        sql = APPLY_DELTAS_SQL.format(
+            table=connection.ops.quote_name(Employee._meta.db_table),
+            assignments=', '.join(f'{field} = e.{field} + d.{field}' for field in fields),
+            arrays=', '.join(['%s::integer[]'] * len(fields)),
+            columns=', '.join(fields),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [timezone.now(), list(changes), *columns])
+        return
+
+    groups = defaultdict(list)
+    for employee_id, fields in changes.items():
+        groups[tuple(sorted((field, delta) for field, delta in fields.items() if delta))].append(employee_id)
+
+    for fields, employee_ids in groups.items():
+        Employee.objects.filter(pk__in=employee_ids).update(
+            **{field: F(field) + delta for field, delta in fields}, updated_at=timezone.now())
+
+
+def counter_subquery(status):
+    """ Подзапрос количества задач сотрудника с указанным статусом """
+    from tasks.models import Task  # локальный импорт: tasks зависит от employees
+
+    tasks = Task.objects.filter(assigned_employee=OuterRef('pk'), status=status).order_by()
+    return Coalesce(Subquery(tasks.values('assigned_employee').annotate(count=Count('pk')).values('count')), Value(0))
+
+
+def rebuild_workload_counters(queryset=None):
+    """ Пересчитывает счётчики задач всех сотрудников одним UPDATE и возвращает количество обновлённых строк """
+    queryset = Employee.objects.all() if queryset is None else queryset
+    return queryset.update(**{field: counter_subquery(status) for status, field in STATUS_COUNTER_FIELDS.items()},
+                           updated_at=timezone.now())
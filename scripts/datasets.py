@@ -0,0 +1,96 @@
+import csv
+import json
+from pathlib import Path
+
+FORMATS = ('json', 'ndjson', 'csv')
+
+
+def detect_format(path):
+    """ Определяет формат файла по расширению """
+    suffix = Path(path).suffix.lstrip('.').lower()
+    if suffix == 'jsonl':
+        return 'ndjson'
+    if suffix not in FORMATS:
+        raise ValueError(f'Cannot detect format of "{path}", pass it explicitly.')
+    return suffix
+
+
+def iter_json_array(file, chunk_size=1 << 16):
+    """
+    Потоково читает JSON-массив объектов верхнего уровня.
+
+    Файл читается кусками по chunk_size символов, и в памяти хранится только текущий
+    неразобранный хвост, поэтому размер файла не ограничен объёмом памяти.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, started, eof = '', 0, False, False
+
+    while True:
+        # Пропуск пробелов и разделителей между элементами
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] != '[':
+                    raise ValueError('Expected a JSON array at the top level.')
+                started, position = True, position + 1
+                continue
+            break
+
+        if position < len(buffer) and buffer[position] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer[position:].strip():
+                    raise
+                return
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        # Объект мог быть обрезан границей куска только если он заканчивается ровно на конце буфера
+        if end == len(buffer) and not eof:
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        position = end
+        yield item
+
+
+def normalize(record, model=None):
+    """
+    Приводит запись к виду (метка модели, поля).
+
+    Поддерживаются записи фикстур Django ({"model", "pk", "fields"}) и плоские записи
+    выгрузок NDJSON/CSV, для которых метка модели передаётся явно.
+    """
+    if 'fields' in record and 'model' in record:
+        fields = dict(record['fields'])
+        if 'pk' in record:
+            fields['id'] = record['pk']
+        return record['model'].lower(), fields
+    if model is None:
+        raise ValueError('Flat records require an explicit model label.')
+    return model, dict(record)
+
+
+def iter_records(path, fmt=None, model=None):
+    """ Потоково читает файл набора данных и возвращает записи (метка модели, поля) """
+    fmt = fmt or detect_format(path)
+    with open(path, encoding='utf-8', newline='' if fmt == 'csv' else None) as file:
+        if fmt == 'json':
+            records = iter_json_array(file)
+        elif fmt == 'ndjson':
+            records = (json.loads(line) for line in file if line.strip())
+        else:
+            # Пустая ячейка CSV означает NULL
+            records = ({key: value if value != '' else None for key, value in row.items()}
+                       for row in csv.DictReader(file))
+        for record in records:
+            yield normalize(record, model)
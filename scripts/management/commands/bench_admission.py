@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+
+from config.cache import response_cache
+from config.throttling import admission_control
+from scripts.management.commands.bench_endpoints import percentile
+
+
+class Command(BaseCommand):
+
+    help = 'Send concurrent requests to a rate and concurrency limited endpoint (config.throttling) on existing ' \
+           'data and report latency per response status and the shed request counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Requested path (/busy-employees/?page_size=15 by default)')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client')
+        parser.add_argument('--rate', help="Override the endpoint scope rate, e.g. '100/s' ('none' - unlimited)")
+        parser.add_argument('--concurrency', help="Override the endpoint scope concurrency limit ('none' - unlimited)")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep the response cache between requests (by default every request is cold)')
+
+    def handle(self, *args, **options):
+        path = options['path'] or reverse('employees:busy_employees') + '?page_size=15'
+        scope = getattr(resolve(urlsplit(path).path).func.view_class, 'throttle_scope', None)
+        if scope is None:
+            raise CommandError(f'{path} has no throttle_scope')
+
+        rates = dict(settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {}))
+        limits = dict(settings.CONCURRENCY_LIMITS)
+        for value, target in ((options['rate'], rates), (options['concurrency'], limits)):
+            if value is not None:
+                target[scope] = None if value == 'none' else value
+        if limits.get(scope) is not None:
+            limits[scope] = int(limits[scope])
+
+        results = defaultdict(list)
+        lock = threading.Lock()
+
+        def client_loop():
+            # Все потоки - один клиент с точки зрения ограничения скорости (один IP-адрес)
+            client = Client()
+            try:
+                for _ in range(options['requests']):
+                    if not options['warm_cache']:
+                        response_cache.bump()
+                    started = time.perf_counter()
+                    response = client.get(path, HTTP_ACCEPT='application/json')
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        results[response.status_code].append(elapsed)
+            finally:
+                connection.close()
+
+        with override_settings(ALLOWED_HOSTS=['testserver'], CONCURRENCY_LIMITS=limits,
+                               REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+            caches['throttle'].clear()
+            admission_control.reset_stats()
+            threads = [threading.Thread(target=client_loop) for _ in range(options['threads'])]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            stats = admission_control.stats()[scope]
+
+        total = sum(len(latencies) for latencies in results.values())
+        self.stdout.write(f'{path}: scope {scope}, rate {stats["rate"]}, concurrency limit '
+                          f'{stats["concurrency_limit"]}, {total} requests in {elapsed:.2f} s')
+        self.stdout.write(f'{"status":>6} {"count":>7} {"p50 ms":>8} {"p95 ms":>8}')
+        for status in sorted(results):
+            latencies = results[status]
+            self.stdout.write(f'{status:>6} {len(latencies):>7} {percentile(latencies, 50):8.2f} '
+                              f'{percentile(latencies, 95):8.2f}')
+        self.stdout.write(f'throttled {stats["throttled"]}, shed {stats["shed"]}, '
+                          f'peak in flight {stats["peak_in_flight"]}')
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from scripts.seeding import seed_dataset
+from tasks.assignment import AssignmentSolver
+
+
+class Command(BaseCommand):
+
+    help = 'Measure the bulk assignment solver (load, solve, apply) on a seeded dataset ' \
+           'and print the cost and load balance of the plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000, help='Seeded employees')
+        parser.add_argument('--tasks', type=int, default=40000,
+                            help='Seeded tasks (about a quarter of them are left to assign)')
+        parser.add_argument('--no-seed', action='store_true', help='Measure on existing data (see seed_data)')
+        parser.add_argument('--max-load', type=int, help='Maximum tasks in progress per employee')
+
+    def handle(self, *args, **options):
+        solver = AssignmentSolver(max_load=options['max_load'])
+        with transaction.atomic():
+            if not options['no_seed']:
+                seeded = seed_dataset(employees=options['employees'], tasks=options['tasks'], seed=0)
+                self.stdout.write('Seeded %d employees and %d tasks' % seeded)
+
+            started = time.perf_counter()
+            data = solver.load()
+            loaded = time.perf_counter()
+            plan = solver.solve(*data)
+            solved = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                solver.apply()
+            applied = time.perf_counter()
+
+            # Записанные назначения откатываются вместе с тестовыми данными
+            transaction.set_rollback(True)
+
+        summary = plan.summary()
+        self.stdout.write(f'{summary["tasks"]} tasks, {len(data[2])} employees')
+        self.stdout.write(f'load {(loaded - started) * 1000:.1f} ms, solve {(solved - loaded) * 1000:.1f} ms, '
+                          f'apply {(applied - solved) * 1000:.1f} ms ({len(captured)} queries)')
+        self.stdout.write(f'assigned {summary["assigned"]}, unassigned {summary["unassigned"]}, '
+                          f'parent matches {summary["parent_matches"]}, '
+                          f'experience matches {summary["experience_matches"]}')
+        self.stdout.write(f'cost {summary["cost"]}')
+        for name in ('load_before', 'load_after'):
+            self.stdout.write(f'{name}: {summary[name]}')
@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.authentication import principal_cache
+from scripts.management.commands.bench_endpoints import percentile
+
+
+class Command(BaseCommand):
+
+    help = 'Compare SQL queries and latency per request with session authentication, ' \
+           'JWT authentication without the principal cache and JWT with the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode')
+        parser.add_argument('--path', help='Requested path (admin-only /stats/cache/ by default: '
+                                           'it runs no queries of its own)')
+
+    def handle(self, *args, **options):
+        path = options['path'] or reverse('cache-stats')
+        self.stdout.write(f'Requesting {path}')
+        self.stdout.write(f'{"mode":<12} {"status":>6} {"queries/req":>11} {"p50 ms":>8} {"p95 ms":>8}')
+
+        original_ttl = principal_cache.ttl
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+                user = User.objects.create_superuser(username='bench-auth', password='bench-auth')
+                token = str(AccessToken.for_user(user))
+
+                session_client = Client()
+                session_client.force_login(user)
+                jwt_client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+                modes = [('anonymous', Client(), None), ('session', session_client, None),
+                         ('jwt', jwt_client, 0), ('jwt-cached', jwt_client, original_ttl or 30)]
+
+                for mode, client, ttl in modes:
+                    if ttl is not None:
+                        principal_cache.ttl = ttl
+                        principal_cache.clear()
+                    self.run_mode(mode, client, path, options['requests'])
+
+                transaction.set_rollback(True)
+        finally:
+            principal_cache.ttl = original_ttl
+            principal_cache.clear()
+
+    def run_mode(self, mode, client, path, requests):
+        latencies, queries = [], 0
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, HTTP_ACCEPT='application/json')
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries += len(captured)
+        if mode != 'anonymous' and response.status_code != 200:
+            raise CommandError(f'GET {path} as {mode} -> {response.status_code}')
+        self.stdout.write(f'{mode:<12} {response.status_code:>6} {queries / requests:11.2f} '
+                          f'{percentile(latencies, 50):8.2f} {percentile(latencies, 95):8.2f}')
@@ -0,0 +1,197 @@
+import asyncio
+import importlib.util
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+
+from scripts.management.commands.bench_endpoints import percentile
+from tasks.models import Task
+
+# Эндпоинты для сравнения: синхронное представление (WSGI) и асинхронное (ASGI) с одинаковым ответом
+ENDPOINTS = {
+    'task-list': ('tasks:task-list-create', 'tasks:task-list-async', ''),
+    'task-detail': ('tasks:task-read-update-delete', 'tasks:task-detail-async', ''),
+    'busy-employees': ('employees:busy_employees', 'employees:busy_employees-async', '?page_size=15'),
+}
+
+
+class HTTPClient:
+    """ Минимальный HTTP/1.1-клиент на asyncio с постоянным соединением (keep-alive) """
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """ Выполняет GET-запрос и возвращает код ответа, тело читается полностью """
+        return await asyncio.wait_for(self._get(path), self.timeout)
+
+    async def _get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host_header}\r\nAccept: application/json\r\n\r\n'
+                          .encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            headers['connection'] = 'close'
+
+        # Синхронные воркеры gunicorn закрывают соединение после каждого ответа
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+async def run_level(url, path, concurrency, requests, timeout):
+    """ Выполняет requests запросов concurrency параллельными клиентами, возвращает задержки и число ошибок """
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        client = HTTPClient(url, timeout)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await client.get(path)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                await client.close()
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += status != 200
+        await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+
+    help = 'Compare throughput and latency of sync views under WSGI and async views under ASGI ' \
+           'at several levels of concurrent clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000',
+                            help='Base URL of the WSGI deployment (sync views)')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001',
+                            help='Base URL of the ASGI deployment (async views)')
+        parser.add_argument('--start', action='store_true',
+                            help='Start gunicorn (WSGI) and uvicorn (ASGI) on the given URLs for the run')
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes of each server with --start')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Threads of each gunicorn worker with --start (gthread worker)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64],
+                            help='Numbers of concurrent clients')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and concurrency level')
+        parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, default=[],
+                            help='Only measure these endpoints (repeatable)')
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout of a single request in seconds')
+
+    def handle(self, *args, **options):
+        task_pk = Task.objects.order_by('pk').values_list('pk', flat=True).first()
+        if task_pk is None:
+            raise CommandError('No tasks found, fill the database first (see seed_data)')
+
+        deployments = [('wsgi', options['wsgi_url'].rstrip('/'), 0), ('asgi', options['asgi_url'].rstrip('/'), 1)]
+        endpoints = []
+        for name in options['endpoint'] or ENDPOINTS:
+            *url_names, query = ENDPOINTS[name]
+            kwargs = {'pk': task_pk} if name == 'task-detail' else {}
+            endpoints.append((name, [reverse(url_name, kwargs=kwargs) + query for url_name in url_names]))
+
+        servers = []
+        try:
+            if options['start']:
+                servers = [self.start_server(kind, url, options) for kind, url, _ in deployments]
+            for kind, url, index in deployments:
+                self.wait_ready(url, endpoints[0][1][index], options['timeout'])
+
+            self.stdout.write(f'{"deployment":<11} {"endpoint":<15} {"clients":>7} {"req/s":>9} '
+                              f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>6}')
+            for name, paths in endpoints:
+                for concurrency in options['concurrency']:
+                    for kind, url, index in deployments:
+                        latencies, errors, elapsed = asyncio.run(run_level(
+                            url, paths[index], concurrency, options['requests'], options['timeout']))
+                        self.write_row(kind, name, concurrency, latencies, errors, elapsed)
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait()
+
+    def write_row(self, kind, name, concurrency, latencies, errors, elapsed):
+        if not latencies:
+            self.stdout.write(f'{kind:<11} {name:<15} {concurrency:>7} {"-":>9} {"-":>8} {"-":>8} {"-":>8} {errors:>6}')
+            return
+        self.stdout.write(
+            f'{kind:<11} {name:<15} {concurrency:>7} {len(latencies) / elapsed:9.1f} '
+            f'{percentile(latencies, 50):8.2f} {percentile(latencies, 95):8.2f} {percentile(latencies, 99):8.2f} '
+            f'{errors:>6}')
+
+    @staticmethod
+    def start_server(kind, url, options):
+        """ Запускает gunicorn или uvicorn с приложением проекта на адресе url """
+        parts = urlsplit(url)
+        host, port = parts.hostname, str(parts.port or 80)
+        if kind == 'wsgi':
+            command = ['gunicorn', 'config.wsgi:application', '--bind', f'{host}:{port}',
+                       '--workers', str(options['workers']), '--threads', str(options['threads'])]
+        else:
+            command = ['uvicorn', 'config.asgi:application', '--host', host, '--port', port,
+                       '--workers', str(options['workers']), '--no-access-log']
+        if importlib.util.find_spec(command[0]) is None:
+            raise CommandError(f'{command[0]} is not installed (pip install {command[0]})')
+        return subprocess.Popen([sys.executable, '-m', *command], stdout=subprocess.DEVNULL)
+
+    @staticmethod
+    def wait_ready(url, path, timeout):
+        """ Ждёт, пока сервер не начнёт отвечать на запросы """
+        parts = urlsplit(url)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with socket.create_connection((parts.hostname, parts.port or 80), timeout=1):
+                    pass
+                latencies, errors, _ = asyncio.run(run_level(url, path, 1, 1, timeout))
+                if latencies and not errors:
+                    return
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise CommandError(f'{url}{path} is not available, start the server or use --start')
+            time.sleep(0.5)
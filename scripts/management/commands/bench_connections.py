@@ -0,0 +1,91 @@
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.test.client import FakePayload, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from config.database import connection_stats
+from scripts.management.commands.bench_endpoints import percentile
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+
+    help = 'Compare request latency and throughput with a new database connection per request ' \
+           'and with persistent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                            help='Numbers of concurrent worker threads')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode and concurrency level')
+        parser.add_argument('--path', help='Requested path (the first task by default)')
+        parser.add_argument('--conn-max-age', type=int, default=60,
+                            help='CONN_MAX_AGE of the persistent connections mode')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path is None:
+            task_pk = Task.objects.order_by('pk').values_list('pk', flat=True).first()
+            if task_pk is None:
+                raise CommandError('No tasks found, fill the database first (see seed_data) or pass --path')
+            path = reverse('tasks:task-read-update-delete', kwargs={'pk': task_pk})
+
+        # Режимы переключаются изменением настроек соединения: новые соединения потоков читают их при подключении
+        settings_dict = connections.settings['default']
+        original = settings_dict['CONN_MAX_AGE']
+        modes = [('new', 0), ('persistent', options['conn_max_age'])]
+
+        self.stdout.write(f'Requesting {path}')
+        self.stdout.write(f'{"mode":<11} {"threads":>7} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                          f'{"connects":>8} {"errors":>6}')
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for concurrency in options['concurrency']:
+                    for mode, conn_max_age in modes:
+                        settings_dict['CONN_MAX_AGE'] = conn_max_age
+                        self.run_mode(mode, path, concurrency, options['requests'])
+        finally:
+            settings_dict['CONN_MAX_AGE'] = original
+
+    def run_mode(self, mode, path, concurrency, requests):
+        """ Выполняет requests запросов в concurrency потоках через WSGI-обработчик Django """
+        handler = WSGIHandler()
+        environ = RequestFactory().get(path, HTTP_ACCEPT='application/json').environ
+        latencies, errors = [], []
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+
+        def worker():
+            # Как поток WSGI-сервера: request_started/request_finished закрывают соединения по CONN_MAX_AGE
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    response = handler({**environ, 'wsgi.input': FakePayload(b'')}, lambda status, headers: None)
+                    b''.join(response)
+                    response.close()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        connects = connection_stats.connects['default']
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        connects = connection_stats.connects['default'] - connects
+
+        self.stdout.write(
+            f'{mode:<11} {concurrency:>7} {len(latencies) / elapsed:9.1f} {percentile(latencies, 50):8.2f} '
+            f'{percentile(latencies, 95):8.2f} {percentile(latencies, 99):8.2f} {connects:>8} {len(errors):>6}')
@@ -0,0 +1,76 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from config.schema import generate_schema, live_schema_view, write_schema
+from config.views import SchemaFileView
+from scripts.management.commands.bench_endpoints import percentile
+
+# Запуск воркера: настройка Django, создание WSGI-приложения и загрузка всех URL (как при первом запросе)
+STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print((time.perf_counter() - started) * 1000, 'drf_yasg.views' in sys.modules)
+"""
+
+
+class Command(BaseCommand):
+
+    help = 'Compare worker startup time and API docs latency with live schema generation (drf_yasg) ' \
+           'and with the prebuilt schema file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=5, help='Worker startups per mode')
+        parser.add_argument('--requests', type=int, default=20, help='Schema requests per mode')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"mode":<8} {"startup p50 ms":>15} {"drf_yasg":>9} {"schema p50 ms":>14} '
+                          f'{"schema p95 ms":>14}')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'openapi.json')
+            write_schema(path, generate_schema())
+            request = RequestFactory().get('/schema/', HTTP_ACCEPT='application/json')
+            with override_settings(API_SCHEMA_PATH=path, ALLOWED_HOSTS=['testserver']):
+                views = {
+                    'live': live_schema_view().without_ui(cache_timeout=0),
+                    'file': SchemaFileView.as_view(),
+                }
+                for mode, view in views.items():
+                    startups, imported = self.measure_startup(mode == 'live', options['startups'])
+                    latencies = self.measure_requests(view, request, options['requests'])
+                    self.stdout.write(f'{mode:<8} {statistics.median(startups):15.1f} {str(imported):>9} '
+                                      f'{percentile(latencies, 50):14.2f} {percentile(latencies, 95):14.2f}')
+
+    @staticmethod
+    def measure_startup(live, count):
+        """ Время запуска воркера в отдельном процессе и признак загрузки drf_yasg """
+        env = {**os.environ, 'API_SCHEMA_LIVE': str(live), 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+        startups, imported = [], False
+        for _ in range(count):
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], env=env, check=True,
+                                    capture_output=True, text=True).stdout.split()
+            startups.append(float(output[-2]))
+            imported = output[-1] == 'True'
+        return startups, imported
+
+    @staticmethod
+    def measure_requests(view, request, count):
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = view(request)
+            if hasattr(response, 'render'):
+                response.render()
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
@@ -0,0 +1,181 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, reverse
+
+from config.cache import response_cache
+from employees import urls as employee_urls
+from employees.models import Employee
+from scripts.seeding import PRESETS, seed_dataset
+from tasks import dependencies, urls as task_urls
+from tasks.models import Task
+
+# Максимальное количество SQL-запросов на один запрос к эндпоинту. Количество не должно зависеть
+# от объёма данных, поэтому превышение бюджета означает N+1 или лишние запросы.
+QUERY_BUDGETS = {
+    'tasks:task-list-create': 2,                # COUNT(*) + страница
+    'tasks:task-list-create?cursor': 1,         # страница без COUNT(*)
+    'tasks:task-read-update-delete': 1,
+    'tasks:task-export': 1,
+    'tasks:task-subtree': 2,                    # существование задачи + рекурсивный запрос
+    'tasks:task-ancestors': 2,
+    'tasks:important_tasks': 7,                 # задачи + загруженность + bulk_update + счётчики + savepoint
+    'tasks:assignment-preview': 3,              # задачи + исполнители родительских задач + сотрудники
+    'employees:employees-list': 2,
+    'employees:employees-list?cursor': 1,
+    'employees:employees-detail': 1,
+    'employees:employees-export': 1,
+    'employees:busy_employees': 2,              # сотрудники + все активные задачи одним Prefetch
+    'employees:busy_employees?page': 3,
+    # Асинхронные представления: те же запросы через async ORM
+    'tasks:task-list-async': 2,
+    'tasks:task-list-async?cursor': 1,
+    'tasks:task-detail-async': 1,
+    'tasks:important_tasks-async': 7,
+    'employees:busy_employees-async': 2,
+    'employees:busy_employees-async?page': 3,
+}
+
+# Дополнительные варианты запросов эндпоинтов: суффикс названия в QUERY_BUDGETS и параметры запроса
+VARIANTS = {
+    'tasks:task-list-create': {'cursor': '?pagination=cursor&ordering=deadline'},
+    'employees:employees-list': {'cursor': '?pagination=cursor'},
+    'employees:busy_employees': {'page': '?page_size=15'},
+    'tasks:task-list-async': {'cursor': '?pagination=cursor&ordering=deadline'},
+    'employees:busy_employees-async': {'page': '?page_size=15'},
+}
+
+
+def iter_get_endpoints(urlpatterns, namespace):
+    """ Названия и параметры URL всех эндпоинтов, поддерживающих GET """
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_get_endpoints(pattern.url_patterns, namespace)
+            continue
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        params = set(pattern.pattern.regex.groupindex)
+        if 'format' in params:
+            continue    # дубли эндпоинтов роутера с суффиксом формата
+        view = pattern.callback
+        actions = getattr(view, 'actions', None)
+        view_class = getattr(view, 'cls', None) or getattr(view, 'view_class', None)
+        supports_get = 'get' in actions if actions is not None else hasattr(view_class, 'get')
+        if supports_get and view_class.__name__ != 'APIRootView':
+            yield f'{namespace}:{pattern.name}', params
+
+
+def percentile(values, percent):
+    """ Перцентиль методом ближайшего ранга """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+
+    help = 'Measure latency percentiles and SQL query counts of every GET endpoint and enforce query budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=PRESETS, default='1k',
+                            help='Size of the seeded dataset (rolled back afterwards)')
+        parser.add_argument('--employees', type=int, help='Override the number of seeded employees')
+        parser.add_argument('--tasks', type=int, help='Override the number of seeded tasks')
+        parser.add_argument('--chains', type=int, help='Override the number of seeded parent task chains')
+        parser.add_argument('--chain-depth', type=int, help='Override the depth of seeded chains')
+        parser.add_argument('--no-seed', action='store_true', help='Measure on existing data (see seed_data)')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per endpoint')
+        parser.add_argument('--endpoint', action='append', default=[],
+                            help='Only measure endpoints whose name contains this value (repeatable)')
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep the response cache between requests (by default every request is cold)')
+
+    def handle(self, *args, **options):
+        failures = []
+        # Тестовые данные и изменения, сделанные эндпоинтами (назначение важных задач), откатываются
+        with transaction.atomic():
+            if not options['no_seed']:
+                params = dict(PRESETS[options['preset']])
+                for name in ('employees', 'tasks', 'chains', 'chain_depth'):
+                    if options[name] is not None:
+                        params[name] = options[name]
+                self.stdout.write('Seeded %d employees and %d tasks' % seed_dataset(seed=0, **params))
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE tasks_task; ANALYZE employees_employee')
+
+            client = Client()
+            self.stdout.write(f'{"endpoint":<45} {"status":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                              f'{"queries":>8} {"budget":>7}')
+            # Ограничения нагрузки (config.throttling) отключены: измеряется работа самих эндпоинтов
+            without_limits = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+            with override_settings(ALLOWED_HOSTS=['testserver'], REST_FRAMEWORK=without_limits, CONCURRENCY_LIMITS={}):
+                for name, url in self.get_endpoints(options['endpoint']):
+                    status, latencies, queries = self.measure(client, url, options['requests'], options['warm_cache'])
+                    budget = QUERY_BUDGETS.get(name)
+                    self.stdout.write(
+                        f'{name:<45} {status:>6} {percentile(latencies, 50):8.2f} {percentile(latencies, 95):8.2f} '
+                        f'{percentile(latencies, 99):8.2f} {queries:>8} {"-" if budget is None else budget:>7}')
+
+                    if budget is None:
+                        failures.append(f'{name}: no query budget')
+                    elif queries > budget:
+                        failures.append(f'{name}: {queries} queries, budget {budget}')
+                    if status >= 400:
+                        failures.append(f'{name}: HTTP {status}')
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Query budgets exceeded:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All endpoints are within their query budgets'))
+
+    def get_endpoints(self, filters):
+        """ Список (название, URL) всех GET-эндпоинтов tasks.urls и employees.urls с вариантами запросов """
+        # Для зависимостей берётся последняя задача самой поздней цепочки и корень этой цепочки
+        leaf = Task.objects.filter(parent_task__isnull=False, linked_task__isnull=True) \
+            .order_by('-pk').values_list('pk', flat=True).first()
+        sample_pk = {
+            'tasks:task-subtree': dependencies.ancestor_ids(leaf)[-1] if leaf else 0,
+            'tasks:task-ancestors': leaf or 0,
+        }
+        first_pk = {model: model.objects.order_by('pk').values_list('pk', flat=True).first() or 0
+                    for model in (Task, Employee)}
+
+        endpoints = []
+        for module in (task_urls, employee_urls):
+            for name, params in iter_get_endpoints(module.urlpatterns, module.app_name):
+                kwargs = {}
+                if 'export_format' in params:
+                    kwargs['export_format'] = 'ndjson'
+                if 'pk' in params:
+                    model = Task if module is task_urls else Employee
+                    kwargs['pk'] = sample_pk.get(name, first_pk[model])
+                url = reverse(name, kwargs=kwargs)
+                endpoints.append((name, url))
+                endpoints.extend((f'{name}?{suffix}', url + query) for suffix, query in VARIANTS.get(name, {}).items())
+
+        return [(name, url) for name, url in endpoints
+                if not filters or any(value in name for value in filters)]
+
+    @staticmethod
+    def measure(client, url, requests, warm_cache):
+        """ Возвращает код ответа, задержки в миллисекундах и максимальное количество запросов к базе """
+        latencies, queries, status = [], 0, None
+        for _ in range(requests):
+            if not warm_cache:
+                response_cache.bump()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    # Потоковый ответ формируется при чтении содержимого
+                    b''.join(response.streaming_content)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(captured.captured_queries))
+            status = response.status_code
+        return status, latencies, queries
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from scripts.management.commands.bench_endpoints import percentile
+from scripts.seeding import PRESETS, seed_dataset
+from tasks.models import Task
+
+# Наборы полей: название и параметры запроса
+TASK_FIELDSETS = {
+    'all': '',
+    'mobile': '?fields=id,name,status,deadline',
+    'no-description': '?exclude=description',
+}
+EMPLOYEE_FIELDSETS = {
+    'all': '',
+    'names': '?fields=id,first_name,last_name,position',
+}
+
+
+class Command(BaseCommand):
+
+    help = 'Compare payload size, SQL time and latency of task and employee lists with all fields ' \
+           'and with sparse fieldsets (?fields=, ?exclude=) on a seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=PRESETS, default='1k',
+                            help='Size of the seeded dataset (rolled back afterwards)')
+        parser.add_argument('--description-length', type=int, default=2000,
+                            help='Length of the seeded task descriptions')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per fieldset')
+        parser.add_argument('--page-size', type=int, default=15, help='Page size of the lists')
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            self.stdout.write('Seeded %d employees and %d tasks' % seed_dataset(seed=0, **PRESETS[options['preset']]))
+            Task.objects.update(description='x' * options['description_length'])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE tasks_task; ANALYZE employees_employee')
+
+            client = Client()
+            self.stdout.write(f'{"endpoint":<10} {"fieldset":<15} {"bytes":>8} {"sql p50 ms":>11} '
+                              f'{"p50 ms":>8} {"p95 ms":>8}')
+            for endpoint, name, fieldsets in (('tasks', 'tasks:task-list-create', TASK_FIELDSETS),
+                                              ('employees', 'employees:employees-list', EMPLOYEE_FIELDSETS)):
+                # Курсорная пагинация: без COUNT(*) время SQL - это чтение самой страницы
+                url = f'{reverse(name)}?pagination=cursor&page_size={options["page_size"]}'
+                for fieldset, query in fieldsets.items():
+                    size, sql, latencies = self.measure(client, url + query.replace('?', '&'), options['requests'])
+                    self.stdout.write(f'{endpoint:<10} {fieldset:<15} {size:>8} {percentile(sql, 50):11.2f} '
+                                      f'{percentile(latencies, 50):8.2f} {percentile(latencies, 95):8.2f}')
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(client, url, requests):
+        """ Возвращает размер ответа в байтах, время SQL-запросов и задержки в миллисекундах """
+        sql, latencies, size = [], [], 0
+        timings = []
+
+        def timed(execute, query, params, many, context):
+            # Время запроса с чтением строк курсором измеряется точнее, чем в connection.queries (до мс)
+            started = time.perf_counter()
+            try:
+                return execute(query, params, many, context)
+            finally:
+                timings.append((time.perf_counter() - started) * 1000)
+
+        with connection.execute_wrapper(timed):
+            for _ in range(requests):
+                timings.clear()
+                started = time.perf_counter()
+                response = client.get(url, HTTP_ACCEPT='application/json')
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'GET {url} -> {response.status_code}')
+                sql.append(sum(timings))
+                size = len(response.content)
+        return size, sql, latencies
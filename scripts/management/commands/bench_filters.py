@@ -0,0 +1,117 @@
+import datetime
+import itertools
+import re
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from scripts.management.commands.bench_endpoints import percentile
+from scripts.management.commands.explain_endpoints import SEQ_SCAN_RE, explain_sql
+from scripts.seeding import PRESETS, WORDS, seed_dataset
+from tasks.models import Task
+
+INDEX_RE = re.compile(r'(?:Index Scan|Index Only Scan|Index Scan Backward) using (\w+)|Bitmap Index Scan on (\w+)')
+
+# Фильтры списка задач (tasks.filters.TaskFilter) и значения параметров, подставляемые из данных
+FILTERS = {
+    'status': 'status=in_progress',
+    'priority': 'priority=high',
+    'deadline': 'deadline_after={today}&deadline_before={week}',
+    'assignee': 'assigned_employee={employee}',
+    'parent': 'parent_task={parent}',
+    'unassigned': 'unassigned=true',
+    'search': 'search={word}',
+}
+ORDERINGS = ['pk', 'deadline', '-priority']
+MODES = {'page': '', 'cursor': '&pagination=cursor'}
+
+
+class Command(BaseCommand):
+
+    help = 'Measure every combination of task list filters, orderings and pagination modes ' \
+           'and report the indexes used by their queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=PRESETS, default='1k',
+                            help='Size of the seeded dataset (rolled back afterwards)')
+        parser.add_argument('--no-seed', action='store_true', help='Measure on existing data (see seed_data)')
+        parser.add_argument('--combination-size', type=int, default=2,
+                            help='Maximum number of filters combined in one request')
+        parser.add_argument('--requests', type=int, default=3, help='Requests per combination')
+        parser.add_argument('--strict', action='store_true',
+                            help='Exit with an error if any query scans the tasks table sequentially')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN output is only interpreted for PostgreSQL.')
+
+        seq_scans = []
+        with transaction.atomic():
+            if not options['no_seed']:
+                seeded = seed_dataset(seed=0, **PRESETS[options['preset']])
+                self.stdout.write('Seeded %d employees and %d tasks' % seeded)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE tasks_task')
+
+            values = self.get_values()
+            client = Client()
+            self.stdout.write(f'{"filters":<28} {"ordering":<10} {"mode":<7} {"rows":>6} {"p50 ms":>8} '
+                              f'{"queries":>7}  indexes')
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for size in range(1, options['combination_size'] + 1):
+                    for names in itertools.combinations(FILTERS, size):
+                        query = '&'.join(FILTERS[name] for name in names).format(**values)
+                        for ordering, (mode, mode_query) in itertools.product(ORDERINGS, MODES.items()):
+                            url = f'{reverse("tasks:task-list-create")}?{query}&ordering={ordering}{mode_query}'
+                            label = ','.join(names)
+                            if self.measure(client, url, label, ordering, mode, options['requests']):
+                                seq_scans.append(f'{label} ordering={ordering} {mode}')
+
+            transaction.set_rollback(True)
+
+        if seq_scans:
+            for combination in seq_scans:
+                self.stdout.write(self.style.WARNING(f'Sequential scan on tasks_task: {combination}'))
+            if options['strict']:
+                raise CommandError(f'{len(seq_scans)} filter combinations scan the tasks table sequentially.')
+        else:
+            self.stdout.write(self.style.SUCCESS('All filter combinations use indexes.'))
+
+    @staticmethod
+    def get_values():
+        """ Значения фильтров: сотрудник и родительская задача с наибольшим числом задач, неделя от сегодня """
+        today = datetime.date.today()
+        busiest = Task.objects.filter(assigned_employee__isnull=False).values('assigned_employee') \
+            .annotate(count=Count('pk')).order_by('-count').values_list('assigned_employee', flat=True).first()
+        parent = Task.objects.filter(parent_task__isnull=False).values('parent_task') \
+            .annotate(count=Count('pk')).order_by('-count').values_list('parent_task', flat=True).first()
+        return {'today': today, 'week': today + datetime.timedelta(days=7), 'employee': busiest or 0,
+                'parent': parent or 0, 'word': WORDS[0]}
+
+    def measure(self, client, url, label, ordering, mode, requests):
+        """ Выводит задержку и индексы запросов комбинации, возвращает True при последовательном сканировании """
+        latencies = []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} -> {response.status_code}')
+
+        indexes, seq_scan = [], False
+        for query in captured.captured_queries:
+            plan = explain_sql(query['sql'])
+            indexes.extend(name for match in INDEX_RE.findall(plan) for name in match if name)
+            seq_scan = seq_scan or 'tasks_task' in SEQ_SCAN_RE.findall(plan)
+        data = response.json()
+        rows = data['count'] if 'count' in data else len(data['results'])
+
+        self.stdout.write(f'{label:<28} {ordering:<10} {mode:<7} {rows:>6} {percentile(latencies, 50):8.2f} '
+                          f'{len(captured):>7}  {"SEQ SCAN " if seq_scan else ""}{",".join(dict.fromkeys(indexes))}')
+        return seq_scan
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import Employee
+from employees.offboarding import EmployeeOffboarding
+from employees.workload import rebuild_workload_counters
+from scripts.seeding import PRESETS, seed_dataset
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+
+    help = 'Measure SQL queries and time of offboarding an employee holding many open tasks on a seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=PRESETS, default='100k',
+                            help='Size of the seeded dataset (rolled back afterwards)')
+        parser.add_argument('--tasks', type=int, default=5000,
+                            help='Open tasks moved to the offboarded employee before the measurement')
+        parser.add_argument('--max-load', type=int, help='Maximum tasks per remaining employee')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write('Seeded %d employees and %d tasks' % seed_dataset(seed=0, **PRESETS[options['preset']]))
+            employee = Employee.objects.order_by('pk').first()
+            open_tasks = Task.objects.filter(completion_time__isnull=True, status__in=['in_progress', 'overdue'])
+            Task.objects.filter(pk__in=open_tasks.values('pk')[:options['tasks']]).update(assigned_employee=employee)
+            rebuild_workload_counters()
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE tasks_task; ANALYZE employees_employee')
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                result = EmployeeOffboarding(employee, max_load=options['max_load']).apply()
+                elapsed = (time.perf_counter() - started) * 1000
+
+            self.stdout.write(f'Offboarded employee {employee.pk}: {result["tasks"]} open tasks, '
+                              f'{result["reassigned"]} reassigned to {len(result["distribution"])} employees, '
+                              f'{len(result["unassigned"])} left unassigned')
+            self.stdout.write(f'{len(captured)} queries, {elapsed:.1f} ms')
+            self.stdout.write(f'Load after: {result["load_after"]}')
+            transaction.set_rollback(True)
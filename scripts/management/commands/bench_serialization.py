@@ -0,0 +1,85 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import FastJSONRenderer, orjson
+from config.representations import ValuesRepresentation
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from scripts.seeding import seed_dataset
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+
+    help = 'Compare per-row cost of ModelSerializer + JSONRenderer with the .values() read path + FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Number of rows serialized per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of runs, the best one is reported')
+        parser.add_argument('--seed-tasks', type=int, default=0,
+                            help='Seed this many synthetic tasks before measuring (rolled back afterwards)')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, FastJSONRenderer uses the stdlib'))
+
+        # Тестовые данные откатываются после измерений
+        with transaction.atomic():
+            if options['seed_tasks']:
+                seeded = seed_dataset(tasks=options['seed_tasks'])
+                self.stdout.write('Seeded %d employees and %d tasks' % seeded)
+
+            for model, serializer_class in ((Task, TaskSerializer), (Employee, EmployeeSerializer)):
+                self.compare(model.objects.order_by('pk')[:options['rows']], serializer_class)
+
+            transaction.set_rollback(True)
+
+    def compare(self, queryset, serializer_class):
+        representation = ValuesRepresentation(serializer_class)
+        serializer_path = (
+            lambda: list(queryset.all()),
+            lambda objects: serializer_class(objects, many=True).data,
+            JSONRenderer().render,
+        )
+        values_path = (
+            lambda: list(representation.values(queryset)),
+            representation.represent_many,
+            FastJSONRenderer().render,
+        )
+
+        name = queryset.model._meta.label
+        rows, slow, slow_body = self.measure(*serializer_path)
+        _, fast, fast_body = self.measure(*values_path)
+        if not rows:
+            self.stdout.write(f'{name}: no rows, use --seed-tasks')
+            return
+
+        self.stdout.write(f'{name}: {rows} rows, identical output: {"yes" if slow_body == fast_body else "NO"}')
+        for stage in ('load', 'serialize', 'render', 'total'):
+            speedup = slow[stage] / fast[stage] if fast[stage] else 0
+            self.stdout.write(f'  {stage:<10} {slow[stage] / rows * 1e6:8.2f} -> {fast[stage] / rows * 1e6:8.2f} '
+                              f'us/row (x{speedup:.1f})')
+
+    def measure(self, load, serialize, render):
+        """ Возвращает количество строк, лучшее по сумме время каждого этапа и полученный ответ """
+        best, body, rows = None, None, 0
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            objects = load()
+            loaded = time.perf_counter()
+            data = serialize(objects)
+            serialized = time.perf_counter()
+            body = render(data)
+            rendered = time.perf_counter()
+
+            timings = {'load': loaded - started, 'serialize': serialized - loaded, 'render': rendered - serialized,
+                       'total': rendered - started}
+            if best is None or timings['total'] < best['total']:
+                best = timings
+            rows = len(objects)
+        return rows, best, body
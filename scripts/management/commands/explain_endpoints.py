@@ -0,0 +1,96 @@
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from scripts.seeding import seed_dataset
+from tasks.models import Task
+
+SEQ_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain_sql(sql, analyze=False):
+    """ Возвращает план запроса (EXPLAIN или EXPLAIN ANALYZE) одной строкой """
+    prefix = 'EXPLAIN (ANALYZE, BUFFERS)' if analyze else 'EXPLAIN'
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}')
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+class Command(BaseCommand):
+
+    help = 'Run EXPLAIN for the SQL issued by each API endpoint and report sequential scans'
+
+    # Таблицы, по которым последовательное сканирование считается проблемой
+    watched_tables = ('tasks_task', 'employees_employee')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-tasks', type=int, default=0,
+                            help='Seed this many synthetic tasks before explaining (rolled back afterwards)')
+        parser.add_argument('--seed-employees', type=int, default=100,
+                            help='Number of synthetic employees to seed together with tasks')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (executes the queries)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print full query plans')
+        parser.add_argument('--strict', action='store_true',
+                            help='Exit with an error if any endpoint query scans a watched table sequentially')
+
+    def get_endpoints(self):
+        """ Список (название, URL) проверяемых эндпоинтов """
+        task = Task.objects.order_by('pk').first()
+        task_pk = task.pk if task else 0
+        task_list = reverse('tasks:task-list-create')
+        return [
+            ('task list', task_list),
+            ('task list, cursor by deadline', task_list + '?pagination=cursor&ordering=deadline'),
+            ('task detail', reverse('tasks:task-read-update-delete', kwargs={'pk': task_pk})),
+            ('employee list', reverse('employees:employees-list')),
+            ('busy employees', reverse('employees:busy_employees') + '?page_size=15'),
+            ('important tasks', reverse('tasks:important_tasks')),
+        ]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN output is only interpreted for PostgreSQL.')
+
+        seq_scans = []
+        # Все изменения (тестовые данные и назначения важных задач) откатываются
+        with transaction.atomic():
+            if options['seed_tasks']:
+                seeded = seed_dataset(employees=options['seed_employees'], tasks=options['seed_tasks'])
+                self.stdout.write('Seeded %d employees and %d tasks' % seeded)
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE tasks_task; ANALYZE employees_employee')
+
+            client = Client()
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for name, url in self.get_endpoints():
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(url)
+                    self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: GET {url} -> {response.status_code}, '
+                                                                 f'{len(queries)} queries'))
+                    for query in queries.captured_queries:
+                        seq_scans.extend((name, table) for table in self.explain(query['sql'], options))
+
+            transaction.set_rollback(True)
+
+        if seq_scans:
+            for name, table in seq_scans:
+                self.stdout.write(self.style.WARNING(f'Sequential scan on {table} in "{name}"'))
+            if options['strict']:
+                raise CommandError(f'{len(seq_scans)} sequential scans found.')
+        else:
+            self.stdout.write(self.style.SUCCESS('All endpoint queries use index scans.'))
+
+    def explain(self, sql, options):
+        """ Выполняет EXPLAIN для запроса и возвращает таблицы, которые сканируются последовательно """
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return []
+        plan = explain_sql(sql, options['analyze'])
+
+        self.stdout.write(f'  {sql[:160]}')
+        if options['verbose_plans']:
+            self.stdout.write(re.sub('^', '    ', plan, flags=re.M))
+        return [table for table in SEQ_SCAN_RE.findall(plan) if table in self.watched_tables]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from config.schema import generate_schema, schema_format, write_schema
+
+
+class Command(BaseCommand):
+
+    help = 'Generate the OpenAPI schema into a static JSON or YAML file served by /schema/, /swagger/ and /redoc/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Schema file (API_SCHEMA_PATH by default); .yaml or .yml for YAML')
+        parser.add_argument('--check', action='store_true',
+                            help='Only check that the file is up to date, exit with an error otherwise')
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.API_SCHEMA_PATH
+        content = generate_schema(schema_format(path))
+
+        if options['check']:
+            try:
+                with open(path, 'rb') as file:
+                    current = file.read()
+            except FileNotFoundError:
+                current = None
+            if current != content:
+                raise CommandError(f'{path} is out of date, run manage.py generate_schema.')
+            self.stdout.write(f'{path} is up to date')
+            return
+
+        write_schema(path, content)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(content)} bytes to {path}'))
@@ -0,0 +1,203 @@
+import csv
+import io
+import time
+from array import array
+
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from config.cache import PROCESS_LOCAL_CACHE_NOTE, response_cache
+from employees.workload import rebuild_workload_counters
+from scripts.datasets import FORMATS, iter_records
+
+
+class BatchLoader:
+    """
+    Пакетная загрузка строк одной модели.
+
+    На PostgreSQL строки передаются командой COPY, на других базах - через bulk_create.
+    Ссылки модели на саму себя (Task.parent_task) при первом проходе не записываются,
+    а запоминаются и проставляются вторым проходом, когда все строки уже загружены.
+    """
+
+    def __init__(self, model, use_copy, batch_size):
+        self.model = model
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.fields = list(model._meta.concrete_fields)
+        self.self_references = [field for field in self.fields
+                                if field.is_relation and field.related_model is model]
+        self.columns = None
+        self.rows = []
+        self.links = {field.attname: (array('q'), array('q')) for field in self.self_references}
+        self.loaded = 0
+
+    def add(self, record):
+        if self.columns is None:
+            # Набор колонок определяется первой записью: pk загружается, если он есть в данных
+            self.columns = [field for field in self.fields
+                            if not field.primary_key or self._value(record, field) is not None]
+
+        row = []
+        for field in self.columns:
+            value = self._value(record, field)
+            if field in self.self_references:
+                if value is not None:
+                    pk = self._value(record, self.model._meta.pk)
+                    if pk is None:
+                        raise ValueError(f'Records with "{field.name}" must have an id.')
+                    ids, targets = self.links[field.attname]
+                    ids.append(int(pk))
+                    targets.append(int(value))
+                value = None
+            row.append(value)
+        self.rows.append(row)
+
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.use_copy:
+            self._copy(self.model._meta.db_table, [field.column for field in self.columns], self.rows)
+        else:
+            self.model.objects.bulk_create([
+                self.model(**{field.attname: field.to_python(value) for field, value in zip(self.columns, row)})
+                for row in self.rows
+            ])
+        self.loaded += len(self.rows)
+        self.rows = []
+
+    def resolve_links(self):
+        """ Второй проход: проставляет ссылки на родительские строки и возвращает количество проставленных """
+        resolved = 0
+        for field in self.self_references:
+            ids, targets = self.links[field.attname]
+            if not ids:
+                continue
+            if self.use_copy:
+                resolved += self._resolve_with_temp_table(field, ids, targets)
+            else:
+                resolved += self._resolve_with_bulk_update(field, ids, targets)
+        return resolved
+
+    def _resolve_with_temp_table(self, field, ids, targets):
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        column = connection.ops.quote_name(field.column)
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE load_links (id bigint, target_id bigint) ON COMMIT DROP')
+            for start in range(0, len(ids), self.batch_size):
+                self._copy('load_links', ['id', 'target_id'],
+                           zip(ids[start:start + self.batch_size], targets[start:start + self.batch_size]))
+            # Ссылки на отсутствующие строки пропускаются
+            cursor.execute(f"""
+                UPDATE {table} AS t SET {column} = l.target_id
+                FROM load_links AS l
+                WHERE t.id = l.id AND EXISTS (SELECT 1 FROM {table} AS p WHERE p.id = l.target_id)
+            """)
+            resolved = cursor.rowcount
+            cursor.execute('DROP TABLE load_links')
+        return resolved
+
+    def _resolve_with_bulk_update(self, field, ids, targets):
+        resolved = 0
+        for start in range(0, len(ids), self.batch_size):
+            pairs = list(zip(ids[start:start + self.batch_size], targets[start:start + self.batch_size]))
+            existing = set(self.model.objects.filter(pk__in=[target for _, target in pairs])
+                           .values_list('pk', flat=True))
+            objs = [self.model(pk=pk, **{field.attname: target}) for pk, target in pairs if target in existing]
+            self.model.objects.bulk_update(objs, [field.name])
+            resolved += len(objs)
+        return resolved
+
+    @staticmethod
+    def _copy(table, columns, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            connection.ops.quote_name(table), ', '.join(connection.ops.quote_name(column) for column in columns))
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):
+                # psycopg2
+                cursor.cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    @staticmethod
+    def _value(record, field):
+        for key in (field.name, field.attname):
+            if key in record:
+                return record[key]
+        # Отсутствующие в данных поля получают значение по умолчанию (например, счётчики сотрудника)
+        return field.get_default() if field.has_default() else None
+
+
+class Command(BaseCommand):
+
+    help = 'Load large JSON fixture, NDJSON or CSV datasets in batches (COPY on PostgreSQL, bulk_create otherwise). ' \
+           + PROCESS_LOCAL_CACHE_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Dataset files, loaded in the given order')
+        parser.add_argument('--format', choices=FORMATS, help='File format (detected from the extension by default)')
+        parser.add_argument('--model', help='Model label for flat NDJSON/CSV records, e.g. tasks.task')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per COPY or bulk_create batch')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create even on PostgreSQL')
+
+    def handle(self, *args, **options):
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        model_label = options['model'].lower() if options['model'] else None
+        started = time.monotonic()
+        total = 0
+
+        with transaction.atomic():
+            loaders = {}
+            for path in options['paths']:
+                file_started, file_rows = time.monotonic(), 0
+                try:
+                    for label, record in iter_records(path, options['format'], model_label):
+                        if label not in loaders:
+                            loaders[label] = BatchLoader(self.get_model(label), use_copy, options['batch_size'])
+                        loaders[label].add(record)
+                        file_rows += 1
+                except (OSError, ValueError) as error:
+                    raise CommandError(f'{path}: {error}')
+                for loader in loaders.values():
+                    loader.flush()
+                self.report(path, file_rows, time.monotonic() - file_started)
+                total += file_rows
+
+            for label, loader in loaders.items():
+                resolved = loader.resolve_links()
+                if resolved:
+                    self.stdout.write(f'{label}: resolved {resolved} parent references')
+
+            # Последовательности pk продолжаются после загруженных id
+            models = [loader.model for loader in loaders.values()]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+            # Загрузка обходит сигналы, поэтому счётчики задач сотрудников пересчитываются целиком
+            rebuild_workload_counters()
+            response_cache.invalidate()
+
+        mode = 'COPY' if use_copy else 'bulk_create'
+        self.report(f'Total ({mode})', total, time.monotonic() - started, style=self.style.SUCCESS)
+
+    def report(self, name, rows, elapsed, style=None):
+        message = f'{name}: {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        self.stdout.write(style(message) if style else message)
+
+    @staticmethod
+    def get_model(label):
+        try:
+            return apps.get_model(label)
+        except (LookupError, ValueError):
+            raise CommandError(f'Unknown model "{label}".')
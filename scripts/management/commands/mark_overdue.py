@@ -0,0 +1,63 @@
+import time
+from collections import Counter
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from config.cache import PROCESS_LOCAL_CACHE_NOTE
+from tasks.models import Task
+from tasks.transitions import sync_status_counts, today
+
+
+class Command(BaseCommand):
+
+    help = 'Mark in-progress tasks past their deadline as overdue in chunked set-based UPDATEs. ' \
+           + PROCESS_LOCAL_CACHE_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of tasks updated per statement')
+        parser.add_argument('--sleep', type=float, default=0, help='Pause between batches, in seconds')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many tasks would be updated')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+        on_date = today()
+        candidates = Task.objects.filter(status='in_progress', completion_time__isnull=True, deadline__lt=on_date)
+
+        # Задачи в работе без исполнителя по правилам переходят в to_assign, а не в overdue
+        counts = candidates.aggregate(total=Count('pk'),
+                                      unassigned=Count('pk', filter=Q(assigned_employee__isnull=True)))
+        total = counts['total']
+        self.stdout.write(f'Overdue tasks to mark: {total - counts["unassigned"]}')
+        if counts['unassigned']:
+            self.stdout.write(f'Unassigned tasks to return to to_assign: {counts["unassigned"]}')
+        if options['dry_run'] or not total:
+            return
+
+        last_pk, processed, started = 0, Counter(), time.monotonic()
+        while True:
+            # Граница пачки - pk batch_size-й подходящей задачи после предыдущей пачки (поиск по индексу)
+            bound = list(candidates.filter(pk__gt=last_pk).order_by('pk')
+                         .values_list('pk', flat=True)[batch_size - 1:batch_size])
+            upper_pk = bound[0] if bound else candidates.order_by('-pk').values_list('pk', flat=True).first()
+            if upper_pk is None or upper_pk <= last_pk:
+                break
+
+            # Статусы пачки пересчитываются по общим правилам (tasks.transitions) одним запросом в своей транзакции
+            processed += sync_status_counts(candidates.filter(pk__gt=last_pk, pk__lte=upper_pk), on_date)
+            last_pk = upper_pk
+            elapsed = time.monotonic() - started
+            done = sum(processed.values())
+            self.stdout.write(f'  {done}/{total} tasks updated ({done / elapsed if elapsed else 0:.0f} rows/s), '
+                              f'last id {last_pk}')
+
+            if not bound:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Marked {processed["overdue"]} tasks as overdue'))
+        if processed['to_assign']:
+            self.stdout.write(self.style.SUCCESS(f'Returned {processed["to_assign"]} unassigned tasks to to_assign'))
@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand
+from django.db.models import F, Q
+
+from config.cache import PROCESS_LOCAL_CACHE_NOTE, response_cache
+from employees.models import Employee
+from employees.workload import STATUS_COUNTER_FIELDS, counter_subquery, rebuild_workload_counters
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuild per-status task counters of employees from the tasks table. ' + PROCESS_LOCAL_CACHE_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report employees whose counters are out of sync, do not update them')
+
+    def handle(self, *args, **options):
+        # Сотрудники, у которых хотя бы один счётчик расходится с фактическим числом задач
+        actual = {f'actual_{field}': counter_subquery(status) for status, field in STATUS_COUNTER_FIELDS.items()}
+        in_sync = Q(*(Q(**{field: F(f'actual_{field}')}) for field in STATUS_COUNTER_FIELDS.values()))
+        out_of_sync = Employee.objects.alias(**actual).exclude(in_sync).count()
+        self.stdout.write(f'Employees with out-of-sync counters: {out_of_sync}')
+
+        if options['check']:
+            return
+
+        updated = rebuild_workload_counters()
+        response_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters of {updated} employees'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from config.cache import PROCESS_LOCAL_CACHE_NOTE
+from employees.models import Employee
+from scripts.seeding import PRESETS, seed_dataset
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+
+    help = 'Fill the database with synthetic employees, tasks and parent task chains. ' + PROCESS_LOCAL_CACHE_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=PRESETS, help='Dataset size preset; explicit options override it')
+        parser.add_argument('--employees', type=int, help='Number of employees')
+        parser.add_argument('--tasks', type=int, help='Number of independent tasks')
+        parser.add_argument('--chains', type=int, help='Number of parent task chains (created in addition to tasks)')
+        parser.add_argument('--chain-depth', type=int, help='Number of tasks in each chain')
+        parser.add_argument('--linked-ratio', type=float, default=0.2,
+                            help='Share of independent tasks linked to a random earlier task')
+        parser.add_argument('--seed', type=int, help='Random seed for a reproducible dataset')
+        parser.add_argument('--clear', action='store_true', help='Delete existing tasks and employees first')
+
+    def handle(self, *args, **options):
+        params = dict(PRESETS[options['preset'] or '1k'])
+        for name in ('employees', 'tasks', 'chains', 'chain_depth'):
+            if options[name] is not None:
+                params[name] = options[name]
+
+        started = time.monotonic()
+        with transaction.atomic():
+            if options['clear']:
+                # Очистка таблиц как в команде flush (TRUNCATE на PostgreSQL) без загрузки объектов
+                tables = [Task._meta.db_table, Employee._meta.db_table]
+                connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True))
+            employees, tasks = seed_dataset(linked_ratio=options['linked_ratio'], seed=options['seed'], **params)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {employees} employees and {tasks} tasks ({params["chains"]} chains of {params["chain_depth"]}) '
+            f'in {time.monotonic() - started:.1f}s'))
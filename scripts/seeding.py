@@ -0,0 +1,83 @@
+import datetime
+import random
+
+from config.cache import response_cache
+from employees.models import Employee
+from employees.workload import rebuild_workload_counters
+from tasks.models import Task
+
+FIRST_NAMES = ['John', 'Jane', 'Alice', 'Bob', 'Maria', 'Ivan', 'Olga', 'Peter', 'Anna', 'Sergey']
+LAST_NAMES = ['Smith', 'Doe', 'Johnson', 'Brown', 'Petrov', 'Ivanova', 'Sidorov', 'Miller', 'Orlova', 'Wilson']
+POSITIONS = ['Developer', 'Designer', 'Manager', 'Tester', 'Analyst']
+STATUSES = ['to_assign', 'in_progress', 'in_progress', 'completed', 'overdue']
+PRIORITIES = [choice for choice, _ in Task.PRIORITY_CHOICES]
+# Слова названий и описаний задач, чтобы полнотекстовый поиск находил разное количество строк
+WORDS = ['login', 'page', 'report', 'api', 'database', 'migration', 'invoice', 'payment', 'search', 'cache',
+         'layout', 'mobile', 'export', 'import', 'email', 'profile', 'settings', 'dashboard', 'chart', 'backup']
+
+# Типовые размеры наборов данных для бенчмарков
+PRESETS = {
+    '1k': {'employees': 20, 'tasks': 1000, 'chains': 10, 'chain_depth': 10},
+    '100k': {'employees': 1000, 'tasks': 100000, 'chains': 100, 'chain_depth': 50},
+    '1m': {'employees': 10000, 'tasks': 1000000, 'chains': 1000, 'chain_depth': 100},
+}
+
+
+def seed_dataset(employees=100, tasks=10000, linked_ratio=0.2, batch_size=5000, seed=None, chains=0, chain_depth=0):
+    """
+    Заполняет базу синтетическими сотрудниками и задачами пакетными вставками.
+
+    Args:
+        employees: Количество сотрудников.
+        tasks: Количество задач.
+        linked_ratio: Доля задач, ссылающихся на ранее созданную родительскую задачу.
+        batch_size: Размер пакета bulk_create.
+        seed: Начальное значение генератора случайных чисел для воспроизводимости.
+        chains: Количество цепочек зависимых задач (создаются дополнительно к tasks).
+        chain_depth: Длина каждой цепочки: каждая задача цепочки зависит от предыдущей.
+    Returns:
+        Кортеж (количество сотрудников, количество задач).
+    """
+    rnd = random.Random(seed)
+    today = datetime.date.today()
+
+    employee_objs = Employee.objects.bulk_create([
+        Employee(first_name=rnd.choice(FIRST_NAMES), last_name=rnd.choice(LAST_NAMES),
+                 position=rnd.choice(POSITIONS), experience=rnd.randint(0, 40))
+        for _ in range(employees)
+    ], batch_size=batch_size)
+    employee_ids = [employee.pk for employee in employee_objs]
+
+    def make_task(i, parent_id):
+        status = rnd.choice(STATUSES)
+        deadline = today + datetime.timedelta(days=rnd.randint(-60, 30))
+        completion_time = None
+        if status in ('completed', 'overdue'):
+            shift = rnd.randint(-10, 0) if status == 'completed' else rnd.randint(1, 10)
+            completion_time = deadline + datetime.timedelta(days=shift)
+        return Task(
+            name=f'Task {i} {rnd.choice(WORDS)}', description=' '.join(rnd.sample(WORDS, 3)),
+            priority=rnd.choice(PRIORITIES),
+            deadline=deadline, status=status, completion_time=completion_time, parent_task_id=parent_id,
+            assigned_employee_id=None if status == 'to_assign' or not employee_ids else rnd.choice(employee_ids),
+        )
+
+    task_ids = []
+    created = 0
+    while created < tasks:
+        batch = [make_task(i, rnd.choice(task_ids) if task_ids and rnd.random() < linked_ratio else None)
+                 for i in range(created, min(created + batch_size, tasks))]
+        task_ids.extend(task.pk for task in Task.objects.bulk_create(batch))
+        created += len(batch)
+
+    # Цепочки создаются по уровням: задачи уровня ссылаются на задачи предыдущего уровня своих цепочек
+    level = [None] * chains
+    for _ in range(chain_depth):
+        batch = [make_task(created + i, parent_id) for i, parent_id in enumerate(level)]
+        level = [task.pk for task in Task.objects.bulk_create(batch, batch_size=batch_size)]
+        created += len(batch)
+
+    # bulk_create не отправляет сигналы, поэтому счётчики сотрудников пересчитываются целиком
+    rebuild_workload_counters()
+    response_cache.invalidate()
+    return len(employee_ids), created
@@ -1,5 +1,14 @@
 from django.contrib import admin
 
 from .models import Task
+from .transitions import apply_transition
 
-admin.site.register(Task)
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    # Статус вычисляется при сохранении по тем же правилам, что и в API (tasks.transitions)
+    readonly_fields = ('status',)
+
+    def save_model(self, request, obj, form, change):
+        apply_transition(obj)
+        super().save_model(request, obj, form, change)
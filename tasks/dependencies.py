@@ -0,0 +1,146 @@
+from django.db import connection
+
+from tasks.models import Task
+
+# Цепочка родительских задач: от задачи вверх до корня. UNION (а не UNION ALL) отбрасывает
+# уже найденные строки, поэтому запрос завершается даже на зациклившихся данных.
+ANCESTORS_SQL = """
+    WITH RECURSIVE ancestors(id, parent_task_id) AS (
+        SELECT id, parent_task_id FROM {table} WHERE id = %s
+        UNION
+        SELECT t.id, t.parent_task_id FROM {table} AS t JOIN ancestors AS a ON t.id = a.parent_task_id
+    )
+    SELECT {columns} FROM {table} AS t JOIN ancestors AS a ON t.id = a.id
+"""
+
+# Цепочки родительских задач сразу от нескольких задач (id IN (...)): связи всех задач цепочек
+ANCESTORS_OF_MANY_SQL = """
+    WITH RECURSIVE ancestors(id, parent_task_id) AS (
+        SELECT id, parent_task_id FROM {table} WHERE id IN ({placeholders})
+        UNION
+        SELECT t.id, t.parent_task_id FROM {table} AS t JOIN ancestors AS a ON t.id = a.parent_task_id
+    )
+    SELECT id, parent_task_id FROM ancestors
+"""
+
+# Поддерево зависимых задач: от задачи вниз по обратной связи linked_task
+DESCENDANTS_SQL = """
+    WITH RECURSIVE descendants(id) AS (
+        SELECT id FROM {table} WHERE id = %s
+        UNION
+        SELECT t.id FROM {table} AS t JOIN descendants AS d ON t.parent_task_id = d.id
+    )
+    SELECT {columns} FROM {table} AS t JOIN descendants AS d ON t.id = d.id ORDER BY t.id
+"""
+
+
+def _sql(template, columns='t.*', **params):
+    return template.format(table=connection.ops.quote_name(Task._meta.db_table), columns=columns, **params)
+
+
+def ancestor_ids(task_id):
+    """
+    Возвращает id задачи и всех её родительских задач одним запросом.
+
+    Returns:
+        Список id от самой задачи (первый элемент) к корню.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_sql(ANCESTORS_SQL, 't.id, t.parent_task_id'), [task_id])
+        parents = dict(cursor.fetchall())
+
+    # Восстановление порядка цепочки по ссылкам на родителя
+    chain, seen, current = [], set(), task_id
+    while current in parents and current not in seen:
+        chain.append(current)
+        seen.add(current)
+        current = parents[current]
+    return chain
+
+
+def ancestors(task_id):
+    """
+    Родительские задачи (без самой задачи) от ближайшей к корню, одним запросом.
+
+    У каждой задачи есть атрибут depth - расстояние от исходной задачи.
+    """
+    tasks = {task.pk: task for task in Task.objects.raw(_sql(ANCESTORS_SQL), [task_id])}
+    chain, seen, current = [], {task_id}, tasks.get(task_id)
+    while current is not None and current.parent_task_id in tasks and current.parent_task_id not in seen:
+        current = tasks[current.parent_task_id]
+        seen.add(current.pk)
+        current.depth = len(chain) + 1
+        chain.append(current)
+    return chain
+
+
+def descendants(task_id):
+    """
+    Все зависимые задачи поддерева (без самой задачи) одним запросом.
+
+    Задачи упорядочены по уровню вложенности, у каждой задачи есть атрибут depth - расстояние от корня поддерева.
+    """
+    tasks = list(Task.objects.raw(_sql(DESCENDANTS_SQL), [task_id]))
+    children = {}
+    for task in tasks:
+        children.setdefault(task.parent_task_id, []).append(task)
+
+    # Обход в ширину от корня поддерева для вычисления глубины
+    result, level, depth, seen = [], [task_id], 0, {task_id}
+    while level:
+        depth += 1
+        next_level = []
+        for parent_id in level:
+            for task in children.get(parent_id, []):
+                if task.pk not in seen:
+                    seen.add(task.pk)
+                    task.depth = depth
+                    result.append(task)
+                    next_level.append(task.pk)
+        level = next_level
+    return result
+
+
+def creates_cycle(task_id, parent_task_id):
+    """
+    Проверяет, образует ли назначение parent_task_id родителем задачи task_id цикл.
+
+    Цикл возникает, если задача уже есть в цепочке родителей будущего родителя
+    (в том числе если родитель - сама задача). Проверка выполняется одним запросом.
+    """
+    if task_id is None or parent_task_id is None:
+        return False
+    return task_id in find_cycles({task_id: parent_task_id})
+
+
+def find_cycles(parents):
+    """
+    Проверяет новые родительские задачи сразу для нескольких задач.
+
+    Args:
+        parents: Словарь {id задачи: id новой родительской задачи или None}.
+    Returns:
+        Множество id задач из parents, которые после изменения окажутся в цепочке своих же родителей.
+
+    Связи берутся из базы с учётом всех изменений parents, поэтому находятся и циклы, которые образуют
+    только несколько изменений вместе (A -> B и B -> A в одном пакете). Цепочки родителей всех новых
+    родительских задач читаются одним рекурсивным запросом, дальше обход выполняется в памяти.
+    """
+    starts = {parent_id for parent_id in parents.values() if parent_id is not None}
+    if not starts:
+        return set()
+    with connection.cursor() as cursor:
+        cursor.execute(_sql(ANCESTORS_OF_MANY_SQL, placeholders=', '.join(['%s'] * len(starts))), sorted(starts))
+        graph = dict(cursor.fetchall())
+    # Новые связи заменяют связи из базы; родитель каждой задачи графа - либо новый, либо прочитанный запросом
+    graph.update(parents)
+
+    cycles = set()
+    for task_id, parent_id in parents.items():
+        seen, current = set(), parent_id
+        while current is not None and current != task_id and current not in seen:
+            seen.add(current)
+            current = graph.get(current)
+        if current == task_id:
+            cycles.add(task_id)
+    return cycles
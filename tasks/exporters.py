@@ -0,0 +1,74 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.negotiation import BaseContentNegotiation
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """ Выгрузка сама определяет формат ответа, поэтому заголовок Accept клиента не учитывается """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    """ Объект с интерфейсом файла, который возвращает записанную строку вместо её сохранения """
+
+    def write(self, value):
+        return value
+
+
+class StreamingExportMixin:
+    """
+    Потоковая выгрузка списка объектов в NDJSON или CSV.
+
+    Строки читаются через QuerySet.iterator(chunk_size=...) и отдаются клиенту по мере чтения,
+    поэтому потребление памяти не зависит от размера таблицы. К queryset применяются те же
+    фильтры, что и к списку (filter_queryset).
+
+    Параметры:
+    - export_fields: Поля выгрузки - название в выгрузке и поле модели.
+    - export_name: Имя файла выгрузки без расширения.
+    - chunk_size: Количество строк, читаемых из базы за один раз.
+    """
+    export_fields = {}
+    export_name = 'export'
+    chunk_size = 2000
+    content_types = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get_serializer(self, *args, **kwargs):
+        # Строки выгружаются без сериализатора; схема OpenAPI (drf_yasg) описывает ответ без тела
+        return None
+
+    def get(self, request, export_format):
+        if export_format not in self.content_types:
+            raise NotFound(f'Unsupported export format "{export_format}".')
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*self.export_fields.values()).iterator(chunk_size=self.chunk_size)
+        stream = getattr(self, f'stream_{export_format}')(rows)
+
+        response = StreamingHttpResponse(stream, content_type=self.content_types[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{self.export_name}.{export_format}"'
+        return response
+
+    def stream_ndjson(self, rows):
+        names = list(self.export_fields)
+        encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        for row in rows:
+            yield encoder.encode(dict(zip(names, row))) + '\n'
+
+    def stream_csv(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(list(self.export_fields))
+        for row in rows:
+            yield writer.writerow(row)
@@ -0,0 +1,107 @@
+import re
+
+import django_filters
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.db.models import Q
+from rest_framework.filters import OrderingFilter
+
+from tasks.models import Task, TASK_PRIORITY_RANK, TASK_SEARCH_CONFIG, TASK_SEARCH_VECTOR
+
+
+# Элемент запроса websearch: необязательный минус и "фраза" или слово
+SEARCH_TERM_RE = re.compile(r'(-?)(?:"([^"]*)"?|(\S+))')
+
+
+def search_tasks(queryset, value):
+    """
+    Полнотекстовый поиск задач по названию и описанию.
+
+    На PostgreSQL используется to_tsvector с GIN-индексом task_search_idx (синтаксис запроса как
+    в поисковиках: слова, "фраза", -исключение). Слова ищутся целиком с учётом словоформ, без учёта регистра;
+    слова не на латинице распознаются, если база создана с локалью UTF-8 (LC_CTYPE), а не C.
+    На других СУБД - приближённый поиск LIKE (search_condition).
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        # Выражение совпадает с выражением индекса, поэтому поиск выполняется по индексу
+        query = SearchQuery(value, config=TASK_SEARCH_CONFIG, search_type='websearch')
+        return queryset.alias(search=TASK_SEARCH_VECTOR).filter(search=query)
+    return queryset.filter(search_condition(value))
+
+
+def search_condition(value):
+    """
+    Условие поиска без полнотекстового индекса: тот же синтаксис запроса, что и на PostgreSQL.
+
+    Каждое слово или "фраза" ищется как подстрока названия или описания без учёта регистра (без словоформ,
+    "port" находит и "report"), элементы с минусом исключают задачи; оператор or не поддерживается.
+    """
+    condition = Q()
+    for negated, phrase, word in SEARCH_TERM_RE.findall(value):
+        term = ' '.join(phrase.split()) if phrase else word.strip('"')
+        if not term:
+            continue
+        matches = Q(name__icontains=term) | Q(description__icontains=term)
+        condition &= ~matches if negated else matches
+    return condition
+
+
+class TaskFilter(django_filters.FilterSet):
+    """
+        Фильтры списка задач.
+
+        Параметры:
+        - status, priority: Статус и приоритет (несколько значений через запятую).
+        - deadline_after, deadline_before: Диапазон срока выполнения (включительно).
+        - assigned_employee, parent_task: Исполнитель и родительская задача по id.
+        - unassigned, has_parent: Только задачи без исполнителя / с родительской задачей (true/false).
+        - search: Полнотекстовый поиск по названию и описанию.
+
+        Связи фильтруются по id без проверки существования объекта, поэтому фильтр не выполняет запросов.
+        """
+    status = django_filters.MultipleChoiceFilter(choices=Task.STATUS_CHOICES, widget=django_filters.widgets.CSVWidget)
+    priority = django_filters.MultipleChoiceFilter(choices=Task.PRIORITY_CHOICES,
+                                                   widget=django_filters.widgets.CSVWidget)
+    deadline = django_filters.DateFromToRangeFilter()
+    assigned_employee = django_filters.NumberFilter(field_name='assigned_employee_id')
+    parent_task = django_filters.NumberFilter(field_name='parent_task_id')
+    unassigned = django_filters.BooleanFilter(field_name='assigned_employee', lookup_expr='isnull')
+    has_parent = django_filters.BooleanFilter(field_name='parent_task', lookup_expr='isnull', exclude=True)
+    search = django_filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = Task
+        fields = ['status', 'priority', 'deadline', 'assigned_employee', 'parent_task']
+
+    def filter_search(self, queryset, name, value):
+        return search_tasks(queryset, value) if value.strip() else queryset
+
+
+class TieBreakOrderingFilter(OrderingFilter):
+    """
+        Сортировка ?ordering= с pk в конце в том же направлении.
+
+        Порядок строк однозначен при одинаковых значениях поля, а сортировка (поле, pk) совпадает
+        с индексами вида (поле, id) и с курсорной пагинацией. Поля из ordering_expressions сортируются
+        по выражению (priority - по рангу от low к high, индекс task_priority_rank_idx), а не по значению поля.
+        """
+    ordering_expressions = {'priority': TASK_PRIORITY_RANK}
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering:
+            return queryset.order_by(*(self.get_order_by(field) for field in ordering))
+        return queryset
+
+    def get_order_by(self, field):
+        expression = self.ordering_expressions.get(field.lstrip('-'))
+        if expression is None:
+            return field
+        return expression.desc() if field.startswith('-') else expression.asc()
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[-1].lstrip('-') not in ('pk', 'id'):
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering = [*ordering, f'{direction}pk']
+        return ordering
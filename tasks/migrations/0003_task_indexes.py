@@ -0,0 +1,45 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:01
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицу задач
+    atomic = False
+
+    dependencies = [
+        ('employees', '0002_alter_employee_tasks_completed'),
+        ('tasks', '0002_alter_task_completion_time'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['assigned_employee', 'status'], name='task_employee_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'in_progress')), fields=['assigned_employee'], name='task_in_progress_employee_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'in_progress')), fields=['parent_task'], name='task_in_progress_parent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'to_assign')), fields=['id'], include=('parent_task',), name='task_to_assign_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['status', 'id'], name='task_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['deadline', 'id'], name='task_deadline_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['priority', 'id'], name='task_priority_idx'),
+        ),
+    ]
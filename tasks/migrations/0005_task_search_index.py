@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Индекс строится без блокировки записи в таблицу задач
+    atomic = False
+
+    dependencies = [
+        ('employees', '0004_employee_updated_at'),
+        ('tasks', '0004_task_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', 'description', config='simple'), name='task_search_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:34
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индекс строится без блокировки записи в таблицу задач
+    atomic = False
+
+    dependencies = [
+        ('employees', '0005_employee_filter_indexes'),
+        ('tasks', '0005_task_search_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(models.Case(models.When(priority='low', then=models.Value(0)), models.When(priority='medium', then=models.Value(1)), models.When(priority='high', then=models.Value(2)), output_field=models.IntegerField()), models.F('id'), name='task_priority_rank_idx'),
+        ),
+    ]
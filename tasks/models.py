@@ -1,7 +1,23 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+from django.utils import timezone
 
 from employees.models import Employee
 
+# Полнотекстовый поиск задач (tasks.filters): конфигурация simple не зависит от языка текста,
+# выражение используется и в индексе task_search_idx, и в запросах, поэтому поиск идёт по индексу
+TASK_SEARCH_CONFIG = 'simple'
+TASK_SEARCH_VECTOR = SearchVector('name', 'description', config=TASK_SEARCH_CONFIG)
+
+# Ранг приоритета для сортировки: строки priority по алфавиту упорядочены как high < low < medium.
+# Выражение используется и в индексе task_priority_rank_idx, и в сортировке списков (tasks.filters, tasks.paginators)
+TASK_PRIORITY_RANKS = {'low': 0, 'medium': 1, 'high': 2}
+TASK_PRIORITY_RANK = models.Case(
+    *(models.When(priority=priority, then=models.Value(rank)) for priority, rank in TASK_PRIORITY_RANKS.items()),
+    output_field=models.IntegerField(),
+)
+
 
 class Task(models.Model):
     name = models.CharField(max_length=255, verbose_name='Name')
@@ -27,10 +43,53 @@ class Task(models.Model):
                                     related_name='linked_task', verbose_name='Parent Task')
     assigned_employee = models.ForeignKey(Employee, null=True, blank=True, on_delete=models.SET_NULL,
                                           related_name='tasks')
+    # Отметка последнего изменения для ETag и Last-Modified (config.conditional)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Updated At')
 
     def __str__(self):
         return f'{self.name} - {self.status}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исполнителя и статус, чтобы при удалении уменьшить счётчики сотрудников без лишнего запроса
+        instance.remember_workload()
+        return instance
+
+    def remember_workload(self):
+        """ Сохраняет текущую пару (исполнитель, статус) как состояние, записанное в базе """
+        if 'assigned_employee_id' in self.__dict__ and 'status' in self.__dict__:
+            self._loaded_workload = (self.assigned_employee_id, self.status)
+        else:
+            self._loaded_workload = None
+
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        # Запись задачи и обновление счётчиков сотрудников (tasks.signals) выполняются в одной транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
+        indexes = [
+            # Загруженность сотрудников по статусам
+            models.Index(fields=['assigned_employee', 'status'], name='task_employee_status_idx'),
+            # Задачи в работе: занятые сотрудники и зависимые задачи важных задач
+            models.Index(fields=['assigned_employee'], condition=models.Q(status='in_progress'),
+                         name='task_in_progress_employee_idx'),
+            models.Index(fields=['parent_task'], condition=models.Q(status='in_progress'),
+                         name='task_in_progress_parent_idx'),
+            # Неназначенные задачи, покрывающий индекс для поиска важных задач
+            models.Index(fields=['id'], condition=models.Q(status='to_assign'), include=['parent_task'],
+                         name='task_to_assign_idx'),
+            # Фильтрация по статусу и сортировки списков (в том числе курсорная пагинация)
+            models.Index(fields=['status', 'id'], name='task_status_idx'),
+            models.Index(fields=['deadline', 'id'], name='task_deadline_idx'),
+            models.Index(fields=['priority', 'id'], name='task_priority_idx'),
+            models.Index(TASK_PRIORITY_RANK, models.F('id'), name='task_priority_rank_idx'),
+            # Полнотекстовый поиск по названию и описанию
+            GinIndex(TASK_SEARCH_VECTOR, name='task_search_idx'),
+        ]
@@ -1,7 +1,20 @@
 from rest_framework.pagination import PageNumberPagination
 
+from config.pagination import AsyncPaginationMixin, KeysetPagination, KeysetSwitchMixin
+from tasks.models import TASK_PRIORITY_RANK
 
-class TaskPaginator(PageNumberPagination):
+
+class TaskKeysetPagination(KeysetPagination):
+    """ Курсорная пагинация задач по pk, сроку выполнения или приоритету (по рангу от low к high) """
+    orderings = {
+        'pk': ('pk',),
+        'deadline': ('deadline', 'pk'),
+        'priority': ('priority_rank', 'pk'),
+    }
+    annotations = {'priority_rank': TASK_PRIORITY_RANK}
+
+
+class TaskPaginator(KeysetSwitchMixin, AsyncPaginationMixin, PageNumberPagination):
     """
         Пагинатор для списка задач.
 
@@ -9,7 +22,9 @@ class TaskPaginator(PageNumberPagination):
         - page_size: Количество элементов на странице.
         - page_size_query_param: Параметр запроса, который определяет количество элементов на странице.
         - max_page_size: Максимальное количество элементов на странице, которое можно указать в параметре запроса.
+        - keyset_class: Курсорная пагинация, включаемая параметром ?pagination=cursor.
         """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 15
+    keyset_class = TaskKeysetPagination
@@ -1,17 +1,28 @@
 from rest_framework import serializers
 
+from config.representations import SparseFieldsetMixin
 from employees.models import Employee
 from . import validators
 from .models import Task
+from .transitions import apply_transition
 
 
-class TaskSerializer(serializers.ModelSerializer):
-    """ Сериализатор задачи"""
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Сериализатор задачи.
+
+    Статус вычисляется при записи по исполнителю, времени выполнения и сроку (tasks.transitions),
+    переданное значение status не учитывается. Задача сохраняется один раз, при обновлении -
+    только изменённые поля. Аргумент fields оставляет в ответе только часть полей (?fields=, ?exclude=).
+    """
     assigned_employee = serializers.PrimaryKeyRelatedField(queryset=Employee.objects.all(), allow_null=True)
+    # Проверка цикла зависимостей отдельным запросом для каждой задачи
+    check_parent_cycle = True
 
     class Meta:
         model = Task
         fields = '__all__'
+        extra_kwargs = {'status': {'required': False}}
 
     def validate(self, data):
         # Валидация поля deadline
@@ -26,12 +37,69 @@ class TaskSerializer(serializers.ModelSerializer):
         parent_task = data.get('parent_task')
         instance = self.instance
 
-        if parent_task:
+        if parent_task and self.check_parent_cycle:
             parent_task_validator = validators.TaskParentTaskValidator()
             parent_task_validator(parent_task, instance)
 
         return data
 
+    def create(self, validated_data):
+        validated_data.pop('status', None)
+        task = Task(**validated_data)
+        apply_transition(task)
+        task.save()
+        return task
+
+    def update(self, instance, validated_data):
+        validated_data.pop('status', None)
+        changed = set()
+        for name, value in validated_data.items():
+            field = Task._meta.get_field(name)
+            # Связи сравниваются по id, чтобы не загружать связанный объект
+            current = getattr(instance, field.attname)
+            new = value.pk if field.is_relation and value is not None else value
+            if current != new:
+                setattr(instance, name, value)
+                changed.add(name)
+        changed |= apply_transition(instance)
+        if changed:
+            instance.save(update_fields=changed)
+        return instance
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """
+    Сериализатор элемента пакетного создания/обновления задач.
+
+    Связи передаются как id и проверяются по множествам существующих id из контекста
+    (employee_ids, task_ids), загруженным заранее одним запросом на весь пакет. Циклы зависимостей
+    проверяются для всего пакета сразу (TaskBulkWriter), а не для каждого элемента.
+    """
+    id = serializers.IntegerField(required=False)
+    assigned_employee = serializers.IntegerField(allow_null=True, required=False)
+    parent_task = serializers.IntegerField(allow_null=True, required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)   # вычисляется при записи
+    check_parent_cycle = False
+
+    default_error_messages = {
+        'does_not_exist': 'Invalid pk "{pk_value}" - object does not exist.',
+    }
+
+    def validate_assigned_employee(self, value):
+        if value is not None and value not in self.context['employee_ids']:
+            self.fail('does_not_exist', pk_value=value)
+        return value
+
+    def validate_parent_task(self, value):
+        if value is not None and value not in self.context['task_ids']:
+            self.fail('does_not_exist', pk_value=value)
+        return value
+
+
+class TaskDependencySerializer(TaskSerializer):
+    """ Сериализатор задачи в цепочке зависимостей с расстоянием от исходной задачи """
+    depth = serializers.IntegerField(read_only=True)
+
 
 class ImportantTaskSerializer(serializers.Serializer):
     """ Сериализатор важных задач - неназначенных задач, от которых есть зависимые задачи уже в работе """
@@ -50,3 +118,10 @@ class ImportantTaskSerializer(serializers.Serializer):
         # сериализация объекта Employee, связанного с задачей.
         representation['employee'] = SimpleEmployeeSerializer(instance.assigned_employee).data
         return representation
+
+
+class AssignmentOptionsSerializer(serializers.Serializer):
+    """ Параметры расчёта назначений (tasks.assignment.AssignmentSolver) """
+
+    max_load = serializers.IntegerField(min_value=1, required=False, help_text='Maximum tasks in progress per employee')
+    fingerprint = serializers.CharField(required=False, help_text='Fingerprint of the previewed plan')
@@ -0,0 +1,285 @@
+import heapq
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from config.cache import response_cache
+from employees.models import Employee
+from employees.workload import workload_deltas, apply_workload_deltas
+from tasks import dependencies
+from tasks.models import Task
+from tasks.transitions import apply_transition, today
+
+
+class AssignmentError(Exception):
+    """ Ошибка назначения: не найден подходящий сотрудник """
+
+
+class WorkloadHeap:
+    """
+    Очередь сотрудников с приоритетом по загруженности.
+
+    Хранит текущее значение счётчика для каждого сотрудника и кучу пар (счётчик, pk).
+    Устаревшие записи кучи не удаляются сразу, а пропускаются при чтении вершины,
+    поэтому изменение счётчика стоит O(log n).
+    """
+
+    def __init__(self, counts=None):
+        self.counts = {}
+        self._heap = []
+        for pk, count in (counts or {}).items():
+            self.set(pk, count)
+
+    def set(self, pk, count):
+        self.counts[pk] = count
+        heapq.heappush(self._heap, (count, pk))
+
+    def add(self, pk, delta=1):
+        self.set(pk, self.counts.get(pk, 0) + delta)
+
+    def discard(self, pk):
+        """ Убирает сотрудника из очереди; add или set возвращают его с новым значением """
+        self.counts.pop(pk, None)
+
+    def peek(self):
+        """ Возвращает (счётчик, pk) наименее загруженного сотрудника или None, если очередь пуста. """
+        while self._heap:
+            count, pk = self._heap[0]
+            if self.counts.get(pk) == count:
+                return count, pk
+            heapq.heappop(self._heap)
+        return None
+
+
+class ImportantTaskAssigner:
+    """
+    Пакетное назначение важных задач - неназначенных задач, от которых зависят задачи уже в работе.
+
+    Загруженность сотрудников (счётчики Employee.tasks_in_progress) читается из базы один раз
+    и дальше поддерживается в памяти, все назначения сохраняются одним bulk_update в одной транзакции.
+    Количество запросов не зависит от количества назначаемых задач.
+
+    Правило выбора сотрудника для каждой задачи:
+    - наименее загруженный сотрудник (минимум задач в работе);
+    - сотрудник с наименьшим числом задач, у которых есть родительская задача;
+    второй выбирается, если его число задач не превышает загрузку первого более чем на 2.
+    """
+
+    # Допустимый перевес нагрузки сотрудника, выполняющего связанные задачи
+    PARENT_TASK_TOLERANCE = 2
+
+    def get_queryset(self):
+        """ Важные задачи без дублей, заблокированные до конца транзакции """
+        important_ids = Task.objects.filter(status='to_assign', linked_task__status='in_progress').values('pk')
+        return Task.objects.select_for_update().filter(pk__in=important_ids).order_by('pk')
+
+    def load_workloads(self):
+        """ Загружает сотрудников со счётчиками задач в работе и число их задач с родительской задачей """
+        employees = {employee.pk: employee for employee in Employee.objects.all()}
+
+        parent_task_counts = Task.objects.filter(
+            parent_task__isnull=False, assigned_employee__isnull=False
+        ).values('assigned_employee').annotate(task_count=Count('pk')).values_list('assigned_employee', 'task_count')
+
+        active = WorkloadHeap({pk: employee.tasks_in_progress for pk, employee in employees.items()})
+        with_parent_task = WorkloadHeap(dict(parent_task_counts))
+        return employees, active, with_parent_task
+
+    def choose(self, active, with_parent_task):
+        """ Возвращает pk подходящего сотрудника по текущим счётчикам """
+        least_busy = active.peek()
+        employee_with_parent_task = with_parent_task.peek()
+        # Сотрудник, у которого не осталось задач с родительской задачей (их переназначили), не подходит:
+        # он пропускается, и выбирается следующий по очереди
+        while employee_with_parent_task is not None and employee_with_parent_task[0] <= 0:
+            with_parent_task.discard(employee_with_parent_task[1])
+            employee_with_parent_task = with_parent_task.peek()
+
+        if least_busy is None or employee_with_parent_task is None:
+            raise AssignmentError('No suitable employee found.')
+
+        if employee_with_parent_task[0] <= least_busy[0] + self.PARENT_TASK_TOLERANCE:
+            return employee_with_parent_task[1]
+        return least_busy[1]
+
+    @transaction.atomic
+    def assign(self):
+        """
+        Назначает все важные задачи и возвращает их список.
+
+        Raises:
+            AssignmentError: если нет ни одного подходящего сотрудника.
+        """
+        tasks = list(self.get_queryset())
+        if not tasks:
+            return []
+
+        employees, active, with_parent_task = self.load_workloads()
+
+        before = [(task.assigned_employee_id, task.status) for task in tasks]
+        now, on_date = timezone.now(), today()
+        for task in tasks:
+            employee_pk = self.choose(active, with_parent_task)
+
+            # Задача уходит от прежнего сотрудника, если он был указан
+            if task.parent_task_id is not None and task.assigned_employee_id is not None:
+                with_parent_task.add(task.assigned_employee_id, -1)
+
+            task.assigned_employee = employees[employee_pk]
+            apply_transition(task, on_date)
+            task.updated_at = now
+
+            # Обновление счётчиков выбранного сотрудника
+            active.add(employee_pk)
+            if task.parent_task_id is not None:
+                with_parent_task.add(employee_pk)
+
+        Task.objects.bulk_update(tasks, ['assigned_employee', 'status', 'updated_at'])
+
+        # bulk_update не отправляет сигналы, поэтому счётчики сотрудников и кеш ответов обновляются явно
+        apply_workload_deltas(workload_deltas(before, [(task.assigned_employee_id, task.status) for task in tasks]))
+        for task in tasks:
+            task.remember_workload()
+        response_cache.invalidate()
+        return tasks
+
+
+class TaskBulkWriter:
+    """
+    Пакетное создание и обновление задач.
+
+    Все элементы проверяются до записи: существование исполнителей и родительских задач проверяется
+    одним запросом IN на каждую связь, обновляемые задачи загружаются одним запросом. Если хотя бы
+    один элемент не прошёл проверку, ничего не записывается, а errors содержит ошибки по индексам элементов.
+    Запись выполняется одним bulk_create или bulk_update в одной транзакции.
+
+    Циклы зависимостей проверяются для всего пакета одним рекурсивным запросом (tasks.dependencies.find_cycles)
+    по связям, какими они станут после записи, поэтому отклоняются и циклы из нескольких элементов пакета.
+    При обновлении задачи загружаются с блокировкой строк (SELECT ... FOR UPDATE в порядке pk), поэтому
+    is_valid и save вызываются в одной транзакции: параллельная запись не изменит задачи между проверкой
+    и записью, и счётчики сотрудников вычисляются по актуальным значениям. Каждый id можно указать один раз.
+    """
+
+    max_items = 1000
+    # Поля, которые записываются при обновлении помимо переданных
+    derived_fields = {'status', 'completion_time', 'updated_at'}
+
+    def __init__(self, items, update=False):
+        self.items = items
+        self.update = update
+        self.errors = []
+        self.tasks = []
+
+    def load_context(self):
+        """ Загружает id существующих связей и обновляемые задачи """
+        employee_ids = {item.get('assigned_employee') for item in self.items} - {None}
+        parent_ids = {item.get('parent_task') for item in self.items} - {None}
+        context = {
+            'employee_ids': set(Employee.objects.filter(pk__in=self._ints(employee_ids)).values_list('pk', flat=True)),
+            'task_ids': set(Task.objects.filter(pk__in=self._ints(parent_ids)).values_list('pk', flat=True)),
+            'instances': {},
+        }
+        if self.update:
+            tasks = (Task.objects.select_for_update()
+                     .filter(pk__in=self._ints(item.get('id') for item in self.items)).order_by('pk'))
+            context['instances'] = {task.pk: task for task in tasks}
+        return context
+
+    def is_valid(self):
+        from tasks.serializers import TaskBulkItemSerializer  # локальный импорт: сериализаторы зависят от сервисов
+
+        if not isinstance(self.items, list) or not all(isinstance(item, dict) for item in self.items):
+            self.errors = {'non_field_errors': ['Expected a list of objects.']}
+            return False
+        if len(self.items) > self.max_items:
+            self.errors = {'non_field_errors': [f'No more than {self.max_items} items are allowed per request.']}
+            return False
+
+        context = self.load_context()
+        self.serializers = []
+        seen_ids = set()
+        for item in self.items:
+            instance = None
+            if self.update:
+                instance = context['instances'].get(self._int(item.get('id')))
+                if instance is None:
+                    self.errors.append({'id': ['Task with this id does not exist.']})
+                    self.serializers.append(None)
+                    continue
+                if instance.pk in seen_ids:
+                    # Повторный id изменил бы одну задачу дважды и дважды учёл бы её в счётчиках сотрудников
+                    self.errors.append({'id': ['Duplicate id in the request.']})
+                    self.serializers.append(None)
+                    continue
+                seen_ids.add(instance.pk)
+            serializer = TaskBulkItemSerializer(instance, data=item, partial=self.update, context=context)
+            serializer.is_valid()
+            self.errors.append(serializer.errors)
+            self.serializers.append(serializer)
+
+        if self.update:
+            self.check_cycles()
+        if not any(self.errors):
+            self.errors = []
+        return not self.errors
+
+    def check_cycles(self):
+        """ Добавляет ошибки parent_task элементам, задачи которых после записи пакета окажутся в цикле """
+        indexes, parents = {}, {}
+        for index, serializer in enumerate(self.serializers):
+            if serializer is not None and not serializer.errors and 'parent_task' in serializer.validated_data:
+                indexes[serializer.instance.pk] = index
+                parents[serializer.instance.pk] = serializer.validated_data['parent_task']
+
+        for task_id in dependencies.find_cycles(parents):
+            message = 'A task cannot be its own parent.' if parents[task_id] == task_id else \
+                'The parent task depends on this task, which would create a dependency cycle.'
+            self.errors[indexes[task_id]] = {**self.errors[indexes[task_id]], 'parent_task': [message]}
+
+    @transaction.atomic
+    def save(self):
+        """ Записывает проверенные элементы и возвращает список задач """
+        before, fields, now, on_date = [], set(self.derived_fields), timezone.now(), today()
+        for item, serializer in zip(self.items, self.serializers):
+            data = dict(serializer.validated_data)
+            data.pop('id', None)
+            for relation in ('assigned_employee', 'parent_task'):
+                if relation in data:
+                    data[f'{relation}_id'] = data.pop(relation)
+
+            task = serializer.instance or Task()
+            if serializer.instance is not None:
+                before.append((task.assigned_employee_id, task.status))
+            for field, value in data.items():
+                setattr(task, field, value)
+            task.updated_at = now
+            fields.update(field[:-3] if field.endswith('_id') else field for field in data)
+
+            # Статус вычисляется по тем же правилам, что и при сохранении задачи через API и админку
+            apply_transition(task, on_date)
+            self.tasks.append(task)
+
+        if self.update:
+            Task.objects.bulk_update(self.tasks, sorted(fields))
+        else:
+            Task.objects.bulk_create(self.tasks)
+
+        # bulk-операции не отправляют сигналы, поэтому счётчики сотрудников и кеш ответов обновляются явно
+        after = [(task.assigned_employee_id, task.status) for task in self.tasks]
+        apply_workload_deltas(workload_deltas(before, after))
+        for task in self.tasks:
+            task.remember_workload()
+        response_cache.invalidate()
+        return self.tasks
+
+    @classmethod
+    def _ints(cls, values):
+        return [value for value in map(cls._int, values) if value is not None]
+
+    @staticmethod
+    def _int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,62 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from config.cache import response_cache
+from employees.models import Employee
+from employees.workload import workload_deltas, apply_workload_deltas
+from tasks.models import Task
+
+
+@receiver(pre_save, sender=Task)
+def capture_task_workload(sender, instance, **kwargs):
+    """
+    Определяет исполнителя и статус задачи до сохранения.
+
+    Состояние читается из базы с блокировкой строки в транзакции сохранения (Task.save), а не берётся
+    из значений, загруженных вместе с экземпляром: если задачу параллельно изменил другой запрос,
+    изменения счётчиков вычисляются от записанного им состояния, и счётчики не расходятся с задачами.
+    """
+    if instance._state.adding:
+        instance._workload_before = None
+        return
+
+    instance._workload_before = (Task.objects.using(kwargs.get('using')).select_for_update()
+                                 .filter(pk=instance.pk).values_list('assigned_employee_id', 'status').first())
+
+
+@receiver(post_save, sender=Task)
+def update_workload_on_save(sender, instance, update_fields=None, **kwargs):
+    """ Обновляет счётчики задач сотрудников при создании, переназначении и смене статуса задачи """
+    before = getattr(instance, '_workload_before', None)
+    after = (instance.assigned_employee_id, instance.status)
+    if before and update_fields is not None:
+        # Поля, не попавшие в update_fields, в базе не изменились
+        after = (
+            after[0] if {'assigned_employee', 'assigned_employee_id'} & update_fields else before[0],
+            after[1] if 'status' in update_fields else before[1],
+        )
+    apply_workload_deltas(workload_deltas([before] if before else [], [after]))
+    instance._loaded_workload = after
+
+
+@receiver(post_delete, sender=Task)
+def update_workload_on_delete(sender, instance, **kwargs):
+    """ Уменьшает счётчики сотрудника при удалении задачи (в том числе каскадном) """
+    before = getattr(instance, '_loaded_workload', None) or (instance.assigned_employee_id, instance.status)
+    apply_workload_deltas(workload_deltas([before]))
+
+
+@receiver(pre_delete, sender=Employee)
+def touch_tasks_of_deleted_employee(sender, instance, **kwargs):
+    """ Обновляет отметку изменения задач, у которых при удалении сотрудника сбрасывается исполнитель """
+    Task.objects.filter(assigned_employee=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_response_cache(sender, **kwargs):
+    """ Сбрасывает кеш ответов API при любой записи задач и сотрудников """
+    response_cache.invalidate()
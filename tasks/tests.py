@@ -1,11 +1,33 @@
+import base64
 import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
 
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
+from config.authentication import principal_cache
+from config.renderers import FastJSONRenderer
+from config.throttling import admission_control
 from employees.models import Employee
+from scripts.management.commands.bench_docs import Command as BenchDocsCommand
+from tasks.filters import search_condition
 from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from tasks.transitions import sync_statuses
 
 
 class TasksTestCase(APITestCase):
@@ -44,6 +66,52 @@ class TasksTestCase(APITestCase):
         self.assertEqual(len(response.data['results']), 3)
         self.assertEqual(response.data['results'][0]['name'], 'Develop Login Page')
 
+    def test_list_tasks_cursor_pagination(self):
+        """ Тестирование курсорной пагинации списка задач """
+
+        response = self.client.get('/tasks/', {'pagination': 'cursor', 'ordering': 'deadline', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual([task['name'] for task in response.data['results']],
+                         ['Create API Endpoints', 'Develop Login Page'])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([task['name'] for task in response.data['results']], ['Test User Authentication'])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get('/tasks/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_tasks_tampered_cursor(self):
+        """ Курсор с неверными значениями ключа отклоняется с 404 """
+
+        for ordering, values in [('pk', ['abc']), ('pk', [{'a': 1}]), ('pk', [None]),
+                                 ('deadline', ['not a date', 1]), ('deadline', [[2024], 1])]:
+            payload = json.dumps({'o': ordering, 'v': values, 'r': False})
+            cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+            response = self.client.get('/tasks/', {'pagination': 'cursor', 'ordering': ordering, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, payload)
+
+    def test_export_tasks_ndjson(self):
+        """ Тестирование потоковой выгрузки задач в NDJSON """
+
+        response = self.client.get(reverse('tasks:task-export', kwargs={'export_format': 'ndjson'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['name'], 'Develop Login Page')
+        self.assertEqual(rows[0]['assigned_employee'], self.employee.pk)
+        self.assertEqual(rows[1]['deadline'], '2024-09-07')
+
+        response = self.client.get(reverse('tasks:task-export', kwargs={'export_format': 'xml'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_read_task(self):
         """ Тестирование просмотра задачи """
 
@@ -64,6 +132,41 @@ class TasksTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['priority'], updated_data['priority'])
 
+    def test_conditional_get_task(self):
+        """ Тестирование условного запроса задачи по ETag """
+        url = reverse('tasks:task-read-update-delete', kwargs={'pk': self.first_task.id})
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get('/tasks/')
+        response = self.client.get('/tasks/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(url, data={'priority': 'low'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_task_if_match(self):
+        """ Тестирование оптимистичной блокировки обновления задачи заголовком If-Match """
+        url = reverse('tasks:task-read-update-delete', kwargs={'pk': self.third_task.id})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.patch(url, data={'priority': 'high'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Повторная запись со старым ETag отклоняется
+        response = self.client.patch(url, data={'priority': 'low'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Task.objects.get(pk=self.third_task.id).priority, 'high')
+
     def test_delete_task(self):
         """ Тестирование удаление задачи """
 
@@ -109,3 +212,768 @@ class ImportantTasksViewTest(APITestCase):
         self.assertIn('employee', task_assigned)
         self.assertIn('fullname', task_assigned['employee'])
         self.assertIn('Doe John', task_assigned['employee']['fullname'])
+
+    def test_skips_employee_without_parent_tasks_left(self):
+        """ Сотрудник, у которого переназначили последнюю задачу с родительской задачей, пропускается """
+        employee3 = Employee.objects.create(first_name="Ann", last_name="Lee", position="Tester", experience=1)
+        today = datetime.date.today()
+        parent = Task.objects.create(name="Parent", deadline=today, status='to_assign')
+        # Важная задача со старым исполнителем: после переназначения у employee3 не остаётся задач с родителем
+        reassigned = Task.objects.create(name="Reassigned Task", deadline=today, status='to_assign',
+                                         assigned_employee=employee3, parent_task=parent)
+        last = Task.objects.create(name="Last Task", deadline=today, status='to_assign')
+        for task in (reassigned, last):
+            Task.objects.create(name=f"Blocked by {task.name}", assigned_employee=self.employee2, deadline=today,
+                                status='in_progress', parent_task=task)
+
+        response = self.client.get(reverse('tasks:important_tasks'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({task['task'] for task in response.data}, {"Task to Assign", "Reassigned Task", "Last Task"})
+        last.refresh_from_db()
+        self.assertEqual(last.assigned_employee, self.employee1)
+
+    def test_important_tasks_constant_queries(self):
+        """ Количество запросов не зависит от количества назначаемых задач """
+        for i in range(10):
+            task = Task.objects.create(name=f"Blocking Task {i}", deadline=datetime.date.today(), status='to_assign')
+            Task.objects.create(name=f"Blocked Task {i}", assigned_employee=self.employee2,
+                                deadline=datetime.date.today(), status='in_progress', parent_task=task)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:important_tasks'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 11)
+        self.assertLessEqual(len(queries), 7)
+        self.assertFalse(Task.objects.filter(status='to_assign').exists())
+
+
+class AssignmentSolverTest(APITestCase):
+    """ Тестирование пакетного назначения задач (tasks.assignment) """
+
+    def setUp(self):
+        today = datetime.date.today()
+        self.junior = Employee.objects.create(first_name="Junior", last_name="Dev", position="Developer", experience=1)
+        self.senior = Employee.objects.create(first_name="Senior", last_name="Dev", position="Developer", experience=10)
+        self.parent = Task.objects.create(name="Parent", priority='low', deadline=today,
+                                          assigned_employee=self.senior, status='in_progress')
+        self.high = Task.objects.create(name="High", priority='high', deadline=today, status='to_assign')
+        self.low = Task.objects.create(name="Low", priority='low', deadline=today, status='to_assign')
+        self.child = Task.objects.create(name="Child", priority='high', deadline=today, status='to_assign',
+                                         parent_task=self.parent)
+
+    def test_preview_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:assignment-preview'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 3)
+        assignments = {item['task']: item['employee'] for item in response.data['assignments']}
+        # Важная задача - опытному сотруднику, простая - начинающему, дочерняя - исполнителю родительской
+        self.assertEqual(assignments, {self.high.pk: self.senior.pk, self.low.pk: self.junior.pk,
+                                       self.child.pk: self.senior.pk})
+        summary = response.data['summary']
+        self.assertEqual((summary['assigned'], summary['unassigned'], summary['parent_matches']), (3, 0, 1))
+        self.assertEqual(summary['load_after']['max'], 3)
+        self.assertEqual(Task.objects.filter(status='to_assign').count(), 3)
+
+    def test_apply_writes_assignments(self):
+        fingerprint = self.client.get(reverse('tasks:assignment-preview')).data['fingerprint']
+        response = self.client.post(reverse('tasks:assignment-apply'), {'fingerprint': fingerprint}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Task.objects.filter(status='to_assign').exists())
+        self.assertEqual(Task.objects.get(pk=self.child.pk).assigned_employee_id, self.senior.pk)
+        self.senior.refresh_from_db()
+        self.junior.refresh_from_db()
+        self.assertEqual((self.senior.tasks_in_progress, self.junior.tasks_in_progress), (3, 1))
+
+    def test_overdue_assignments_not_counted_in_load(self):
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        Task.objects.filter(pk__in=[self.high.pk, self.low.pk, self.child.pk]).update(deadline=yesterday)
+
+        fingerprint = self.client.get(reverse('tasks:assignment-preview')).data['fingerprint']
+        response = self.client.post(reverse('tasks:assignment-apply'), {'fingerprint': fingerprint}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(status='overdue').count(), 3)
+        # Итоговая нагрузка совпадает с сохранёнными счётчиками задач в работе
+        loads = sorted(Employee.objects.values_list('tasks_in_progress', flat=True))
+        self.assertEqual(loads, [0, 1])
+        self.assertEqual(response.data['summary']['load_after'], response.data['summary']['load_before'])
+        self.assertEqual(sum(Employee.objects.values_list('tasks_overdue', flat=True)), 3)
+
+    def test_apply_rejects_outdated_preview(self):
+        fingerprint = self.client.get(reverse('tasks:assignment-preview')).data['fingerprint']
+        Task.objects.create(name="New", priority='medium', deadline=datetime.date.today(), status='to_assign')
+
+        response = self.client.post(reverse('tasks:assignment-apply'), {'fingerprint': fingerprint}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Task.objects.filter(status='to_assign').count(), 4)
+
+    def test_max_load(self):
+        response = self.client.get(reverse('tasks:assignment-preview'), {'max_load': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['assigned'], 1)
+        self.assertEqual(len(response.data['unassigned']), 2)
+
+
+class TaskTransitionsTest(APITestCase):
+    """ Тестирование вычисления статуса задачи (tasks.transitions) """
+
+    def setUp(self):
+        self.employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        self.deadline = datetime.date.today() + datetime.timedelta(days=5)
+        self.task = Task.objects.create(name="Task", priority="low", deadline=self.deadline, status='in_progress',
+                                        assigned_employee=self.employee)
+
+    def test_create_derives_status(self):
+        """ Переданный статус не учитывается: задача без исполнителя создаётся в статусе to_assign """
+        response = self.client.post(reverse('tasks:task-list-create'), {
+            'name': "New", 'priority': "low", 'deadline': self.deadline, 'status': 'completed',
+            'assigned_employee': '',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], 'to_assign')
+
+    def test_update_writes_once(self):
+        """ Обновление записывает задачу одним UPDATE только изменённых полей """
+        url = reverse('tasks:task-read-update-delete', kwargs={'pk': self.task.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'priority': 'high'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"priority"', updates[0])
+        self.assertNotIn('"name"', updates[0])
+        self.assertEqual(response.data['status'], 'in_progress')
+
+        # Снятие исполнителя сбрасывает время выполнения и возвращает задачу в to_assign
+        response = self.client.patch(url, {'assigned_employee': '', 'completion_time': self.deadline})
+        self.assertEqual((response.data['status'], response.data['completion_time']), ('to_assign', None))
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.tasks_in_progress, 0)
+
+    def test_sync_statuses(self):
+        """ Пересчёт статусов в базе по тем же правилам с обновлением счётчиков сотрудников """
+        Task.objects.create(name="Done", priority="low", deadline=self.deadline, status='in_progress',
+                            assigned_employee=self.employee, completion_time=datetime.date.today())
+        Task.objects.create(name="Orphan", priority="low", deadline=self.deadline, status='in_progress',
+                            completion_time=datetime.date.today())
+
+        self.assertEqual(sync_statuses(Task.objects.all()), 2)
+        self.assertEqual(dict(Task.objects.values_list('name', 'status')),
+                         {'Task': 'in_progress', 'Done': 'completed', 'Orphan': 'to_assign'})
+        self.assertIsNone(Task.objects.get(name="Orphan").completion_time)
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.tasks_in_progress, self.employee.tasks_completed), (1, 1))
+        self.assertEqual(sync_statuses(Task.objects.all()), 0)
+
+
+class MarkOverdueCommandTest(APITestCase):
+    """ Тестирование команды mark_overdue """
+
+    def setUp(self):
+        self.employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        for i in range(5):
+            Task.objects.create(name=f"Late Task {i}", assigned_employee=self.employee, deadline=yesterday,
+                                priority="low", status='in_progress')
+        self.on_time = Task.objects.create(name="On Time Task", assigned_employee=self.employee,
+                                           deadline=datetime.date.today(), priority="low", status='in_progress')
+
+    def test_dry_run(self):
+        """ Тестирование режима dry-run: задачи только подсчитываются """
+        out = StringIO()
+        call_command('mark_overdue', '--dry-run', stdout=out)
+        self.assertIn('Overdue tasks to mark: 5', out.getvalue())
+        self.assertFalse(Task.objects.filter(status='overdue').exists())
+
+    def test_mark_overdue_in_batches(self):
+        """ Тестирование пакетного перевода просроченных задач в статус 'overdue' """
+        call_command('mark_overdue', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(Task.objects.filter(status='overdue').count(), 5)
+        self.on_time.refresh_from_db()
+        self.assertEqual(self.on_time.status, 'in_progress')
+
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.tasks_in_progress, self.employee.tasks_overdue), (1, 5))
+
+    def test_unassigned_tasks_reported_separately(self):
+        """ Тестирование задач в работе без исполнителя: они возвращаются в to_assign и не считаются просроченными """
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        Task.objects.create(name="Orphan Task", deadline=yesterday, priority="low", status='in_progress')
+
+        out = StringIO()
+        call_command('mark_overdue', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Overdue tasks to mark: 5', out.getvalue())
+        self.assertIn('Unassigned tasks to return to to_assign: 1', out.getvalue())
+        self.assertIn('Marked 5 tasks as overdue', out.getvalue())
+        self.assertIn('Returned 1 unassigned tasks to to_assign', out.getvalue())
+        self.assertEqual(Task.objects.get(name="Orphan Task").status, 'to_assign')
+
+    def test_invalid_batch_size(self):
+        """ Тестирование проверки размера пачки: задачи не изменяются """
+        for batch_size in ('0', '-5'):
+            with self.assertRaisesMessage(CommandError, '--batch-size'):
+                call_command('mark_overdue', '--batch-size', batch_size, stdout=StringIO())
+        self.assertFalse(Task.objects.filter(status='overdue').exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Планы EXPLAIN разбираются только для PostgreSQL')
+class ExplainEndpointsCommandTest(APITestCase):
+    """ Тестирование команды explain_endpoints """
+
+    def test_explain_endpoints(self):
+        """ Тестирование проверки планов запросов эндпоинтов на тестовых данных, которые откатываются """
+        out = StringIO()
+        call_command('explain_endpoints', '--seed-tasks', '200', '--seed-employees', '10', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('Seeded 10 employees and 200 tasks', output)
+        for name in ('task list', 'task detail', 'employee list', 'busy employees', 'important tasks'):
+            self.assertIn(f'{name}: GET', output)
+        self.assertNotIn('-> 500', output)
+        self.assertEqual(Task.objects.count(), 0)
+
+
+class TaskBulkApiTest(APITestCase):
+    """ Тестирование пакетного создания и обновления задач """
+
+    def setUp(self):
+        self.employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        self.parent = Task.objects.create(name="Parent Task", deadline=datetime.date.today(), priority="high",
+                                          status='to_assign')
+        self.deadline = (datetime.date.today() + datetime.timedelta(days=5)).isoformat()
+
+    def test_bulk_create(self):
+        """ Тестирование создания задач одним запросом с постоянным числом запросов к базе """
+        data = [{"name": f"Imported Task {i}", "priority": "low", "deadline": self.deadline,
+                 "assigned_employee": self.employee.pk if i % 2 else None, "parent_task": self.parent.pk}
+                for i in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('tasks:task-bulk'), data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 20)
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(Task.objects.filter(status='in_progress').count(), 10)
+        self.assertEqual(Task.objects.filter(status='to_assign', parent_task=self.parent).count(), 10)
+
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.tasks_in_progress, 10)
+
+    def test_bulk_create_reports_item_errors(self):
+        """ Тестирование ошибок по элементам: при ошибке ничего не записывается """
+        data = [
+            {"name": "Valid Task", "priority": "low", "deadline": self.deadline},
+            {"name": "Invalid Task", "priority": "low", "deadline": self.deadline, "assigned_employee": 999999},
+        ]
+        response = self.client.post(reverse('tasks:task-bulk'), data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('assigned_employee', response.data[1])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_bulk_update(self):
+        """ Тестирование пакетного обновления с вычислением статуса """
+        data = [{"id": self.parent.pk, "assigned_employee": self.employee.pk, "priority": "medium"}]
+        response = self.client.patch(reverse('tasks:task-bulk'), data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.parent.refresh_from_db()
+        self.assertEqual((self.parent.status, self.parent.priority), ('in_progress', 'medium'))
+        self.assertEqual(self.parent.assigned_employee, self.employee)
+
+    def test_bulk_update_rejects_cycles_within_batch(self):
+        """ Тестирование циклов, которые образуют несколько элементов пакета вместе """
+        a, b, c = (Task.objects.create(name=f"Task {name}", deadline=datetime.date.today(), status='to_assign')
+                   for name in 'ABC')
+        for data in ([{"id": a.pk, "parent_task": b.pk}, {"id": b.pk, "parent_task": a.pk}],
+                     [{"id": a.pk, "parent_task": b.pk}, {"id": b.pk, "parent_task": c.pk},
+                      {"id": c.pk, "parent_task": a.pk}]):
+            response = self.client.patch(reverse('tasks:task-bulk'), data=data, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertTrue(all('parent_task' in errors for errors in response.data))
+            self.assertFalse(Task.objects.filter(pk__in=[a.pk, b.pk, c.pk], parent_task__isnull=False).exists())
+
+        # Цепочка без замыкания допустима
+        data = [{"id": a.pk, "parent_task": b.pk}, {"id": b.pk, "parent_task": c.pk}]
+        self.assertEqual(self.client.patch(reverse('tasks:task-bulk'), data=data, format='json').status_code,
+                         status.HTTP_200_OK)
+
+    def test_bulk_update_parents_constant_queries(self):
+        """ Тестирование смены родительских задач: число запросов не зависит от размера пакета """
+        tasks = Task.objects.bulk_create([Task(name=f"Task {i}", deadline=datetime.date.today(), status='to_assign')
+                                          for i in range(50)])
+        for size in (5, 50):
+            data = [{"id": task.pk, "parent_task": self.parent.pk} for task in tasks[:size]]
+            with self.assertNumQueries(8):
+                response = self.client.patch(reverse('tasks:task-bulk'), data=data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_update_rejects_duplicate_ids(self):
+        """ Тестирование повторного id: задача не обновляется, счётчики сотрудника не меняются """
+        data = [{"id": self.parent.pk, "assigned_employee": self.employee.pk},
+                {"id": self.parent.pk, "assigned_employee": self.employee.pk}]
+        response = self.client.patch(reverse('tasks:task-bulk'), data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('id', response.data[1])
+        self.parent.refresh_from_db()
+        self.employee.refresh_from_db()
+        self.assertEqual((self.parent.status, self.employee.tasks_in_progress), ('to_assign', 0))
+
+
+class LoadDatasetCommandTest(APITestCase):
+    """ Тестирование команды load_dataset """
+
+    def test_load_fixtures(self):
+        """ Тестирование загрузки фикстур с разрешением родительских задач вторым проходом """
+        out = StringIO()
+        call_command('load_dataset', 'employees/fixtures/employees.json', 'tasks/fixtures/tasks.json', stdout=out)
+
+        self.assertEqual(Employee.objects.count(), 5)
+        self.assertEqual(Task.objects.count(), 8)
+        self.assertTrue(Task.objects.filter(parent_task__isnull=False).exists())
+        self.assertIn('rows/s', out.getvalue())
+
+        # Последовательность pk продолжается после загруженных id
+        task = Task.objects.create(name="New Task", deadline=datetime.date.today(), status='to_assign')
+        self.assertGreater(task.pk, 8)
+
+    def test_load_ndjson_without_copy(self):
+        """ Тестирование загрузки NDJSON через bulk_create """
+        rows = [{"id": i, "name": f"Task {i}", "priority": "low", "deadline": "2024-08-10", "status": "to_assign",
+                 "parent_task": i - 1 if i > 1 else None} for i in range(1, 6)]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            file.write('\n'.join(json.dumps(row) for row in rows))
+
+        call_command('load_dataset', file.name, '--model', 'tasks.task', '--no-copy', '--batch-size', '2',
+                     stdout=StringIO())
+        os.unlink(file.name)
+
+        self.assertEqual(Task.objects.get(pk=5).parent_task_id, 4)
+        self.assertEqual(Task.objects.filter(parent_task__isnull=True).count(), 1)
+
+
+class TaskDependenciesTest(APITestCase):
+    """ Тестирование цепочек зависимостей задач """
+
+    def setUp(self):
+        # Цепочка root <- task 1 <- task 2 <- ... <- task 200
+        self.root = Task.objects.create(name="Root Task", deadline=datetime.date.today(), status='to_assign')
+        parent_id = self.root.pk
+        self.chain = []
+        for i in range(200):
+            task = Task.objects.bulk_create([Task(name=f"Task {i}", deadline=datetime.date.today(),
+                                                  status='to_assign', parent_task_id=parent_id)])[0]
+            self.chain.append(task)
+            parent_id = task.pk
+
+    def test_subtree(self):
+        """ Тестирование получения поддерева одним рекурсивным запросом """
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('tasks:task-subtree', kwargs={'pk': self.root.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 200)
+        self.assertEqual(response.data[0]['id'], self.chain[0].pk)
+        self.assertEqual(response.data[-1]['depth'], 200)
+
+    def test_ancestors(self):
+        """ Тестирование получения цепочки родительских задач """
+        response = self.client.get(reverse('tasks:task-ancestors', kwargs={'pk': self.chain[-1].pk}))
+
+        self.assertEqual(len(response.data), 200)
+        self.assertEqual(response.data[0]['id'], self.chain[-2].pk)
+        self.assertEqual(response.data[-1]['id'], self.root.pk)
+
+    def test_reject_cycle(self):
+        """ Тестирование запрета циклических зависимостей """
+        response = self.client.patch(reverse('tasks:task-read-update-delete', kwargs={'pk': self.root.pk}),
+                                     data={'parent_task': self.chain[-1].pk})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('dependency cycle', response.content.decode())
+        self.root.refresh_from_db()
+        self.assertIsNone(self.root.parent_task_id)
+
+
+class FastReadPathTest(APITestCase):
+    """ Тестирование быстрого чтения задач через .values() и FastJSONRenderer """
+
+    def setUp(self):
+        employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        parent = Task.objects.create(name="Сверстать страницу входа", description="Описание\u2028строка",
+                                     priority="high", deadline="2024-08-10", status='completed',
+                                     completion_time="2024-08-01", assigned_employee=employee)
+        Task.objects.create(name="Test 1e5 requests", deadline="2024-09-07", priority="low", status='to_assign',
+                            parent_task=parent)
+
+    def test_list_matches_serializer(self):
+        """ Тестирование побайтного совпадения списка задач с ответом сериализатора """
+        data = TaskSerializer(Task.objects.order_by('pk'), many=True).data
+        expected = JSONRenderer().render({'count': 2, 'next': None, 'previous': None, 'results': data})
+
+        response = self.client.get('/tasks/')
+        self.assertEqual(response.content, expected)
+
+    def test_detail_matches_serializer(self):
+        """ Тестирование побайтного совпадения задачи с ответом сериализатора """
+        task = Task.objects.order_by('pk').first()
+        response = self.client.get(reverse('tasks:task-read-update-delete', kwargs={'pk': task.pk}))
+        self.assertEqual(response.content, JSONRenderer().render(TaskSerializer(task).data))
+
+    def test_sparse_fieldsets(self):
+        """ Тестирование ?fields= и ?exclude=: ответ совпадает с сериализатором, лишние столбцы не читаются """
+        tasks = Task.objects.order_by('pk')
+        fields = ('id', 'name', 'deadline', 'status')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/tasks/?fields=name,status,id,deadline')
+        self.assertEqual(response.json()['results'], TaskSerializer(tasks, many=True, fields=fields).data)
+        self.assertNotIn('"description"', captured.captured_queries[-1]['sql'])
+
+        response = self.client.get('/tasks/?exclude=description,completion_time&fields=id,name,description')
+        self.assertEqual(response.json()['results'], [{'id': task.pk, 'name': task.name} for task in tasks])
+        response = self.client.get(f'/async/tasks/{tasks[0].pk}/?fields=id,name,description')
+        self.assertEqual(response.json(), TaskSerializer(tasks[0], fields=('id', 'name', 'description')).data)
+
+        response = self.client.get('/tasks/?fields=id,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.json())
+
+        # Курсор строится по столбцам сортировки, даже если их нет среди полей ответа
+        response = self.client.get('/tasks/?pagination=cursor&ordering=deadline&page_size=1&fields=name')
+        self.assertEqual(response.json()['results'], [{'name': tasks[0].name}])
+        self.assertEqual(self.client.get(response.json()['next']).json()['results'], [{'name': tasks[1].name}])
+
+    def test_sparse_fieldsets_etag(self):
+        """ Тестирование ETag частичного представления: свой для каждого набора полей """
+        url = reverse('tasks:task-read-update-delete', kwargs={'pk': Task.objects.order_by('pk').first().pk})
+        full = self.client.get(url)['ETag']
+        sparse = self.client.get(url + '?fields=id,name')['ETag']
+        self.assertNotEqual(full, sparse)
+        self.assertEqual(self.client.get(url + '?fields=id,name', HTTP_IF_NONE_MATCH=sparse).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=sparse).status_code, status.HTTP_200_OK)
+
+    def test_renderer_matches_stdlib(self):
+        """ Тестирование совпадения FastJSONRenderer со стандартным JSONRenderer """
+        for data in [{'a': 1e16, 'b': 1e-7}, {1: 'int key'}, {'text': 'é \x01'}, {'big': 2 ** 70}]:
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class TaskFilterTest(APITestCase):
+    """ Тестирование фильтров, сортировки и поиска в списке задач """
+
+    def setUp(self):
+        self.employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        self.parent = Task.objects.create(name="Сверстать страницу входа", description="Форма логина и пароля",
+                                          priority="high", deadline="2024-08-10", status='in_progress',
+                                          assigned_employee=self.employee)
+        Task.objects.create(name="Invoice export", description="Export invoices to CSV", priority="low",
+                            deadline="2024-09-07", status='to_assign', parent_task=self.parent)
+        Task.objects.create(name="Payment report", priority="medium", deadline="2024-08-20", status='completed',
+                            completion_time="2024-08-19", assigned_employee=self.employee)
+
+    def get_names(self, query):
+        response = self.client.get('/tasks/?' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['name'] for task in response.json()['results']]
+
+    def test_filters(self):
+        """ Тестирование фильтров по статусу, приоритету, сроку и связям """
+        self.assertEqual(self.get_names('status=to_assign,completed'), ["Invoice export", "Payment report"])
+        self.assertEqual(self.get_names('priority=high'), ["Сверстать страницу входа"])
+        self.assertEqual(self.get_names('deadline_after=2024-08-11&deadline_before=2024-09-07'),
+                         ["Invoice export", "Payment report"])
+        self.assertEqual(self.get_names(f'assigned_employee={self.employee.pk}&status=completed'), ["Payment report"])
+        self.assertEqual(self.get_names(f'parent_task={self.parent.pk}'), ["Invoice export"])
+        self.assertEqual(self.get_names('unassigned=true'), ["Invoice export"])
+        self.assertEqual(self.get_names('has_parent=false&ordering=-deadline'),
+                         ["Payment report", "Сверстать страницу входа"])
+        self.assertEqual(self.client.get('/tasks/?status=unknown').status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск и индекс task_search_idx - PostgreSQL')
+    def test_search(self):
+        """ Тестирование полнотекстового поиска по названию и описанию """
+        self.assertEqual(self.get_names('search=export'), ["Invoice export"])
+        self.assertEqual(self.get_names('search=invoices'), ["Invoice export"])
+        self.assertEqual(self.get_names('search=report -invoice'), ["Payment report"])
+        self.assertEqual(self.get_names('search=export payment'), [])
+
+    def test_search_condition(self):
+        """ Тестирование поиска без полнотекстового индекса: фразы и исключения """
+        def names(value):
+            return list(Task.objects.filter(search_condition(value)).order_by('pk').values_list('name', flat=True))
+
+        self.assertEqual(names('export'), ["Invoice export"])
+        self.assertEqual(names('report -invoice'), ["Payment report"])
+        self.assertEqual(names('"to CSV"'), ["Invoice export"])
+        self.assertEqual(names('-"to CSV" -"'), ["Сверстать страницу входа", "Payment report"])
+
+    def test_ordering(self):
+        """ Тестирование сортировки и совпадения с курсорным режимом и асинхронным списком """
+        expected = ["Invoice export", "Payment report", "Сверстать страницу входа"]
+        self.assertEqual(self.get_names('ordering=-deadline'), expected)
+        self.assertEqual(self.get_names('ordering=-deadline&pagination=cursor'), expected)
+        response = self.client.get(reverse('tasks:task-list-async') + '?ordering=-deadline&search=export')
+        self.assertEqual([task['name'] for task in response.json()['results']], ["Invoice export"])
+
+    def test_ordering_by_priority(self):
+        """ Тестирование сортировки по рангу приоритета (low < medium < high), а не по алфавиту """
+        expected = ["Invoice export", "Payment report", "Сверстать страницу входа"]
+        self.assertEqual(self.get_names('ordering=priority'), expected)
+        self.assertEqual(self.get_names('ordering=-priority'), expected[::-1])
+        self.assertEqual(self.get_names('ordering=-priority&pagination=cursor'), expected[::-1])
+
+        # Курсор переходит по страницам в том же порядке
+        names, url = [], '/tasks/?ordering=priority&pagination=cursor&page_size=1'
+        while url:
+            response = self.client.get(url).json()
+            names += [task['name'] for task in response['results']]
+            url = response['next']
+        self.assertEqual(names, expected)
+
+        response = self.client.get(reverse('tasks:task-list-async') + '?ordering=priority&pagination=cursor')
+        self.assertEqual([task['name'] for task in response.json()['results']], expected)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Бенчмарк выводит планы с индексом task_search_idx')
+    def test_bench_filters(self):
+        """ Тестирование бенчмарка комбинаций фильтров """
+        out = StringIO()
+        call_command('bench_filters', '--preset', '1k', '--combination-size', '1', '--requests', '1', stdout=out)
+        self.assertIn('search', out.getvalue())
+        self.assertIn('task_search_idx', out.getvalue())
+
+
+class AsyncViewsTest(APITestCase):
+    """ Тестирование асинхронных представлений задач """
+
+    def setUp(self):
+        employee = Employee.objects.create(first_name="John", last_name="Doe", position="Developer", experience=5)
+        for number in range(12):
+            Task.objects.create(name=f"Task {number}", deadline="2024-09-07", priority="low",
+                                status='in_progress', assigned_employee=employee)
+
+    async def test_list_matches_sync_view(self):
+        """ Тестирование совпадения асинхронного списка задач с синхронным на всех режимах пагинации """
+        client = AsyncClient()
+        for query in ['', '?page=2', '?page_size=5&page=last', '?pagination=cursor&ordering=-deadline']:
+            sync_response = await client.get('/tasks/' + query)
+            async_response = await client.get(reverse('tasks:task-list-async') + query)
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(async_response.content.replace(b'/async/', b'/'), sync_response.content)
+
+    async def test_detail(self):
+        """ Тестирование асинхронного просмотра задачи и ответа 404 """
+        client = AsyncClient()
+        task = await Task.objects.order_by('pk').afirst()
+        response = await client.get(reverse('tasks:task-detail-async', kwargs={'pk': task.pk}))
+        self.assertEqual(response.content, (await client.get(f'/tasks/{task.pk}/')).content)
+
+        response = await client.get(reverse('tasks:task-detail-async', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {'detail': 'No Task matches the given query.'})
+
+    def test_invalid_page(self):
+        """ Тестирование ответа 404 на несуществующую страницу """
+        response = self.client.get(reverse('tasks:task-list-async') + '?page=10')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), self.client.get('/tasks/?page=10').json())
+
+
+class QueryBudgetTest(APITestCase):
+    """ Тестирование бюджетов SQL-запросов эндпоинтов """
+
+    def test_endpoints_within_query_budgets(self):
+        """ Тестирование того, что ни один GET-эндпоинт не превышает бюджет запросов """
+        out = StringIO()
+        call_command('bench_endpoints', '--employees', '10', '--tasks', '200', '--chains', '3', '--chain-depth', '5',
+                     '--requests', '2', stdout=out)
+
+        self.assertIn('tasks:task-subtree', out.getvalue())
+        self.assertIn('employees:busy_employees', out.getvalue())
+        self.assertIn('within their query budgets', out.getvalue())
+
+
+class ConnectionReuseTest(APITestCase):
+    """ Тестирование повторного использования соединений с базой """
+
+    def test_persistent_connections_reused(self):
+        """ Тестирование того, что постоянное соединение открывается один раз на поток """
+        out = StringIO()
+        call_command('bench_connections', '--path', reverse('employees:employees-list'), '--concurrency', '1',
+                     '--requests', '10', stdout=out)
+
+        connects = {row.split()[0]: row.split()[6] for row in out.getvalue().splitlines()[2:]}
+        self.assertEqual(connects, {'new': '10', 'persistent': '1'})
+
+    def test_database_stats(self):
+        """ Тестирование статистики соединений с базой """
+        admin = User.objects.create_superuser(username='admin', password='admin')
+        self.client.force_authenticate(admin)
+        self.client.delete(reverse('db-pool-stats'))
+
+        response = self.client.get(reverse('db-pool-stats'))
+        self.assertEqual(response.data['default']['requests'], 1)
+        self.assertEqual(response.data['default']['conn_max_age'], settings.DATABASES['default']['CONN_MAX_AGE'])
+
+
+class JWTAuthenticationTest(APITestCase):
+    """ Тестирование JWT-аутентификации с кешем пользователей """
+
+    def setUp(self):
+        principal_cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='admin')
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'admin', 'password': 'admin'})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def test_cached_principal(self):
+        """ Пользователь загружается из базы один раз, дальше запросы не обращаются к базе """
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_consecutive_requests(self):
+        """ Второй запрос с тем же токеном берёт пользователя из кеша и проверяет его так же, как первый """
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_200_OK)
+
+        # simplejwt 5.3 (poetry.lock): настройки CHECK_USER_IS_ACTIVE нет, обращение к ней - AttributeError.
+        # Пользователь уже в кеше, поэтому запросы проверяет только check_user
+        defaults = {name: value for name, value in jwt_settings.defaults.items() if name != 'CHECK_USER_IS_ACTIVE'}
+        jwt_settings.__dict__.pop('CHECK_USER_IS_ACTIVE', None)
+        try:
+            with mock.patch.object(jwt_settings, 'defaults', defaults):
+                for _ in range(2):
+                    self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_200_OK)
+        finally:
+            jwt_settings.__dict__.pop('CHECK_USER_IS_ACTIVE', None)
+
+    def test_deactivation(self):
+        """ Деактивация действует сразу в текущем процессе и после истечения кеша - в остальных """
+        self.client.get(reverse('cache-stats'))
+        User.objects.filter(pk=self.user.pk).update(is_active=False)    # как изменение в другом процессе
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_200_OK)
+        principal_cache.clear()    # истечение JWT_PRINCIPAL_CACHE_TTL
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.client.get(reverse('cache-stats'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bench_auth(self):
+        """ Тестирование сравнения количества запросов к базе при разных способах аутентификации """
+        out = StringIO()
+        call_command('bench_auth', '--requests', '5', stdout=out)
+        queries = {row.split()[0]: float(row.split()[2]) for row in out.getvalue().splitlines()[2:]}
+        self.assertEqual(queries['session'], 2)
+        self.assertEqual(queries['jwt'], 1)
+        self.assertLess(queries['jwt-cached'], 1)
+
+
+class AdmissionControlTest(APITestCase):
+    """ Тестирование ограничения скорости и количества одновременных запросов к дорогим эндпоинтам """
+
+    def setUp(self):
+        caches['throttle'].clear()
+        admission_control.reset_stats()
+        self.url = reverse('employees:busy_employees')
+
+    def test_token_bucket(self):
+        """ Клиент расходует ёмкость корзины, дальше получает 429 с Retry-After до пополнения """
+        rates = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'busy_employees': '2/min'}}
+        with self.settings(REST_FRAMEWORK=rates):
+            for _ in range(2):
+                self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response['Retry-After'], '30')
+            self.assertEqual(self.client.get(reverse('employees:busy_employees-async')).status_code,
+                             status.HTTP_429_TOO_MANY_REQUESTS)
+
+            # У другого клиента своя корзина
+            self.client.force_authenticate(User.objects.create_user(username='user'))
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        stats = admission_control.stats()['busy_employees']
+        self.assertEqual((stats['requests'], stats['throttled'], stats['shed']), (5, 2, 0))
+
+    def test_concurrency_limit(self):
+        """ Запрос сверх лимита одновременных запросов сразу получает 503 без обращения к базе """
+        with self.settings(CONCURRENCY_LIMITS={'busy_employees': 1, 'important_tasks': 1}):
+            self.assertTrue(admission_control.acquire('busy_employees'))    # как запрос в другом потоке
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], str(settings.CONCURRENCY_RETRY_AFTER))
+            self.assertEqual(self.client.get(reverse('employees:busy_employees-async')).status_code,
+                             status.HTTP_503_SERVICE_UNAVAILABLE)
+            admission_control.release('busy_employees')
+
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(reverse('tasks:important_tasks')).status_code, status.HTTP_200_OK)
+
+        stats = admission_control.stats()
+        self.assertEqual((stats['busy_employees']['shed'], stats['busy_employees']['in_flight']), (2, 0))
+        self.assertEqual(stats['important_tasks']['in_flight'], 0)
+
+    def test_stats_view(self):
+        """ Тестирование статистики отклонённых запросов и её сброса """
+        self.client.get(self.url)
+        self.client.force_authenticate(User.objects.create_superuser(username='admin', password='admin'))
+        response = self.client.get(reverse('throttling-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['busy_employees']['requests'], 1)
+        self.assertEqual(response.data['busy_employees']['rate'],
+                         settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['busy_employees'])
+
+        self.assertEqual(self.client.delete(reverse('throttling-stats')).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(reverse('throttling-stats')).data['busy_employees']['requests'], 0)
+
+
+class SchemaDocsTest(APITestCase):
+    """ Тестирование документации API из сгенерированного файла схемы """
+
+    def test_generate_and_serve_schema(self):
+        """ Тестирование команды generate_schema и отдачи схемы из файла с ETag """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'openapi.json')
+            with self.settings(API_SCHEMA_PATH=path):
+                response = self.client.get(reverse('schema'))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+                call_command('generate_schema', stdout=StringIO())
+                call_command('generate_schema', '--check', stdout=StringIO())
+
+                response = self.client.get(reverse('schema'))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                with open(path, 'rb') as file:
+                    self.assertEqual(response.content, file.read())
+                self.assertIn('/tasks/', json.loads(response.content)['paths'])
+
+                response = self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(reverse('schema-swagger-ui'))
+        self.assertContains(response, reverse('schema'))
+
+    def test_startup_does_not_import_drf_yasg(self):
+        """ Тестирование того, что без API_SCHEMA_LIVE воркер не загружает drf_yasg """
+        startups, imported = BenchDocsCommand.measure_startup(live=False, count=1)
+        self.assertFalse(imported)
@@ -0,0 +1,135 @@
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+
+from config.cache import response_cache
+from employees.workload import apply_workload_deltas
+from tasks.models import Task
+
+# Пересчёт статусов одним запросом: строки с изменившимся статусом выбираются с блокировкой (FOR UPDATE),
+# обновляются, а RETURNING даёт пары исполнитель - статус до и после для обновления счётчиков сотрудников
+SYNC_SQL = """
+    WITH changed (id, employee_id, old_status, new_status) AS ({select}),
+    updated AS (
+        UPDATE {table} AS t SET status = c.new_status,
+            completion_time = CASE WHEN c.employee_id IS NULL THEN NULL ELSE t.completion_time END,
+            updated_at = %s
+        FROM changed AS c WHERE t.id = c.id
+        RETURNING c.employee_id, c.old_status, c.new_status
+    )
+    SELECT employee_id, old_status, new_status, COUNT(*) FROM updated GROUP BY employee_id, old_status, new_status
+"""
+
+
+def today():
+    return timezone.now().date()
+
+
+def resolve_status(assigned_employee_id, completion_time, deadline, on_date=None):
+    """
+    Статус задачи по исполнителю, времени выполнения и сроку.
+
+    - нет исполнителя: 'to_assign' (время выполнения при этом сбрасывается);
+    - указано время выполнения: 'overdue', если оно позже срока, иначе 'completed';
+    - срок истёк: 'overdue';
+    - иначе: 'in_progress'.
+
+    Те же правила в виде SQL-выражения - status_expression().
+    """
+    if assigned_employee_id is None:
+        return 'to_assign'
+    if completion_time:
+        return 'overdue' if completion_time > deadline else 'completed'
+    if deadline is not None and deadline < (on_date or today()):
+        return 'overdue'
+    return 'in_progress'
+
+
+def status_expression(on_date=None):
+    """ Правила resolve_status() в виде выражения CASE для вычисления статуса в базе """
+    return Case(
+        When(assigned_employee__isnull=True, then=Value('to_assign')),
+        When(completion_time__gt=F('deadline'), then=Value('overdue')),
+        When(completion_time__isnull=False, then=Value('completed')),
+        When(deadline__lt=on_date or today(), then=Value('overdue')),
+        default=Value('in_progress'),
+    )
+
+
+def apply_transition(task, on_date=None):
+    """
+    Вычисляет статус задачи перед сохранением.
+
+    Returns:
+        Множество изменённых полей ('status', 'completion_time') для update_fields.
+    """
+    changed = set()
+    if task.assigned_employee_id is None and task.completion_time is not None:
+        task.completion_time = None
+        changed.add('completion_time')
+    status = resolve_status(task.assigned_employee_id, task.completion_time, task.deadline, on_date)
+    if task.status != status:
+        task.status = status
+        changed.add('status')
+    return changed
+
+
+def sync_statuses(queryset, on_date=None):
+    """
+    Пересчитывает статусы задач выборки в базе без загрузки строк.
+
+    Returns:
+        Количество изменённых задач.
+    """
+    return sum(sync_status_counts(queryset, on_date).values())
+
+
+def sync_status_counts(queryset, on_date=None):
+    """
+    Пересчитывает статусы задач выборки в базе без загрузки строк.
+
+    Записываются только задачи, у которых статус не совпадает с правилами (или у задачи без исполнителя
+    осталось время выполнения). Счётчики сотрудников и кеш ответов обновляются так же, как при сохранении
+    задачи. На PostgreSQL выполняется один запрос (SYNC_SQL), на других СУБД - группировка изменений и UPDATE.
+
+    Returns:
+        Counter {новый статус: количество изменённых задач}.
+    """
+    connection = connections[queryset.db]
+    now = timezone.now()
+    changed = queryset.annotate(new_status=status_expression(on_date)).filter(
+        ~Q(status=F('new_status')) | Q(assigned_employee__isnull=True, completion_time__isnull=False)
+    ).order_by()
+
+    with transaction.atomic(using=queryset.db):
+        if connection.vendor == 'postgresql':
+            select, params = changed.select_for_update() \
+                .values_list('pk', 'assigned_employee_id', 'status', 'new_status') \
+                .query.get_compiler(queryset.db).as_sql()
+            with connection.cursor() as cursor:
+                cursor.execute(SYNC_SQL.format(select=select, table=connection.ops.quote_name(Task._meta.db_table)),
+                               [*params, now])
+                rows = cursor.fetchall()
+        else:
+            rows = list(changed.values_list('assigned_employee_id', 'status', 'new_status').annotate(count=Count('pk')))
+            queryset.model._default_manager.filter(pk__in=changed.values('pk')).update(
+                status=status_expression(on_date),
+                completion_time=Case(When(assigned_employee__isnull=True, then=Value(None)),
+                                     default=F('completion_time')),
+                updated_at=now,
+            )
+
+        deltas = {}
+        for employee_id, old_status, new_status, count in rows:
+            deltas[(employee_id, old_status)] = deltas.get((employee_id, old_status), 0) - count
+            deltas[(employee_id, new_status)] = deltas.get((employee_id, new_status), 0) + count
+        apply_workload_deltas(deltas)
+        if rows:
+            response_cache.invalidate()
+
+    counts = Counter()
+    for *_, new_status, count in rows:
+        counts[new_status] += count
+    return counts
@@ -1,12 +1,25 @@
 from django.urls import path
 
 from tasks.apps import TasksConfig
-from tasks.views import TaskListApi, TaskDetailApi, ImportantTasksView
+from tasks.views import TaskListApi, TaskDetailApi, ImportantTasksView, TaskBulkApi, TaskExportApi, \
+    TaskSubtreeApi, TaskAncestorsApi, TaskListAsyncApi, TaskDetailAsyncApi, ImportantTasksAsyncView, \
+    TaskAssignmentPreviewApi, TaskAssignmentApplyApi
 
 app_name = TasksConfig.name
 
 urlpatterns = [
     path('tasks/', TaskListApi.as_view(), name='task-list-create'),
+    path('tasks/export/<str:export_format>/', TaskExportApi.as_view(), name='task-export'),
+    path('tasks/bulk/', TaskBulkApi.as_view(), name='task-bulk'),
     path('tasks/<int:pk>/', TaskDetailApi.as_view(), name='task-read-update-delete'),
-    path('tasks/important-tasks/', ImportantTasksView.as_view(), name='important_tasks')
+    path('tasks/<int:pk>/subtree/', TaskSubtreeApi.as_view(), name='task-subtree'),
+    path('tasks/<int:pk>/ancestors/', TaskAncestorsApi.as_view(), name='task-ancestors'),
+    path('tasks/important-tasks/', ImportantTasksView.as_view(), name='important_tasks'),
+    path('tasks/assignment/preview/', TaskAssignmentPreviewApi.as_view(), name='assignment-preview'),
+    path('tasks/assignment/apply/', TaskAssignmentApplyApi.as_view(), name='assignment-apply'),
+
+    # Асинхронные представления для запуска под ASGI
+    path('async/tasks/', TaskListAsyncApi.as_view(), name='task-list-async'),
+    path('async/tasks/<int:pk>/', TaskDetailAsyncApi.as_view(), name='task-detail-async'),
+    path('async/tasks/important-tasks/', ImportantTasksAsyncView.as_view(), name='important_tasks-async'),
 ]
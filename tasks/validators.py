@@ -4,7 +4,7 @@ from rest_framework.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from datetime import timedelta
 
-from employees.models import Employee
+from tasks import dependencies
 
 
 class TaskDeadlineValidator:
@@ -30,11 +30,22 @@ class TaskDeadlineValidator:
 
 
 class TaskParentTaskValidator:
-    """ Проверка, что родительская задача не ссылается на саму себя """
+    """ Проверка, что родительская задача не ссылается на саму себя и не образует цикл зависимостей """
 
     def __call__(self, value, instance):
-        if value == instance:
+        # Задачи могут быть переданы объектами или id
+        parent_task_id = getattr(value, 'pk', value)
+        task_id = getattr(instance, 'pk', instance)
+
+        if parent_task_id == task_id:
             raise ValidationError(
                 _('A task cannot be its own parent.'),
                 code='parent_task_self_reference',
             )
+
+        # Цепочка родителей будущей родительской задачи читается одним рекурсивным запросом
+        if dependencies.creates_cycle(task_id, parent_task_id):
+            raise ValidationError(
+                _('The parent task depends on this task, which would create a dependency cycle.'),
+                code='parent_task_cycle',
+            )
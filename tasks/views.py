@@ -1,68 +1,168 @@
-from django.db.models import Q, Count
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.shortcuts import aget_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.views import APIView
 
-from employees.models import Employee
+from config.cache import CachedResponseMixin
+from config.conditional import ConditionalResponseMixin
+from config.representations import ValuesReadMixin, ValuesRepresentation, keyset_columns, select_fields
+from config.throttling import AdmissionControlMixin, TokenBucketThrottle
+from config.views import AsyncAPIView
+from tasks import dependencies
+from tasks.assignment import AssignmentSolver
+from tasks.exporters import StreamingExportMixin
+from tasks.filters import TaskFilter, TieBreakOrderingFilter
 from tasks.models import Task
 from tasks.paginators import TaskPaginator
-from tasks.serializers import TaskSerializer, ImportantTaskSerializer
+from tasks.serializers import TaskSerializer, ImportantTaskSerializer, TaskDependencySerializer, \
+    AssignmentOptionsSerializer
+from tasks.services import ImportantTaskAssigner, AssignmentError, TaskBulkWriter
 
 
-class TaskListApi(generics.ListCreateAPIView):
+class TaskListApi(ValuesReadMixin, ConditionalResponseMixin, generics.ListCreateAPIView):
     """
         API endpoint для списка задач.
 
-        - GET: Получение списка задач.
+        - GET: Получение списка задач. Ответ содержит ETag и Last-Modified, при совпадении If-None-Match - 304.
+          Фильтры - tasks.filters.TaskFilter (?status=, ?deadline_after=, ?search= и др.),
+          сортировка - ?ordering=pk|deadline|priority (с '-' - по убыванию, priority - от low к high).
+          ?fields=id,name,status,deadline или ?exclude=description - только часть полей, остальные столбцы
+          не читаются из базы.
         - POST: Создание новой задачи.
     """
     serializer_class = TaskSerializer
     queryset = Task.objects.all().order_by('pk')
     pagination_class = TaskPaginator
+    filter_backends = [DjangoFilterBackend, TieBreakOrderingFilter]
+    filterset_class = TaskFilter
+    ordering_fields = ['pk', 'deadline', 'priority']
 
 
-class TaskDetailApi(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailApi(ValuesReadMixin, ConditionalResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
         API endpoint для детальной информации о задаче и её обновления/удаления.
 
-        - GET: Получение детальной информации о конкретной задаче.
-        - PUT: Обновление информации о задаче.
+        - GET: Получение детальной информации о конкретной задаче. При совпадении If-None-Match - 304.
+          Поддерживает ?fields= и ?exclude=, как список.
+        - PUT: Обновление информации о задаче. С заголовком If-Match - только если задача не изменилась, иначе 412.
+          Статус вычисляется сериализатором (tasks.transitions), задача записывается одним UPDATE изменённых полей.
         - DELETE: Удаление задачи.
     """
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
 
-    def perform_update(self, serializer):
-        data = self.request.data    # Получение текущие данные из запроса
-        assigned_employee_id = data.get('assigned_employee')    # Проверка, назначен ли сотрудник
 
-        serializer.save()    # обновление только переданных полей
+class TaskSubtreeApi(CachedResponseMixin, generics.ListAPIView):
+    """
+        API endpoint для получения всех зависимых задач (поддерева) задачи.
+
+        - GET: Список зависимых задач всех уровней с полем depth - уровнем вложенности.
+          Поддерево загружается одним рекурсивным запросом, ответ кешируется до следующей записи задач.
+    """
+    serializer_class = TaskDependencySerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Task.objects.none()    # генерация схемы OpenAPI: задачи в URL нет
+        task = generics.get_object_or_404(Task, pk=self.kwargs['pk'])
+        return dependencies.descendants(task.pk)
+
+
+class TaskAncestorsApi(CachedResponseMixin, generics.ListAPIView):
+    """
+        API endpoint для получения цепочки родительских задач задачи.
+
+        - GET: Родительские задачи от ближайшей к корню с полем depth - расстоянием от задачи.
+          Цепочка загружается одним рекурсивным запросом, ответ кешируется до следующей записи задач.
+    """
+    serializer_class = TaskDependencySerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Task.objects.none()    # генерация схемы OpenAPI: задачи в URL нет
+        task = generics.get_object_or_404(Task, pk=self.kwargs['pk'])
+        return dependencies.ancestors(task.pk)
 
-        instance = serializer.instance
 
-        # Изменение статуса задачи при назначении сотрудника
-        if assigned_employee_id is not None:
-            instance.status = "in_progress"
-        # Изменение статуса задачи при снятии сотрудника
-        elif assigned_employee_id is None:
-            instance.status = "to_assign"
-            instance.completion_time = None
+class TaskExportApi(StreamingExportMixin, generics.GenericAPIView):
+    """
+        API endpoint для потоковой выгрузки всех задач.
+
+        - GET /tasks/export/ndjson/: Выгрузка в формате NDJSON (один JSON-объект на строку).
+        - GET /tasks/export/csv/: Выгрузка в формате CSV.
+    """
+    queryset = Task.objects.all().order_by('pk')
+    filter_backends = TaskListApi.filter_backends
+    filterset_class = TaskListApi.filterset_class
+    ordering_fields = TaskListApi.ordering_fields
+    export_name = 'tasks'
+    export_fields = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'priority': 'priority',
+        'deadline': 'deadline',
+        'status': 'status',
+        'completion_time': 'completion_time',
+        'parent_task': 'parent_task_id',
+        'assigned_employee': 'assigned_employee_id',
+    }
 
-        # Изменение статуса задачи при заполнении графы "completion_time"
-        if instance.completion_time:
-            if instance.completion_time > instance.deadline:
-                instance.status = "overdue"
-            elif instance.completion_time <= instance.deadline:
-                instance.status = "completed"
 
-        instance.save()
+class TaskBulkApi(APIView):
+    """
+        API endpoint для пакетного создания и обновления задач.
 
+        - POST: Создание списка задач.
+        - PATCH: Частичное обновление списка задач, каждый элемент содержит id задачи.
 
-class ImportantTasksView(APIView):
+        Если хотя бы один элемент не прошёл проверку, ничего не записывается, а ответ содержит
+        список ошибок по элементам в порядке запроса (пустой объект для корректных элементов).
+    """
+
+    def post(self, request):
+        return self.write(request, update=False, success_status=status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        return self.write(request, update=True, success_status=status.HTTP_200_OK)
+
+    def write(self, request, update, success_status):
+        writer = TaskBulkWriter(request.data, update=update)
+        # Обновляемые задачи блокируются при проверке и остаются заблокированными до записи
+        with transaction.atomic():
+            if not writer.is_valid():
+                return Response(writer.errors, status=status.HTTP_400_BAD_REQUEST)
+            tasks = writer.save()
+        return Response(TaskSerializer(tasks, many=True).data, status=success_status)
+
+
+def assign_important_tasks():
+    """
+    Назначает важные задачи и возвращает данные ответа и его код.
+
+    Используется синхронным и асинхронным представлениями важных задач.
+    """
+    try:
+        # Назначение всех важных задач за один проход
+        task_list = ImportantTaskAssigner().assign()
+    except AssignmentError:
+        return {"error": "No suitable employee found."}, 400
+
+    # Сериализация списка задач
+    serializer = ImportantTaskSerializer(task_list, many=True)
+    return serializer.data, 200
+
+
+class ImportantTasksView(AdmissionControlMixin, APIView):
     """
     Представление для получения важных задач, которые ещё не назначены сотрудникам,
     но имеют назначенные зависимые задачи, поиск подходящего для её выполнения сотрудника по критериям.
+    Частота и количество одновременных запросов ограничены (область important_tasks, config.throttling).
     """
+    throttle_scope = 'important_tasks'
 
     def get(self, request):
         """
@@ -71,43 +171,95 @@ class ImportantTasksView(APIView):
         Returns:
             JsonResponse: JSON-ответ со списком важных задач.
         """
+        data, status_code = assign_important_tasks()
+        return Response(data, status=status_code)
+
+
+class TaskAssignmentPreviewApi(APIView):
+    """
+        API endpoint для предварительного расчёта назначения всех неназначенных задач.
+
+        - GET: План назначений без записи (tasks.assignment.AssignmentSolver): пары задача - сотрудник
+          со стоимостью, итоговая стоимость, нагрузка сотрудников до и после назначения и fingerprint
+          исходных данных. ?max_load= ограничивает число задач в работе у одного сотрудника.
+    """
+
+    def get(self, request):
+        options = AssignmentOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        plan = AssignmentSolver(max_load=options.validated_data.get('max_load')).preview()
+        return Response(plan.as_dict())
+
+
+class TaskAssignmentApplyApi(APIView):
+    """
+        API endpoint для назначения всех неназначенных задач.
+
+        - POST: Рассчитывает и записывает назначения, ответ совпадает с предварительным расчётом.
+          Если передан fingerprint предварительного расчёта, а задачи или сотрудники с тех пор изменились,
+          ничего не записывается и возвращается 412.
+    """
+
+    def post(self, request):
+        options = AssignmentOptionsSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        plan = AssignmentSolver(max_load=options.validated_data.get('max_load')) \
+            .apply(fingerprint=options.validated_data.get('fingerprint'))
+        return Response(plan.as_dict())
+
+
+class TaskListAsyncApi(AsyncAPIView):
+    """
+        Асинхронный API endpoint для списка задач (для запуска под ASGI).
+
+        - GET: Список задач, ответ совпадает с GET /tasks/ (те же фильтры, сортировка и пагинация).
+          Количество считается через acount(), страница загружается async ORM из строк .values().
+          Поддерживает ?fields= и ?exclude=.
+    """
+    serializer_class = TaskSerializer
+    queryset = Task.objects.all().order_by('pk')
+    pagination_class = TaskPaginator
+    filter_backends = TaskListApi.filter_backends
+    filterset_class = TaskListApi.filterset_class
+    ordering_fields = TaskListApi.ordering_fields
+
+    async def get(self, request):
+        fields = select_fields(self.serializer_class, self.request.query_params)
+        representation = ValuesRepresentation.for_serializer(self.serializer_class, fields)
+        paginator = self.pagination_class()
+        queryset = representation.values(self.filter_queryset(self.queryset), 'pk',
+                                         *keyset_columns(self.pagination_class))
+        rows = await paginator.apaginate_queryset(queryset, self.request, self)
+        return self.render(paginator.get_paginated_response(representation.represent_many(rows)).data)
+
+
+class TaskDetailAsyncApi(AsyncAPIView):
+    """
+        Асинхронный API endpoint для детальной информации о задаче (для запуска под ASGI).
+
+        - GET: Задача загружается через aget(), ответ совпадает с GET /tasks/<id>/ (и с ?fields=, ?exclude=).
+    """
+    serializer_class = TaskSerializer
+    queryset = Task.objects.all()
+
+    async def get(self, request, pk):
+        fields = select_fields(self.serializer_class, self.request.query_params)
+        representation = ValuesRepresentation.for_serializer(self.serializer_class, fields)
+        row = await aget_object_or_404(representation.values(self.queryset, 'pk'), pk=pk)
+        return self.render(representation.represent(row))
+
+
+class ImportantTasksAsyncView(AsyncAPIView):
+    """
+    Асинхронное представление важных задач (для запуска под ASGI), ответ совпадает с GET /tasks/important-tasks/.
+
+    Назначение выполняется в транзакции с блокировкой строк, которых нет в async ORM,
+    поэтому оно целиком выполняется в потоке через sync_to_async. Ограничения нагрузки - как у синхронного
+    представления (область important_tasks).
+    """
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'important_tasks'
 
-        # Получение задач, от которых зависят другие задачи, взятые в работе
-        important_tasks = Task.objects.filter(status='to_assign', linked_task__status='in_progress')
-        task_list = []
-
-        for task in important_tasks:
-
-            # Поиск наименее загруженного сотрудника
-            least_busy_employees = Employee.objects.annotate(
-                active_tasks_count=Count('tasks', filter=Q(tasks__status='in_progress'))).order_by(
-                'active_tasks_count').first()
-            # Поиск сотрудника, выполняющего родительскую задачу
-            employee_with_parent_task = Employee.objects.filter(
-                tasks__parent_task__isnull=False  # Фильтрация по задачам, у которых есть родительская задача
-            ).annotate(
-                task_count=Count('tasks')  # Подсчет количества задач у сотрудника
-            ).order_by('task_count').first()
-
-            if not least_busy_employees or not employee_with_parent_task:
-                return Response({"error": "No suitable employee found."}, status=400)
-
-            # Сравнение количества задач у наименее загруженного сотрудника и у того, кто выполняет родительскую задачу
-            if employee_with_parent_task.task_count <= least_busy_employees.active_tasks_count + 2:
-                # Если количество задач у сотрудника, выполняющего родительскую задачу, не превышает количество задач
-                # у наименее загруженного сотрудника + 2, то этот сотрудник может взять задачу
-                suitable_employee = employee_with_parent_task
-            else:
-                # В противном случае, наименее загруженный сотрудник является наиболее подходящим кандидатом
-                suitable_employee = least_busy_employees
-
-            # Назначение задачи выбранному сотруднику
-            task.assigned_employee = suitable_employee
-            task.status = "in_progress"
-            task.save()  # Сохранение изменений в базе данных
-
-            task_list.append(task)
-
-            # Сериализация списка задач
-        serializer = ImportantTaskSerializer(task_list, many=True)
-        return Response(serializer.data, status=200)
+    async def get(self, request):
+        data, status_code = await sync_to_async(assign_important_tasks)()
+        return self.render(data, status=status_code)